@@ -63,8 +63,10 @@ class ApiTestCase(unittest.TestCase):
         self.post_headers = {"Content-type": "application/json"}
         app.app_context().push()
         from zou.app.utils import cache
+        from zou.app.stores import counters_store
 
         cache.clear()
+        counters_store.clear()
 
     def log_in(self, email):
         tokens = self.post(
@@ -88,3 +88,12 @@ class CommandsTestCase(ApiDBTestCase):
         entity_types = EntityType.get_all()
         self.assertEqual(len(task_types), 12)
         self.assertEqual(len(entity_types), 8)
+
+    def test_warm_memory_cache(self):
+        self.generate_base_context()
+        self.generate_fixture_person()
+        timings = commands.warm_memory_cache(number_workers=2)
+        self.assertEqual(timings["get_project"]["calls"], 1)
+        self.assertEqual(timings["get_project"]["errors"], 0)
+        self.assertEqual(timings["get_task_type"]["calls"], 6)
+        self.assertEqual(timings["get_person"]["errors"], 0)
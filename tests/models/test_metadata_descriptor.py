@@ -16,6 +16,7 @@ class MetadataTestCase(ApiDBTestCase):
     def test_get_metadata_descriptors(self):
         descriptors = self.get("data/metadata-descriptors")
         self.assertEqual(len(descriptors), 1)
+        self.assertEqual(descriptors[0]["departments"], [])
 
     def test_get_metadata_descriptor(self):
         descriptor = self.get_first("data/metadata-descriptors")
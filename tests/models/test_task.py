@@ -3,6 +3,7 @@ from zou.app.models.task import Task
 from zou.app.models.person import Person
 
 from zou.app.utils import fields
+from zou.app.utils.fields import serialize_value
 
 
 class TaskTestCase(ApiDBTestCase):
@@ -34,6 +35,73 @@ class TaskTestCase(ApiDBTestCase):
         tasks = self.get("data/tasks")
         self.assertEqual(len(tasks), 3)
 
+    def test_get_tasks_fields(self):
+        tasks = self.get("data/tasks?fields=id,name,task_status_id")
+        self.assertEqual(len(tasks), 3)
+        self.assertEqual(
+            set(tasks[0].keys()), {"id", "name", "task_status_id", "type"}
+        )
+        tasks = self.get("data/tasks?fields=name,assignees&relations=true")
+        self.assertEqual(set(tasks[0].keys()), {"name", "assignees", "type"})
+        self.assertEqual(tasks[0]["assignees"], [str(self.person.id)])
+        tasks = self.get("data/tasks?fields=id,name&page=1")
+        self.assertEqual(set(tasks["data"][0].keys()), {"id", "name", "type"})
+        task_id = tasks["data"][0]["id"]
+        task = self.get("data/tasks/%s?fields=id,name" % task_id)
+        self.assertEqual(set(task.keys()), {"id", "name", "type"})
+
+    def test_get_tasks_keyset(self):
+        result = self.get("data/tasks?after=&limit=2&count=true")
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(len(result["data"]), 2)
+        self.assertIsNotNone(result["next_cursor"])
+        task_ids = [task["id"] for task in result["data"]]
+        result = self.get(
+            "data/tasks?after=%s&limit=2" % result["next_cursor"]
+        )
+        self.assertNotIn("total", result)
+        self.assertEqual(len(result["data"]), 1)
+        self.assertIsNone(result["next_cursor"])
+        task_ids += [task["id"] for task in result["data"]]
+        self.assertEqual(len(set(task_ids)), 3)
+        self.get("data/tasks?after=wrongcursor", 400)
+
+    def test_get_tasks_keyset_all_pages(self):
+        names = []
+        cursor = ""
+        while cursor is not None:
+            result = self.get(
+                "data/tasks?after=%s&limit=1&fields=name" % cursor
+            )
+            self.assertEqual(len(result["data"]), 1)
+            self.assertEqual(set(result["data"][0].keys()), {"name", "type"})
+            names += [task["name"] for task in result["data"]]
+            cursor = result["next_cursor"]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(
+            sorted(names), sorted(task.name for task in self.tasks)
+        )
+
+    def test_get_tasks_keyset_never_updated(self):
+        Task.query.filter(Task.id == self.tasks[0].id).update(
+            {"updated_at": None}
+        )
+        Task.commit()
+        ids = []
+        cursor = ""
+        while cursor is not None:
+            result = self.get("data/tasks?after=%s&limit=1" % cursor)
+            ids += [task["id"] for task in result["data"]]
+            cursor = result["next_cursor"]
+        self.assertEqual(
+            sorted(ids), sorted(str(task.id) for task in self.tasks)
+        )
+
+    def test_get_tasks_estimate_total(self):
+        result = self.get("data/tasks?page=1&estimate_total=true")
+        self.assertEqual(result["total"], 3)
+        self.assertEqual(len(result["data"]), 3)
+
     def test_get_task(self):
         task = self.get_first("data/tasks?relations=true")
         task_again = self.get("data/tasks/%s" % task["id"])
@@ -63,6 +131,54 @@ class TaskTestCase(ApiDBTestCase):
         self.task = self.post("data/tasks", data)
         self.assertEqual(len(tasks), 4)
 
+    def test_batch_tasks(self):
+        task = self.get_first("data/tasks")
+        data = {
+            "project_id": self.project.id,
+            "task_type_id": self.task_type.id,
+            "task_status_id": self.task_status.id,
+            "entity_id": self.asset.id,
+            "assignees": [str(self.person.id)],
+        }
+        results = self.post(
+            "data/tasks/batch",
+            [
+                {"action": "create", "data": dict(data, name="Batch 1")},
+                {"action": "create", "data": dict(data, name="Batch 2")},
+                {
+                    "action": "update",
+                    "id": task["id"],
+                    "data": {"name": "Batch 3"},
+                },
+            ],
+            200,
+        )
+        self.assertEqual(
+            [result["action"] for result in results],
+            ["create", "create", "update"],
+        )
+        self.assertEqual(results[0]["data"]["name"], "Batch 1")
+        self.assertEqual(len(self.get("data/tasks")), 5)
+        task_again = self.get("data/tasks/%s" % results[0]["id"])
+        self.assertEqual(task_again["assignees"], [str(self.person.id)])
+        task_again = self.get("data/tasks/%s" % task["id"])
+        self.assertEqual(task_again["name"], "Batch 3")
+
+        result = self.post(
+            "data/tasks/batch",
+            [
+                {"action": "create", "data": dict(data, name="Batch 4")},
+                {"action": "update", "id": fields.gen_uuid(), "data": {}},
+                {"action": "delete", "id": task["id"]},
+            ],
+            400,
+        )
+        self.assertEqual(
+            [(error["index"], error["status"]) for error in result["errors"]],
+            [(1, 404), (2, 400)],
+        )
+        self.assertEqual(len(self.get("data/tasks")), 5)
+
     def test_update_task(self):
         task = self.get_first("data/tasks")
         data = {"name": "Modeling arbre 2"}
@@ -92,3 +208,27 @@ class TaskTestCase(ApiDBTestCase):
         self.assertEqual(task["project"]["name"], "Cosmos Landromat")
         self.assertEqual(task["entity"]["name"], "Tree")
         self.assertEqual(task["assigner"]["first_name"], "Ema")
+
+    def test_serialize_tasks(self):
+        tasks = Task.query.order_by(Task.id).all()
+        for relations in [False, True]:
+            self.assertEqual(
+                Task.serialize_query(
+                    Task.query.order_by(Task.id), relations=relations
+                ),
+                Task.serialize_list(tasks, relations=relations),
+            )
+            for milliseconds in [False, True]:
+                for task in tasks:
+                    task_dict = task.serialize(
+                        relations=relations, milliseconds=milliseconds
+                    )
+                    for attr, value in task_dict.items():
+                        if attr != "type":
+                            self.assertEqual(
+                                value,
+                                serialize_value(
+                                    getattr(task, attr),
+                                    milliseconds=milliseconds,
+                                ),
+                            )
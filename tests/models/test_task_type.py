@@ -21,6 +21,39 @@ class TaskTypeTestCase(ApiDBTestCase):
         self.assertEqual(task_type, task_type_again)
         self.get_404("data/task-types/%s" % fields.gen_uuid())
 
+    def test_get_task_types_etag(self):
+        response = self.app.get("data/task-types", headers=self.base_headers)
+        etag = response.headers["ETag"]
+        headers = dict(self.base_headers, **{"If-None-Match": etag})
+        response = self.app.get("data/task-types", headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+
+        task_type = self.get_first("data/task-types")
+        path = "data/task-types/%s" % task_type["id"]
+        response = self.app.get(path, headers=self.base_headers)
+        item_headers = dict(
+            self.base_headers, **{"If-None-Match": response.headers["ETag"]}
+        )
+        response = self.app.get(path, headers=item_headers)
+        self.assertEqual(response.status_code, 304)
+
+        self.put(path, {"color": "#FFFFFF"})
+        response = self.app.get("data/task-types", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        response = self.app.get(path, headers=item_headers)
+        self.assertEqual(response.status_code, 200)
+
+        for path in [
+            "data/task-types?page=1",
+            "data/task-types?page=1&estimate_total=true",
+            "data/task-types?after=",
+        ]:
+            response = self.app.get(path, headers=self.base_headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("ETag", response.headers)
+
     def test_create_task_type(self):
         data = {
             "name": "animation",
@@ -1,6 +1,7 @@
 from tests.base import ApiDBTestCase
 
 from zou.app.services import files_service, names_service
+from zou.app.utils import fields
 
 
 class NamesServiceTestCase(ApiDBTestCase):
@@ -35,6 +36,24 @@ class NamesServiceTestCase(ApiDBTestCase):
         self.assertEqual(asset_name, "Props / Tree")
         self.assertEqual(shot_name, "E01 / S01 / P01")
 
+    def test_get_full_entity_names(self):
+        entity_ids = [
+            self.asset.id,
+            self.shot.id,
+            self.sequence.id,
+            self.episode.id,
+        ]
+        names = names_service.get_full_entity_names(
+            entity_ids + [fields.gen_uuid()]
+        )
+        self.assertEqual(len(names), 4)
+        for entity_id in entity_ids:
+            self.assertEqual(
+                names[str(entity_id)],
+                names_service.get_full_entity_name(entity_id),
+            )
+        self.assertEqual(names[str(self.sequence.id)][0], "E01 / S01")
+
     def test_get_preview_file_name(self):
         preview_file = files_service.create_preview_file(
             "main", 3, self.shot_task["id"], self.user["id"], source="webgui"
@@ -1,9 +1,14 @@
+import datetime
 import pytest
 
 from tests.base import ApiDBTestCase
 
 from zou.app.models.entity import Entity
-from zou.app.services import breakdown_service, shots_service
+from zou.app.services import (
+    breakdown_service,
+    shots_service,
+    tasks_service,
+)
 from zou.app.services.exception import (
     SceneNotFoundException,
     ShotNotFoundException,
@@ -95,6 +100,19 @@ class ShotUtilsTestCase(ApiDBTestCase):
             str(self.shot_task.task_type_id),
         )
 
+    def test_get_shots_and_tasks_fields(self):
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_department()
+        self.generate_fixture_task_status()
+        self.generate_fixture_task_type()
+        self.generate_fixture_shot_task()
+        shots = shots_service.get_shots_and_tasks(
+            field_names=["id", "name", "tasks"]
+        )
+        self.assertEqual(set(shots[0].keys()), {"id", "name", "tasks", "type"})
+        self.assertEqual(len(shots[0]["tasks"]), 1)
+
     def test_get_shot(self):
         self.assertEqual(
             str(self.shot.id), shots_service.get_shot(self.shot.id)["id"]
@@ -254,3 +272,48 @@ class ShotUtilsTestCase(ApiDBTestCase):
         )
         scenes = shots_service.get_scenes_for_sequence(self.sequence.id)
         self.assertEqual(len(scenes), 1)
+
+    def test_get_quotas(self):
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.shot.update({"nb_frames": 30})
+        task = self.generate_fixture_shot_task()
+        task_id = str(task.id)
+        project_id = str(self.project.id)
+        task_type_id = str(task.task_type_id)
+        person_id = str(self.person.id)
+        tasks_service.update_task(
+            task_id,
+            {
+                "real_start_date": datetime.datetime(2023, 2, 27, 12),
+                "end_date": datetime.datetime(2023, 3, 1, 12),
+            },
+        )
+
+        quotas = shots_service.get_raw_quotas(project_id, task_type_id, None)
+        self.assertEqual(
+            quotas[person_id]["day"]["frames"], {"2023-03-01": 30}
+        )
+        self.assertEqual(quotas[person_id]["week"]["count"], {"2023-9": 1})
+
+        quotas = shots_service.get_weighted_quotas(
+            project_id, task_type_id, None
+        )
+        self.assertEqual(
+            quotas[person_id]["day"]["frames"],
+            {"2023-02-27": 10, "2023-02-28": 10, "2023-03-01": 10},
+        )
+        self.assertEqual(quotas[person_id]["month"]["count"]["2023-02"], 2)
+
+        tasks_service.create_or_update_time_spent(
+            task_id, person_id, "2023-03-02", 60
+        )
+        quotas = shots_service.get_weighted_quotas(
+            project_id, task_type_id, None
+        )
+        self.assertEqual(
+            quotas[person_id]["day"]["frames"], {"2023-03-02": 30}
+        )
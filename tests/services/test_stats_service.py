@@ -0,0 +1,131 @@
+from tests.base import ApiDBTestCase
+
+from zou.app.models.preview_file import PreviewFile
+from zou.app.services import (
+    comments_service,
+    deletion_service,
+    files_service,
+    preview_files_service,
+    stats_service,
+)
+from zou.app.stores import counters_store
+
+
+class MainStatsTestCase(ApiDBTestCase):
+    def setUp(self):
+        super(MainStatsTestCase, self).setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_asset_type()
+        self.generate_fixture_asset()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_task()
+        self.generate_fixture_comment()
+        self.generate_fixture_preview_file()
+        self.task_id = str(self.task.id)
+        self.person_id = str(self.person.id)
+        self.task_status_id = str(self.task_status.id)
+
+    def assert_counters(self, videos, pictures, models, comments):
+        """
+        Check that counters have the expected values and that they match
+        the values computed from the database.
+        """
+        counters = dict(
+            zip(
+                stats_service.MAIN_STATS_COUNTERS,
+                counters_store.get_values(stats_service.MAIN_STATS_COUNTERS),
+            )
+        )
+        self.assertEqual(
+            counters,
+            {
+                "number_of_video_previews": videos,
+                "number_of_picture_previews": pictures,
+                "number_of_model_previews": models,
+                "number_of_comments": comments,
+            },
+        )
+        self.assertEqual(counters, stats_service.reconcile_main_stats())
+
+    def test_get_main_stats(self):
+        self.assertEqual(
+            counters_store.get_values(stats_service.MAIN_STATS_COUNTERS),
+            [None] * 4,
+        )
+        self.assertEqual(
+            stats_service.get_main_stats(),
+            {
+                "number_of_video_previews": 1,
+                "number_of_picture_previews": 0,
+                "number_of_model_previews": 0,
+                "number_of_comments": 1,
+            },
+        )
+        self.assert_counters(1, 0, 0, 1)
+        self.generate_fixture_comment()
+        self.assertEqual(
+            stats_service.get_main_stats()["number_of_comments"], 2
+        )
+
+    def test_comment_counters(self):
+        stats_service.get_main_stats()
+        comment = comments_service.new_comment(
+            self.task_id, self.task_status_id, self.person_id, "comment"
+        )
+        self.assert_counters(1, 0, 0, 2)
+        self.post(
+            "data/comments",
+            {
+                "object_id": self.task_id,
+                "object_type": "Task",
+                "task_status_id": self.task_status_id,
+                "person_id": self.person_id,
+                "text": "crud comment",
+            },
+        )
+        self.assert_counters(1, 0, 0, 3)
+        deletion_service.remove_comment(comment["id"])
+        self.assert_counters(1, 0, 0, 2)
+        deletion_service.remove_task(self.task_id, force=True)
+        self.assert_counters(0, 0, 0, 0)
+
+    def test_preview_counters(self):
+        stats_service.get_main_stats()
+        preview_file = files_service.create_preview_file_raw(
+            "main", 2, self.task_id, self.person_id, extension="png"
+        )
+        preview_file_id = str(preview_file.id)
+        self.assert_counters(1, 1, 0, 1)
+        preview_files_service.update_preview_file(
+            preview_file_id, {"extension": "obj"}
+        )
+        self.assert_counters(1, 0, 1, 1)
+        self.put(
+            "data/preview-files/%s" % preview_file_id, {"extension": "mp4"}
+        )
+        self.assert_counters(2, 0, 0, 1)
+        files_service.remove_preview_file(preview_file_id)
+        self.assert_counters(1, 0, 0, 1)
+
+        preview_file = self.post(
+            "data/preview-files",
+            {
+                "name": "main",
+                "revision": 3,
+                "task_id": self.task_id,
+                "person_id": self.person_id,
+                "extension": "png",
+            },
+        )
+        self.assert_counters(1, 1, 0, 1)
+        self.delete("data/preview-files/%s" % preview_file["id"])
+        self.assert_counters(1, 0, 0, 1)
+        deletion_service.remove_preview_file(
+            PreviewFile.get(self.preview_file.id)
+        )
+        self.assert_counters(0, 0, 0, 1)
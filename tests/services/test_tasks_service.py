@@ -3,6 +3,7 @@ import datetime
 
 from tests.base import ApiDBTestCase
 
+from zou.app.models.comment import Comment
 from zou.app.models.task import Task
 from zou.app.models.task_type import TaskType
 from zou.app.models.time_spent import TimeSpent
@@ -121,6 +122,71 @@ class TaskServiceTestCase(ApiDBTestCase):
         self.assertEqual(task["task_type_id"], task_type["id"])
         self.assertEqual(task["project_id"], shot["project_id"])
         self.assertEqual(task["task_status_id"], status["id"])
+        self.assertEqual(tasks[0]["task_status_name"], status["name"])
+        self.assertEqual(tasks[1]["entity_id"], shot_2["id"])
+
+        shot_3 = self.generate_fixture_shot("S03").serialize()
+        tasks = tasks_service.create_tasks(
+            task_type, [shot, shot_2, shot_3, shot_3]
+        )
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0]["entity_id"], shot_3["id"])
+
+        shot_4 = self.generate_fixture_shot("S04").serialize()
+        task = tasks_service.create_task(task_type, shot_4)
+        self.assertEqual(sorted(tasks[0].keys()), sorted(task.keys()))
+        self.assertEqual(tasks_service.create_tasks(task_type, [shot_4]), [])
+
+    def test_reset_tasks_data(self):
+        self.generate_fixture_task_status_retake()
+        self.generate_fixture_task_status_wfa()
+        for task_status in [
+            self.task_status_wip,
+            self.task_status_retake,
+            self.task_status_wfa,
+            self.task_status_retake,
+            self.task_status_retake,
+            self.task_status_wip,
+        ]:
+            self.generate_fixture_comment(task_status_id=task_status.id)
+        tasks_service.create_or_update_time_spent(
+            person_id=self.person.id,
+            task_id=self.task.id,
+            date="2017-09-23",
+            duration=3600,
+        )
+        field_names = [
+            "duration",
+            "retake_count",
+            "real_start_date",
+            "last_comment_date",
+            "end_date",
+            "task_status_id",
+        ]
+        expected = tasks_service.reset_task_data(self.task_id)
+        self.assertEqual(expected["retake_count"], 2)
+        self.assertEqual(expected["duration"], 3600)
+        tasks_service.reset_tasks_data(self.project_id)
+
+        self.task.update(
+            {
+                "duration": 0,
+                "retake_count": 0,
+                "end_date": None,
+                "task_status_id": self.task_status.id,
+            }
+        )
+        progress = []
+        nb_updated_tasks = tasks_service.reset_tasks_data(
+            self.project_id,
+            progress_callback=lambda done, total: progress.append(done),
+        )
+        self.assertEqual(nb_updated_tasks, 1)
+        self.assertEqual(progress, [2])
+        task = tasks_service.get_task(self.task_id)
+        for field_name in field_names:
+            self.assertEqual(task[field_name], expected[field_name])
+        self.assertEqual(tasks_service.reset_tasks_data(self.project_id), 0)
 
     def test_publish_task(self):
         handler = ToReviewHandler(
@@ -351,6 +417,38 @@ class TaskServiceTestCase(ApiDBTestCase):
             tasks[1]["last_comment"]["person_id"], str(self.person.id)
         )
 
+    def test_get_last_comment_map(self):
+        self.generate_fixture_user_client()
+        other_task = tasks_service.create_task(
+            self.task_type.serialize(),
+            self.generate_fixture_shot("S02").serialize(),
+        )
+        date = datetime.datetime(2024, 1, 1)
+        for i, person_id in enumerate(
+            [self.person.id, self.person.id, self.user_client["id"]]
+        ):
+            Comment.create(
+                object_id=self.task.id,
+                object_type="Task",
+                task_status_id=self.task_status.id,
+                person_id=person_id,
+                text="comment %d" % i,
+                created_at=date + datetime.timedelta(minutes=i),
+            )
+        task_comment_map = tasks_service.get_last_comment_map(
+            [str(self.task.id), other_task["id"]]
+        )
+        self.assertEqual(
+            task_comment_map,
+            {
+                str(self.task.id): {
+                    "text": "comment 1",
+                    "date": "2024-01-01T00:01:00",
+                    "person_id": str(self.person.id),
+                }
+            },
+        )
+
     def test_get_done_tasks_for_person(self):
         projects = [self.project.serialize()]
         tasks = tasks_service.get_person_done_tasks(self.user["id"], projects)
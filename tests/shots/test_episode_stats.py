@@ -1,6 +1,13 @@
 from tests.base import ApiDBTestCase
 
-from zou.app.services import comments_service
+from zou.app.models.episode_task_stat import EpisodeTaskStat
+from zou.app.services import (
+    comments_service,
+    deletion_service,
+    shots_service,
+    stats_service,
+    tasks_service,
+)
 
 
 class EpisodeStatsTestCase(ApiDBTestCase):
@@ -20,12 +27,15 @@ class EpisodeStatsTestCase(ApiDBTestCase):
         self.project_id = str(self.project.id)
         self.generate_fixture_asset_type()
         self.episode_ids = {}
+        self.sequences = {}
 
         for i in range(3):
             episode_name = "E0" + str(i + 1)
             episode = self.generate_fixture_episode(episode_name)
             self.episode_ids[episode_name] = str(episode.id)
-            self.generate_fixture_sequence("SE01")
+            self.sequences[episode_name] = self.generate_fixture_sequence(
+                "SE01"
+            )
             self.generate_fixture_shot_and_task("SH01", 2, 0)
             self.generate_fixture_shot_and_task("SH02", 3, 1)
             self.generate_fixture_shot_and_task("SH03", 0, 0)
@@ -100,3 +110,142 @@ class EpisodeStatsTestCase(ApiDBTestCase):
             retake_stats[ep1_id][layout_id]["retake"]["frames"], 80
         )
         self.assertEqual(retake_stats[ep3_id][layout_id]["retake"]["count"], 8)
+
+    def test_episode_stats_updates(self):
+        ep3_id = self.episode_ids["E03"]
+        animation_id = str(self.task_type_animation.id)
+        path = "/data/projects/%s/episodes/stats" % self.project_id
+        stats = self.get(path)
+        done_stats = stats[ep3_id][animation_id][self.done_id]
+        self.assertEqual(done_stats["count"], 12)
+        self.assertEqual(done_stats["frames"], 120)
+
+        shots_service.update_shot(str(self.shot.id), {"nb_frames": 20})
+        stats = self.get(path)
+        done_stats = stats[ep3_id][animation_id][self.done_id]
+        self.assertEqual(done_stats["frames"], 130)
+
+        comments_service.create_comment(
+            self.person_id, str(self.task.id), self.retake_id, "", [], {}, None
+        )
+        stats = self.get(path)
+        self.assertEqual(
+            stats[ep3_id][animation_id][self.done_id]["count"], 11
+        )
+        self.assertEqual(
+            stats[ep3_id][animation_id][self.retake_id]["frames"], 20
+        )
+
+        EpisodeTaskStat.delete_all_by(project_id=self.project_id)
+        self.assertEqual(self.get(path), stats)
+        EpisodeTaskStat.delete_all_by(project_id=self.project_id)
+        stats_service.rebuild_episode_stats(self.project_id)
+        self.assertEqual(self.get(path), stats)
+
+    def test_episode_stats_task_move(self):
+        ep1_id = self.episode_ids["E01"]
+        ep3_id = self.episode_ids["E03"]
+        animation_id = str(self.task_type_animation.id)
+        path = "/data/projects/%s/episodes/stats" % self.project_id
+        task_id = str(self.task.id)
+        shot_id = str(self.shot.id)
+        self.sequence = self.sequences["E01"]
+        new_shot_id = str(self.generate_fixture_shot("SH04", 10).id)
+
+        tasks_service.update_task(task_id, {"entity_id": new_shot_id})
+        stats = self.get(path)
+        self.assertEqual(
+            stats[ep1_id][animation_id][self.done_id]["count"], 13
+        )
+        self.assertEqual(
+            stats[ep3_id][animation_id][self.done_id]["count"], 11
+        )
+
+        self.put("data/tasks/%s" % task_id, {"entity_id": shot_id})
+        stats = self.get(path)
+        self.assertEqual(
+            stats[ep1_id][animation_id][self.done_id]["count"], 12
+        )
+        self.assertEqual(
+            stats[ep3_id][animation_id][self.done_id]["count"], 12
+        )
+
+        self.post(
+            "data/tasks/batch",
+            [
+                {
+                    "action": "update",
+                    "id": task_id,
+                    "data": {"entity_id": new_shot_id},
+                }
+            ],
+            200,
+        )
+        stats = self.get(path)
+        self.assertEqual(
+            stats[ep1_id][animation_id][self.done_id]["count"], 13
+        )
+
+    def test_episode_stats_shot_move(self):
+        ep1_id = self.episode_ids["E01"]
+        ep3_id = self.episode_ids["E03"]
+        animation_id = str(self.task_type_animation.id)
+        path = "/data/projects/%s/episodes/stats" % self.project_id
+        shot_path = "data/entities/%s" % self.shot.id
+        sequence_id = str(self.sequences["E01"].id)
+
+        self.put(shot_path, {"parent_id": sequence_id})
+        stats = self.get(path)
+        self.assertEqual(
+            stats[ep1_id][animation_id][self.done_id]["count"], 13
+        )
+        self.assertEqual(
+            stats[ep3_id][animation_id][self.done_id]["count"], 11
+        )
+
+        self.put(shot_path, {"parent_id": sequence_id, "nb_frames": 20})
+        stats = self.get(path)
+        self.assertEqual(
+            stats[ep1_id][animation_id][self.done_id]["frames"], 140
+        )
+
+    def test_episode_stats_sequence_move(self):
+        ep1_id = self.episode_ids["E01"]
+        ep2_id = self.episode_ids["E02"]
+        animation_id = str(self.task_type_animation.id)
+        path = "/data/projects/%s/episodes/stats" % self.project_id
+        sequence_id = str(self.sequences["E01"].id)
+
+        self.put("data/entities/%s" % sequence_id, {"parent_id": ep2_id})
+        stats = self.get(path)
+        self.assertEqual(stats[ep1_id][animation_id][self.done_id]["count"], 9)
+        self.assertEqual(
+            stats[ep2_id][animation_id][self.done_id]["count"], 15
+        )
+
+        episode_id = str(self.generate_fixture_episode("E04").id)
+        self.put("data/entities/%s" % sequence_id, {"parent_id": episode_id})
+        self.put("data/entities/%s" % sequence_id, {"parent_id": ep1_id})
+        stats = self.get(path)
+        self.assertNotIn(episode_id, stats)
+        self.assertEqual(
+            stats[ep1_id][animation_id][self.done_id]["count"], 12
+        )
+        deletion_service.remove_episode(episode_id)
+
+    def test_episode_stats_bulk_removal(self):
+        ep1_id = self.episode_ids["E01"]
+        ep3_id = self.episode_ids["E03"]
+        animation_id = str(self.task_type_animation.id)
+        path = "/data/projects/%s/episodes/stats" % self.project_id
+
+        shots_service.remove_sequence(str(self.sequence.id), force=True)
+        stats = self.get(path)
+        self.assertEqual(stats[ep3_id][animation_id][self.done_id]["count"], 9)
+
+        deletion_service.remove_tasks_for_project_and_task_type(
+            self.project_id, animation_id
+        )
+        stats = self.get(path)
+        self.assertNotIn(animation_id, stats[ep1_id])
+        self.assertNotIn(animation_id, stats[ep3_id])
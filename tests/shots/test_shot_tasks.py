@@ -44,6 +44,44 @@ class ShotTasksTestCase(ApiDBTestCase):
         self.assertEqual(shots[0]["episode_name"], "E01")
         self.assertEqual(shots[0]["sequence_name"], "S01")
 
+    def test_get_shots_and_tasks_columnar(self):
+        self.generate_fixture_shot_task(name="Secondary")
+        shots = self.get("data/shots/with-tasks")
+        result = self.get("data/shots/with-tasks?format=columnar")
+        self.assertEqual(result["entities"]["id"], [self.shot_id])
+        self.assertEqual(result["entities"]["sequence_name"], ["S01"])
+        self.assertNotIn("tasks", result["entities"])
+        self.assertEqual(result["tasks"]["entity_index"], [0, 0])
+        self.assertEqual(
+            result["tasks"]["id"],
+            [task["id"] for task in shots[0]["tasks"]],
+        )
+        self.assertEqual(
+            result["tasks"]["assignees"],
+            [task["assignees"] for task in shots[0]["tasks"]],
+        )
+
+    def test_get_shots_and_tasks_updated_after(self):
+        path = "data/shots/with-tasks?updated_after=%s"
+        result = self.get(path % "2000-01-01T00:00:00")
+        self.assertEqual(len(result["data"]), 1)
+        self.assertEqual(result["deleted_ids"], [])
+        timestamp = result["timestamp"]
+        result = self.get(path % timestamp)
+        self.assertEqual(result["data"], [])
+
+        self.shot_task.update({"priority": 3})
+        result = self.get(path % timestamp)
+        self.assertEqual(len(result["data"]), 1)
+        self.assertEqual(result["data"][0]["tasks"][0]["priority"], 3)
+        timestamp = result["timestamp"]
+
+        shots_service.remove_shot(self.shot_id, force=True)
+        result = self.get(path % timestamp)
+        self.assertEqual(result["data"], [])
+        self.assertEqual(result["deleted_ids"], [self.shot_id])
+        self.get(path % "wrong-date", 400)
+
     def test_get_shots_and_tasks_vendor(self):
         self.generate_fixture_shot_task(name="Secondary")
         self.generate_fixture_user_vendor()
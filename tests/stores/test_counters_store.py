@@ -0,0 +1,26 @@
+from tests.base import ApiTestCase
+
+from zou.app.stores import counters_store
+
+
+class CountersTestCase(ApiTestCase):
+    def setUp(self):
+        super(CountersTestCase, self).setUp()
+        self.store = counters_store
+        self.store.clear()
+
+    def tearDown(self):
+        self.store.clear()
+
+    def test_get_and_set_values(self):
+        self.assertEqual(self.store.get_values(["key-1", "key-2"]), [None] * 2)
+        self.store.set_values({"key-1": 3, "key-2": 0}, ttl=60)
+        self.assertEqual(self.store.get_values(["key-1", "key-2"]), [3, 0])
+
+    def test_increment(self):
+        self.store.increment("key-1", 2)
+        self.assertEqual(self.store.get_values(["key-1"]), [None])
+        self.store.set_values({"key-1": 3}, ttl=60)
+        self.store.increment("key-1", 2)
+        self.store.increment("key-1", -1)
+        self.assertEqual(self.store.get_values(["key-1"]), [4])
@@ -169,6 +169,57 @@ class TaskRoutesTestCase(ApiDBTestCase):
         task = tasks_service.get_task_with_relations(shot_task_id)
         self.assertEqual(len(task["assignees"]), 0)
 
+    def test_batch_task_assign(self):
+        self.generate_fixture_task()
+        self.generate_fixture_shot_task()
+        self.generate_fixture_user_cg_artist()
+        task_ids = [str(self.task.id), str(self.shot_task.id)]
+        person_ids = [str(self.person.id), self.user_cg_artist["id"]]
+        tasks_service.assign_task(self.task.id, self.person.id)
+        data = {"task_ids": task_ids + ["wrong-id"], "person_ids": person_ids}
+        tasks = self.put("/actions/tasks/assign", data)
+        self.assertEqual([task["id"] for task in tasks], task_ids)
+        for task_id in task_ids:
+            task = tasks_service.get_task_with_relations(task_id)
+            self.assertEqual(sorted(task["assignees"]), sorted(person_ids))
+            self.assertEqual(task["assigner_id"], self.user["id"])
+        notifications = notifications_service.get_last_notifications(
+            "assignation"
+        )
+        self.assertEqual(len(notifications), 3)
+        project = projects_service.get_project_with_relations(self.project_id)
+        self.assertIn(self.user_cg_artist["id"], project["team"])
+
+        data = {"task_ids": task_ids, "person_ids": ["wrong-id"]}
+        self.put("/actions/tasks/assign", data, 400)
+
+    def test_batch_task_unassign(self):
+        self.generate_fixture_task()
+        self.generate_fixture_shot_task()
+        self.generate_fixture_user_cg_artist()
+        task_id = str(self.task.id)
+        shot_task_id = str(self.shot_task.id)
+        person_id = str(self.person.id)
+        tasks_service.assign_task(task_id, person_id)
+        tasks_service.assign_task(task_id, self.user_cg_artist["id"])
+        tasks_service.assign_task(shot_task_id, person_id)
+        data = {"task_ids": [task_id, shot_task_id], "person_ids": [person_id]}
+        assignations = self.put("/actions/tasks/unassign", data)
+        self.assertEqual(len(assignations), 2)
+        task = tasks_service.get_task_with_relations(task_id)
+        self.assertEqual(task["assignees"], [self.user_cg_artist["id"]])
+        task = tasks_service.get_task_with_relations(shot_task_id)
+        self.assertEqual(task["assignees"], [])
+
+        data = {"task_ids": [task_id]}
+        assignations = self.put("/actions/tasks/unassign", data)
+        self.assertEqual(
+            assignations,
+            [{"task_id": task_id, "person_id": self.user_cg_artist["id"]}],
+        )
+        task = tasks_service.get_task_with_relations(task_id)
+        self.assertEqual(task["assignees"], [])
+
     def test_comment_task(self):
         self.project_id = self.project.id
         self.generate_fixture_user_manager()
@@ -1,8 +1,30 @@
+import random
+import time
 import unittest
 
 from zou.app.utils import cache
 
 
+@cache.memoize_function(50)
+def memoized_dict_function(parameter):
+    return {"parameter": parameter, "value": random.random()}
+
+
+@cache.memoize_function(50, tags=["person:{person_id}"])
+def memoized_get_person(person_id):
+    return {"id": person_id, "value": random.random()}
+
+
+@cache.memoize_function(50, tags=["person:{result[id]}"])
+def memoized_get_person_by_name(name):
+    return {"id": name.lower(), "value": random.random()}
+
+
+@cache.memoize_function(50, tags=["person:*"])
+def memoized_get_persons():
+    return [random.random()]
+
+
 class CacheTestCase(unittest.TestCase):
     __name__ = "test_handler"
 
@@ -28,3 +50,116 @@ class CacheTestCase(unittest.TestCase):
 
         self.assertEqual(result, result2)
         self.assertNotEqual(result, result3)
+
+    def test_local_cache(self):
+        result = memoized_dict_function("param1")
+        result["value"] = "changed"
+        result2 = memoized_dict_function("param1")
+        self.assertNotEqual(result2["value"], "changed")
+        self.assertEqual(result2, memoized_dict_function("param1"))
+        stats = cache.get_stats()
+        if cache.local_cache is not None:
+            self.assertGreater(stats["local"]["hits"], 0)
+            self.assertGreater(stats["local"]["misses"], 0)
+
+    def test_invalidate(self):
+        result = memoized_dict_function("param1")
+        result2 = memoized_dict_function("param2")
+        cache.invalidate(memoized_dict_function, "param1")
+        self.assertNotEqual(result, memoized_dict_function("param1"))
+        self.assertEqual(result2, memoized_dict_function("param2"))
+        cache.invalidate(memoized_dict_function)
+        self.assertNotEqual(result2, memoized_dict_function("param2"))
+
+    def test_local_cache_lru(self):
+        local_cache = cache.LocalCache(max_size=2, ttl=50)
+        local_cache.set(("func", "1"), {"id": "1"})
+        local_cache.set(("func", "2"), {"id": "2"})
+        local_cache.get(("func", "1"))
+        local_cache.set(("func", "3"), {"id": "3"})
+        self.assertEqual(len(local_cache), 2)
+        self.assertFalse(local_cache.get(("func", "2"))[0])
+        self.assertEqual(local_cache.get(("func", "1")), (True, {"id": "1"}))
+        local_cache.delete("func", "('1',){}")
+        self.assertEqual(len(local_cache), 2)
+        local_cache.delete("func")
+        self.assertEqual(len(local_cache), 0)
+
+    def test_invalidate_tags(self):
+        person = memoized_get_person("john")
+        person2 = memoized_get_person("jane")
+        person_by_name = memoized_get_person_by_name("John")
+        persons = memoized_get_persons()
+        self.assertEqual(person, memoized_get_person("john"))
+        self.assertEqual(persons, memoized_get_persons())
+
+        cache.invalidate_tags("person:john")
+        self.assertNotEqual(person, memoized_get_person("john"))
+        self.assertNotEqual(
+            person_by_name, memoized_get_person_by_name("John")
+        )
+        self.assertNotEqual(persons, memoized_get_persons())
+        self.assertEqual(person2, memoized_get_person("jane"))
+
+        persons = memoized_get_persons()
+        cache.invalidate_tags("person:*")
+        self.assertNotEqual(person2, memoized_get_person("jane"))
+        self.assertNotEqual(persons, memoized_get_persons())
+
+    def test_needs_refresh(self):
+        entry = cache.CacheEntry({}, 0.01, time.time() + 100)
+        self.assertFalse(cache.needs_refresh(entry))
+        entry = cache.CacheEntry({}, 0.01, time.time() - 1)
+        self.assertTrue(cache.needs_refresh(entry))
+
+    def test_single_flight(self):
+        value = memoized_dict_function("param5")
+        key = memoized_dict_function.make_cache_key(
+            memoized_dict_function.uncached, "param5"
+        )
+        entry = cache.cache.cache.get(key)
+        self.assertIsInstance(entry, cache.CacheEntry)
+        cache.cache.cache.set(key, entry._replace(expires_at=0))
+        self.assertTrue(cache.cache.acquire_lock(key))
+        stale_value = cache.cache.single_flight_get(
+            memoized_dict_function, 50, "param5"
+        )
+        self.assertEqual(stale_value, value)
+        cache.cache.release_lock(key)
+        new_value = cache.cache.single_flight_get(
+            memoized_dict_function, 50, "param5"
+        )
+        self.assertNotEqual(new_value, value)
+
+    def test_request_cache(self):
+        from zou.app import app
+
+        with app.test_request_context():
+            value = memoized_dict_function("param6")
+            cache.cache.cache.clear()
+            if cache.local_cache is not None:
+                cache.local_cache.clear()
+            self.assertEqual(value, memoized_dict_function("param6"))
+            cache.invalidate(memoized_dict_function, "param6")
+            new_value = memoized_dict_function("param6")
+            self.assertNotEqual(value, new_value)
+        cache.cache.cache.clear()
+        if cache.local_cache is not None:
+            cache.local_cache.clear()
+        self.assertNotEqual(new_value, memoized_dict_function("param6"))
+
+    def test_compact_serializer(self):
+        serializer = cache.CompactSerializer(compression_threshold=64)
+        values = [
+            {"id": "1", "name": "Tree", "data": {"nb": 3.5, "ok": True}},
+            [{"id": str(i), "name": "Shot %d" % i} for i in range(20)],
+            cache.CacheEntry({"id": "1"}, 0.5, 1234.5),
+            ("not", "plain"),
+            12,
+        ]
+        for value in values:
+            self.assertEqual(serializer.loads(serializer.dumps(value)), value)
+        self.assertEqual(serializer.dumps({"id": "1"})[:1], b"j")
+        self.assertEqual(serializer.dumps(("not", "plain"))[:1], b"!")
+        if cache.zstandard is not None:
+            self.assertEqual(serializer.dumps(values[1])[:1], b"z")
@@ -0,0 +1,54 @@
+import types
+import unittest
+
+from flask import Response
+
+from zou.app import app, config
+from zou.app.utils import monitoring
+
+
+class MonitoringTestCase(unittest.TestCase):
+    def test_get_statement_fingerprint(self):
+        self.assertEqual(
+            monitoring.get_statement_fingerprint(
+                "SELECT task.id FROM task\n"
+                "WHERE task.id IN (%(id_1_1)s, %(id_1_2)s)"
+            ),
+            "SELECT task.id FROM task WHERE task.id IN (?)",
+        )
+        self.assertEqual(
+            monitoring.get_statement_fingerprint(
+                "SELECT task.id FROM task WHERE task.id IN (%(id_1_1)s)"
+            ),
+            "SELECT task.id FROM task WHERE task.id IN (?)",
+        )
+
+    def test_sql_stats(self):
+        with app.test_request_context("/data/tasks"):
+            monitoring.reset_sql_stats()
+            conn = types.SimpleNamespace(info={})
+            statement = "SELECT * FROM task WHERE id = %(id_1)s"
+            for _ in range(3):
+                monitoring.before_cursor_execute(
+                    conn, None, statement, {}, None, False
+                )
+                monitoring.after_cursor_execute(
+                    conn, None, statement, {}, None, False
+                )
+            stats = monitoring.get_sql_stats()
+            self.assertEqual(stats["count"], 3)
+            self.assertEqual(list(stats["statements"].values()), [3])
+
+            debug = config.DEBUG
+            threshold = config.SQL_REPEATED_STATEMENT_THRESHOLD
+            config.DEBUG = True
+            config.SQL_REPEATED_STATEMENT_THRESHOLD = 2
+            try:
+                with self.assertLogs(app.logger, level="WARNING"):
+                    response = monitoring.report_sql_stats(Response())
+            finally:
+                config.DEBUG = debug
+                config.SQL_REPEATED_STATEMENT_THRESHOLD = threshold
+            self.assertEqual(response.headers["X-SQL-Queries"], "3")
+            self.assertEqual(response.headers["X-SQL-Max-Repeats"], "3")
+        self.assertIsNone(monitoring.get_sql_stats())
@@ -1,5 +1,6 @@
 import os
 import datetime
+import orjson
 import pytest
 import unittest
 import uuid
@@ -7,7 +8,9 @@ import uuid
 from babel import Locale
 from pytz import timezone
 
+from zou.app import app
 from zou.app.utils import colors, fields, query, fs, shell, date_helpers
+from zou.app.utils.flask import stream_json_list
 from zou.app.models.person import Person
 from zou.app.models.task import Task
 
@@ -74,6 +77,41 @@ class UtilsTestCase(unittest.TestCase):
             criterions, {"name": "Test", "project_id": "1234"}
         )
 
+    def test_to_columnar(self):
+        entries = [
+            {"id": "1", "name": "SH01", "tasks": [{"id": "a"}, {"id": "b"}]},
+            {"id": "2", "tasks": []},
+            {"id": "3", "name": "SH03", "tasks": [{"id": "c", "x": 1}]},
+        ]
+        self.assertDictEqual(
+            fields.to_columnar(entries),
+            {
+                "entities": {
+                    "id": ["1", "2", "3"],
+                    "name": ["SH01", None, "SH03"],
+                },
+                "tasks": {
+                    "entity_index": [0, 0, 2],
+                    "id": ["a", "b", "c"],
+                    "x": [None, None, 1],
+                },
+            },
+        )
+        self.assertDictEqual(
+            fields.to_columnar([]),
+            {"entities": {}, "tasks": {"entity_index": []}},
+        )
+
+    def test_stream_json_list(self):
+        items = [{"id": str(uuid.uuid4()), "position": i} for i in range(5)]
+        with app.test_request_context():
+            for chunk_size in [1, 2, 5, 10]:
+                response = stream_json_list(iter(items), chunk_size=chunk_size)
+                data = b"".join(response.response)
+                self.assertEqual(orjson.loads(data), items)
+            response = stream_json_list(iter([]))
+            self.assertEqual(b"".join(response.response), b"[]")
+
     def test_mkdirp(self):
         folder = "one/two/three"
         fs.mkdir_p(folder)
@@ -4,3 +4,4 @@ export LC_ALL=C.UTF-8
 export LANG=C.UTF-8
 
 zou upgrade-db
+zou warm-cache
@@ -1,12 +1,15 @@
+import datetime
+
 from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required
 
-from zou.app.utils import permissions, query
+from zou.app.utils import fields, permissions, query
 from zou.app.mixin import ArgsMixin
 from zou.app.services import (
     assets_service,
     breakdown_service,
+    entities_service,
     persons_service,
     shots_service,
     tasks_service,
@@ -125,6 +128,26 @@ class AssetsAndTasksResource(Resource, ArgsMixin):
                      to an episode and assets linked to given episode.
         tags:
           - Assets
+        parameters:
+          - in: query
+            name: format
+            required: False
+            type: string
+            x-example: columnar
+            description: Set to columnar to get parallel lists of values
+                         per field for assets and for tasks, instead of a
+                         list of assets. Tasks reference their asset through
+                         its index in the asset lists (entity_index).
+          - in: query
+            name: updated_after
+            required: False
+            type: string
+            format: date-time
+            x-example: "2024-01-31T12:00:00.000000"
+            description: Return only assets whose data, tasks or assignations
+                         changed after given date, with the IDs of the assets
+                         deleted since then and the timestamp to use for the
+                         next call.
         responses:
           200:
             description: All assets with tasks
@@ -140,7 +163,26 @@ class AssetsAndTasksResource(Resource, ArgsMixin):
                 str(department.id)
                 for department in persons_service.get_current_user_raw().departments
             ]
-        return assets_service.get_assets_and_tasks(criterions, page)
+        updated_after = query.get_updated_after_from_request(request)
+        timestamp = datetime.datetime.utcnow()
+        if updated_after is not None:
+            criterions["updated_after"] = updated_after
+        assets = assets_service.get_assets_and_tasks(
+            criterions,
+            page,
+            field_names=query.get_fields_from_request(request),
+        )
+        if request.args.get("format", None) == "columnar":
+            assets = fields.to_columnar(assets)
+        if updated_after is None:
+            return assets
+        return entities_service.get_delta_result(
+            "asset",
+            assets,
+            updated_after,
+            timestamp,
+            project_id=criterions.get("project_id", None),
+        )
 
 
 class AssetTypeResource(Resource):
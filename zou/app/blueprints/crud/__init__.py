@@ -30,6 +30,7 @@ from zou.app.blueprints.crud.entity_type import (
     EntityTypeResource,
 )
 from zou.app.blueprints.crud.entity_link import (
+    EntityLinksBatchResource,
     EntityLinksResource,
     EntityLinkResource,
 )
@@ -39,6 +40,7 @@ from zou.app.blueprints.crud.file_status import (
     FileStatusResource,
 )
 from zou.app.blueprints.crud.metadata_descriptor import (
+    MetadataDescriptorsBatchResource,
     MetadataDescriptorsResource,
     MetadataDescriptorResource,
 )
@@ -109,8 +111,13 @@ from zou.app.blueprints.crud.task_status import (
     TaskStatusesResource,
     TaskStatusResource,
 )
-from zou.app.blueprints.crud.task import TasksResource, TaskResource
+from zou.app.blueprints.crud.task import (
+    TasksBatchResource,
+    TasksResource,
+    TaskResource,
+)
 from zou.app.blueprints.crud.time_spent import (
+    TimeSpentsBatchResource,
     TimeSpentsResource,
     TimeSpentResource,
 )
@@ -140,6 +147,7 @@ routes = [
     ("/data/task-status", TaskStatusesResource),
     ("/data/task-status/<instance_id>", TaskStatusResource),
     ("/data/tasks", TasksResource),
+    ("/data/tasks/batch", TasksBatchResource),
     ("/data/tasks/<instance_id>", TaskResource),
     ("/data/departments", DepartmentsResource),
     ("/data/departments/<instance_id>", DepartmentResource),
@@ -162,6 +170,7 @@ routes = [
     ("/data/comments", CommentsResource),
     ("/data/comments/<instance_id>", CommentResource),
     ("/data/time-spents/", TimeSpentsResource),
+    ("/data/time-spents/batch", TimeSpentsBatchResource),
     ("/data/time-spents/<instance_id>", TimeSpentResource),
     ("/data/day-offs/", DayOffsResource),
     ("/data/day-offs/<instance_id>", DayOffResource),
@@ -188,10 +197,15 @@ routes = [
     ("/data/milestones/", MilestonesResource),
     ("/data/milestones/<instance_id>", MilestoneResource),
     ("/data/metadata-descriptors/", MetadataDescriptorsResource),
+    (
+        "/data/metadata-descriptors/batch",
+        MetadataDescriptorsBatchResource,
+    ),
     ("/data/metadata-descriptors/<instance_id>", MetadataDescriptorResource),
     ("/data/subscriptions/", SubscriptionsResource),
     ("/data/subscriptions/<instance_id>", SubscriptionResource),
     ("/data/entity-links/", EntityLinksResource),
+    ("/data/entity-links/batch", EntityLinksBatchResource),
     ("/data/entity-links/<instance_id>", EntityLinkResource),
     ("/data/preview-background-files", PreviewBackgroundFilesResource),
     (
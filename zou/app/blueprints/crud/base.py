@@ -7,12 +7,28 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required
 
 from sqlalchemy.exc import IntegrityError, StatementError
+from werkzeug.exceptions import HTTPException
 
+from zou.app import db
 from zou.app.mixin import ArgsMixin
 from zou.app.utils import events, fields, permissions, query
+from zou.app.utils.flask import (
+    add_etag,
+    get_request_etag,
+    is_not_modified,
+    not_modified_response,
+)
+from zou.app.utils.query import (
+    get_fields_from_request,
+    get_keyset_results,
+    get_query_total,
+    get_query_version,
+    stream_results,
+)
 from zou.app.services.exception import (
     ArgumentsException,
     WrongParameterException,
+    WrongTaskTypeForEntityException,
 )
 
 
@@ -25,10 +41,61 @@ class BaseModelsResource(Resource, ArgsMixin):
         if query is None:
             query = self.model.query
 
-        return self.model.serialize_list(query.all(), relations=relations)
+        return self.model.serialize_query(query, relations=relations)
+
+    def has_custom_entries(self):
+        """
+        Tell if the resource overrides all_entries, which may need the whole
+        list of full entries to alter it.
+        """
+        return type(self).all_entries is not BaseModelsResource.all_entries
+
+    def get_entries(self, query, relations=False, field_names=None):
+        """
+        Return entries restricted to given fields. When possible, only the
+        columns matching these fields are selected.
+        """
+        if self.has_custom_entries():
+            return [
+                fields.filter_fields(entry, field_names)
+                for entry in self.all_entries(query, relations=relations)
+            ]
+        else:
+            return self.model.serialize_query(
+                query, relations=relations, field_names=field_names
+            )
 
-    def paginated_entries(self, query, page, limit=None, relations=False):
-        total = query.count()
+    def all_entries_response(
+        self, query=None, relations=None, field_names=None
+    ):
+        """
+        Return all entries. They are streamed unless the resource has custom
+        entries. When relations are not specified, custom entries are built
+        with the resource defaults.
+        """
+        if query is None:
+            query = self.model.query
+        if self.has_custom_entries():
+            if relations is None and field_names is None:
+                return self.all_entries(query)
+            return self.get_entries(
+                query, relations=bool(relations), field_names=field_names
+            )
+        else:
+            return stream_results(
+                query, relations=bool(relations), field_names=field_names
+            )
+
+    def paginated_entries(
+        self,
+        query,
+        page,
+        limit=None,
+        relations=False,
+        field_names=None,
+        estimate_total=False,
+    ):
+        total = get_query_total(query, estimate=estimate_total)
         limit = limit or current_app.config["NB_RECORDS_PER_PAGE"]
         offset = (page - 1) * limit
 
@@ -48,7 +115,9 @@ class BaseModelsResource(Resource, ArgsMixin):
             }
         else:
             result = {
-                "data": self.all_entries(query=query, relations=relations),
+                "data": self.get_entries(
+                    query, relations=relations, field_names=field_names
+                ),
                 "total": total,
                 "nb_pages": nb_pages,
                 "limit": limit,
@@ -119,6 +188,13 @@ class BaseModelsResource(Resource, ArgsMixin):
     def check_read_permissions(self):
         return permissions.check_admin_permissions()
 
+    def get_etag(self, query):
+        """
+        Return the ETag of the list of entries selected by given query. It
+        changes when one of these entries is created, modified or deleted.
+        """
+        return get_request_etag(get_query_version(self.model, query))
+
     def add_project_permission_filter(self, query):
         return query
 
@@ -141,7 +217,13 @@ class BaseModelsResource(Resource, ArgsMixin):
         ---
         tags:
           - Crud
-        description: Filters can be specified in the query string.
+        description: Filters can be specified in the query string. Set the
+                     after parameter to walk through entries page by page,
+                     ordered by update date. Its value is the next cursor
+                     returned with the previous page (empty for the first
+                     page). Set count to true to get the number of entries.
+                     With pagination, set estimate_total to true to get an
+                     estimated total, cheaper to compute on large tables.
         responses:
             200:
                 description: All entries for given model
@@ -155,7 +237,10 @@ class BaseModelsResource(Resource, ArgsMixin):
             query = self.model.query
             if not request.args:
                 query = self.add_project_permission_filter(query)
-                return self.all_entries(query)
+                etag = self.get_etag(query)
+                if is_not_modified(etag):
+                    return not_modified_response(etag)
+                return add_etag(self.all_entries_response(query), etag)
             else:
                 options = request.args
                 query = self.apply_filters(query, options)
@@ -163,14 +248,47 @@ class BaseModelsResource(Resource, ArgsMixin):
                 page = int(options.get("page", "-1"))
                 limit = int(options.get("limit", 0))
                 relations = self.get_bool_parameter("relations")
+                field_names = get_fields_from_request(request)
                 is_paginated = page > -1
 
-                if is_paginated:
-                    return self.paginated_entries(
-                        query, page, limit=limit, relations=relations
+                if "after" in options:
+                    result = get_keyset_results(
+                        self.model,
+                        query,
+                        after=options["after"],
+                        limit=limit,
+                        with_count=self.get_bool_parameter("count"),
+                        serialize=lambda page_query, field_names: (
+                            self.get_entries(
+                                page_query,
+                                relations=relations,
+                                field_names=field_names,
+                            )
+                        ),
+                        field_names=field_names,
+                    )
+                elif is_paginated:
+                    result = self.paginated_entries(
+                        query,
+                        page,
+                        limit=limit,
+                        relations=relations,
+                        field_names=field_names,
+                        estimate_total=self.get_bool_parameter(
+                            "estimate_total"
+                        ),
                     )
                 else:
-                    return self.all_entries(query, relations=relations)
+                    etag = self.get_etag(query)
+                    if is_not_modified(etag):
+                        return not_modified_response(etag)
+                    return add_etag(
+                        self.all_entries_response(
+                            query, relations=relations, field_names=field_names
+                        ),
+                        etag,
+                    )
+                return result
         except StatementError as exception:
             if hasattr(exception, "message"):
                 return (
@@ -324,7 +442,15 @@ class BaseModelResource(Resource):
             instance = self.get_model_or_404(instance_id)
             result = self.serialize_instance(instance)
             self.check_read_permissions(result)
+            # The instance is already serialized, so the ETag is built from
+            # its content. It also catches changes of its relations.
+            etag = get_request_etag(json.dumps(result))
+            if is_not_modified(etag):
+                return not_modified_response(etag)
             result = self.clean_get_result(result)
+            result = fields.filter_fields(
+                result, get_fields_from_request(request)
+            )
 
         except StatementError as exception:
             current_app.logger.error(str(exception), exc_info=1)
@@ -333,7 +459,7 @@ class BaseModelResource(Resource):
         except ValueError:
             abort(404)
 
-        return result, 200
+        return add_etag(result, etag)
 
     def pre_update(self, instance_dict, data):
         return data
@@ -476,3 +602,219 @@ class BaseModelResource(Resource):
             {"%s_id" % self.model.__tablename__: instance_dict["id"]},
             project_id=instance_dict.get("project_id", None),
         )
+
+
+class BaseModelsBatchResource(Resource):
+    """
+    Create, update and delete many models with a single request. Operations
+    are validated with the hooks of the related resources (permissions,
+    integrity checks, data cleaning), then applied in a single transaction.
+    Related events are emitted at once. Actions listed in `actions` are the
+    only ones allowed.
+    """
+
+    actions = ["create", "update", "delete"]
+
+    def __init__(self, models_resource, model_resource):
+        Resource.__init__(self)
+        self.models_resource = models_resource()
+        self.model_resource = model_resource()
+        self.model = self.models_resource.model
+
+    def get_instances(self, operations):
+        """
+        Retrieve with a single query the instances targeted by given
+        operations. Result is a dict: instance id -> instance.
+        """
+        instance_ids = set()
+        for operation in operations:
+            instance_id = operation.get("id", None)
+            if operation.get("action", "create") != "create":
+                if not fields.is_valid_id(instance_id):
+                    raise WrongParameterException(
+                        "Malformed ID: %s." % instance_id
+                    )
+                instance_ids.add(instance_id)
+        if not instance_ids:
+            return {}
+        return {
+            str(instance.id): instance
+            for instance in self.model.query.filter(
+                self.model.id.in_(instance_ids)
+            )
+        }
+
+    def prepare_operation(self, operation, instances):
+        """
+        Check given operation and add it to the session. Return the
+        (action, instance, instance dict) tuple needed to finalize it once
+        the transaction is committed.
+        """
+        action = operation.get("action", "create")
+        data = operation.get("data", {})
+        if action not in self.actions:
+            raise ArgumentsException("Unsupported action: %s." % action)
+        if not isinstance(data, dict):
+            raise ArgumentsException("Data must be an object.")
+
+        if action == "create":
+            self.models_resource.check_create_permissions(data)
+            self.models_resource.check_creation_integrity(data)
+            data = self.models_resource.update_data(data)
+            instance = self.model.create_no_commit(**data)
+            return (action, instance, None)
+
+        instance_id = operation["id"]
+        instance = instances.get(instance_id, None)
+        if instance is None:
+            abort(404)
+        instance_dict = instance.serialize()
+        self.model_resource.instance = instance
+        if action == "update":
+            self.model_resource.check_update_permissions(instance_dict, data)
+            self.model_resource.pre_update(instance_dict, data)
+            data = self.model_resource.update_data(data, instance_id)
+            instance.update_no_commit(data)
+        else:
+            self.model_resource.check_delete_permissions(instance_dict)
+            self.model_resource.pre_delete(instance_dict)
+            instance.delete_no_commit()
+        return (action, instance, instance_dict)
+
+    def post_batch(self, results):
+        """
+        Hook called once all operations are finalized, to do once for the
+        batch what post operation hooks would do for each operation.
+        """
+        return results
+
+    def finalize_operation(self, action, instance, instance_dict):
+        """
+        Run post operation hooks and return the result of the operation with
+        the event to emit.
+        """
+        self.model_resource.instance = instance
+        if action == "create":
+            instance_dict = self.models_resource.post_creation(instance)
+            event = "new"
+        elif action == "update":
+            instance_dict = self.model_resource.post_update(
+                instance.serialize()
+            )
+            event = "update"
+        else:
+            self.model_resource.post_delete(instance_dict)
+            event = "delete"
+        return (
+            {
+                "action": action,
+                "id": instance_dict["id"],
+                "data": instance_dict,
+            },
+            (
+                "%s:%s" % (self.model.__tablename__.replace("_", "-"), event),
+                {"%s_id" % self.model.__tablename__: instance_dict["id"]},
+                instance_dict.get("project_id", None),
+            ),
+        )
+
+    @jwt_required()
+    def post(self):
+        """
+        Create, update and delete models with a single request.
+        ---
+        tags:
+          - Crud
+        description: A JSON list of operations is expected. Each operation is
+                     an object with an action (create, update or delete), the
+                     ID of the target model (update and delete only) and its
+                     data (create and update only). If one operation fails,
+                     nothing is applied. Results are returned in the order of
+                     operations.
+        parameters:
+          - in: body
+            name: Operations
+            schema:
+                type: array
+                items:
+                    type: object
+                    properties:
+                        action:
+                            type: string
+                        id:
+                            type: string
+                        data:
+                            type: object
+        responses:
+            200:
+                description: Operations applied
+            400:
+                description: At least one operation is invalid
+        """
+        operations = request.json
+        if not isinstance(operations, list) or not all(
+            isinstance(operation, dict) for operation in operations
+        ):
+            return {"message": "A list of operations is expected."}, 400
+
+        try:
+            instances = self.get_instances(operations)
+        except WrongParameterException as exception:
+            return {"message": str(exception)}, 400
+
+        prepared_operations = []
+        errors = []
+        # Changes are sent to the database only when all operations are
+        # checked, so queries run by the hooks don't flush them one by one.
+        with db.session.no_autoflush:
+            for index, operation in enumerate(operations):
+                try:
+                    prepared_operations.append(
+                        self.prepare_operation(operation, instances)
+                    )
+                except HTTPException as exception:
+                    errors.append(
+                        {
+                            "index": index,
+                            "status": exception.code,
+                            "message": exception.description,
+                        }
+                    )
+                except (
+                    KeyError,
+                    TypeError,
+                    ValueError,
+                    ArgumentsException,
+                    WrongParameterException,
+                    WrongTaskTypeForEntityException,
+                ) as exception:
+                    errors.append(
+                        {
+                            "index": index,
+                            "status": 400,
+                            "message": str(exception),
+                        }
+                    )
+
+        if errors:
+            db.session.rollback()
+            return {"message": "Invalid operations.", "errors": errors}, 400
+
+        try:
+            db.session.commit()
+        except (IntegrityError, StatementError) as exception:
+            db.session.rollback()
+            current_app.logger.error(str(exception), exc_info=1)
+            return {"message": str(exception)}, 400
+
+        results = []
+        batch_events = []
+        for action, instance, instance_dict in prepared_operations:
+            result, event = self.finalize_operation(
+                action, instance, instance_dict
+            )
+            results.append(result)
+            batch_events.append(event)
+        results = self.post_batch(results)
+        events.emit_many(batch_events)
+        return results, 200
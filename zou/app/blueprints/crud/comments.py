@@ -11,6 +11,7 @@ from zou.app.services import (
     deletion_service,
     notifications_service,
     persons_service,
+    stats_service,
     tasks_service,
     user_service,
 )
@@ -25,6 +26,10 @@ class CommentsResource(BaseModelsResource):
     def __init__(self):
         BaseModelsResource.__init__(self, Comment)
 
+    def post_creation(self, instance):
+        stats_service.update_comment_stats(1)
+        return instance.serialize()
+
 
 class CommentResource(BaseModelResource):
     def __init__(self):
@@ -127,6 +127,7 @@ class EntityResource(BaseModelResource, EntityEventMixin):
                 index_service.remove_shot_index(entity_dict["id"])
                 index_service.index_shot(entity)
                 shots_service.clear_shot_cache(entity_dict["id"])
+                shots_service.update_stats_for_shot(entity, previous_version)
                 self.save_version_if_needed(entity_dict, previous_version)
             elif assets_service.is_asset(entity):
                 index_service.remove_asset_index(entity_dict["id"])
@@ -136,6 +137,9 @@ class EntityResource(BaseModelResource, EntityEventMixin):
                 assets_service.clear_asset_cache(entity_dict["id"])
             elif shots_service.is_sequence(entity_dict):
                 shots_service.clear_sequence_cache(entity_dict["id"])
+                shots_service.update_stats_for_sequence(
+                    entity, previous_version
+                )
             elif shots_service.is_edit(entity_dict):
                 edits_service.clear_edit_cache(entity_dict["id"])
             elif shots_service.is_episode(entity_dict):
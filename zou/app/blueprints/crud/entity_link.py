@@ -1,7 +1,11 @@
 from zou.app.models.entity import EntityLink
 from zou.app.utils import fields
 
-from zou.app.blueprints.crud.base import BaseModelResource, BaseModelsResource
+from zou.app.blueprints.crud.base import (
+    BaseModelsBatchResource,
+    BaseModelResource,
+    BaseModelsResource,
+)
 from zou.app.services.exception import (
     EntityLinkNotFoundException,
     WrongParameterException,
@@ -24,3 +28,10 @@ class EntityLinkResource(BaseModelResource):
         if instance is None:
             raise EntityLinkNotFoundException
         return instance
+
+
+class EntityLinksBatchResource(BaseModelsBatchResource):
+    def __init__(self):
+        BaseModelsBatchResource.__init__(
+            self, EntityLinksResource, EntityLinkResource
+        )
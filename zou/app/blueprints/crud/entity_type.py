@@ -13,10 +13,7 @@ class EntityTypesResource(BaseModelsResource):
         if query is None:
             query = self.model.query
 
-        return [
-            asset_type.serialize(relations=relations)
-            for asset_type in query.all()
-        ]
+        return self.model.serialize_query(query, relations=relations)
 
     def check_read_permissions(self):
         return True
@@ -11,8 +11,8 @@ class EventsResource(BaseModelsResource):
         if query is None:
             query = self.model.query
 
-        return self.model.serialize_list(
-            query.limit(1000).all(), relations=relations
+        return self.model.serialize_query(
+            query.limit(1000), relations=relations
         )
 
 
@@ -5,7 +5,11 @@ from zou.app.models.metadata_descriptor import (
 
 from zou.app.models.department import Department
 
-from zou.app.blueprints.crud.base import BaseModelResource, BaseModelsResource
+from zou.app.blueprints.crud.base import (
+    BaseModelsBatchResource,
+    BaseModelResource,
+    BaseModelsResource,
+)
 
 from sqlalchemy.exc import StatementError
 
@@ -23,10 +27,7 @@ class MetadataDescriptorsResource(BaseModelsResource):
         if query is None:
             query = self.model.query
 
-        return [
-            metadata_descriptor.serialize(relations=relations)
-            for metadata_descriptor in query.all()
-        ]
+        return self.model.serialize_query(query, relations=relations)
 
     def check_creation_integrity(self, data):
         """
@@ -70,3 +71,10 @@ class MetadataDescriptorResource(BaseModelResource):
                 raise DepartmentNotFoundException()
             data["departments"] = departments
         return data
+
+
+class MetadataDescriptorsBatchResource(BaseModelsBatchResource):
+    def __init__(self):
+        BaseModelsBatchResource.__init__(
+            self, MetadataDescriptorsResource, MetadataDescriptorResource
+        )
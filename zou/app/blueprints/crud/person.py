@@ -125,7 +125,7 @@ class PersonResource(BaseModelResource, ArgsMixin):
         return data
 
     def post_update(self, instance_dict):
-        persons_service.clear_person_cache()
+        persons_service.clear_person_cache(instance_dict["id"])
         index_service.remove_person_index(instance_dict["id"])
         person = persons_service.get_person_raw(instance_dict["id"])
         if person.active:
@@ -136,7 +136,7 @@ class PersonResource(BaseModelResource, ArgsMixin):
         return instance_dict
 
     def post_delete(self, instance_dict):
-        persons_service.clear_person_cache()
+        persons_service.clear_person_cache(instance_dict["id"])
         return instance_dict
 
     def update_data(self, data, instance_id):
@@ -2,6 +2,7 @@ from zou.app.models.preview_file import PreviewFile
 from zou.app.models.task import Task
 from zou.app.models.project import Project
 from zou.app.services import (
+    stats_service,
     user_service,
     tasks_service,
 )
@@ -34,6 +35,10 @@ class PreviewFilesResource(BaseModelsResource):
     def check_read_permissions(self):
         return True
 
+    def post_creation(self, instance):
+        stats_service.update_preview_stats(extension=instance.extension)
+        return instance.serialize()
+
 
 class PreviewFileResource(BaseModelResource):
     def __init__(self):
@@ -57,3 +62,19 @@ class PreviewFileResource(BaseModelResource):
         if not permissions.has_manager_permissions():
             user_service.check_working_on_task(task["entity_id"])
         return True
+
+    def pre_update(self, instance_dict, data):
+        self.previous_extension = instance_dict["extension"]
+        return data
+
+    def post_update(self, instance_dict):
+        stats_service.update_preview_stats(
+            self.previous_extension, instance_dict["extension"]
+        )
+        return instance_dict
+
+    def post_delete(self, instance_dict):
+        stats_service.update_preview_stats(
+            previous_extension=instance_dict["extension"]
+        )
+        return instance_dict
@@ -115,7 +115,7 @@ class ProjectsResource(BaseModelsResource):
                 episode["id"]
             )
         user_service.clear_project_cache()
-        projects_service.clear_project_cache("")
+        projects_service.clear_project_cache(project_dict["id"])
         return project_dict
 
 
@@ -14,17 +14,44 @@ from zou.app.services import (
     persons_service,
     entities_service,
     assets_service,
+    shots_service,
+    stats_service,
 )
 from zou.app.utils import permissions
 
 from zou.app.services.exception import WrongTaskTypeForEntityException
 
-from zou.app.blueprints.crud.base import BaseModelsResource, BaseModelResource
+from zou.app.blueprints.crud.base import (
+    BaseModelsBatchResource,
+    BaseModelsResource,
+    BaseModelResource,
+)
+
 
+class EpisodeStatsMixin(object):
+    """
+    Track the entities whose episode stats are affected by task changes.
+    When stats are deferred, like in batches, they are updated once for all
+    tracked entities.
+    """
 
-class TasksResource(BaseModelsResource):
+    def init_episode_stats(self):
+        self.stats_entity_ids = set()
+        self.defer_episode_stats = False
+
+    def update_episode_stats(self, entity_ids=()):
+        self.stats_entity_ids.update(entity_ids)
+        if not self.defer_episode_stats and self.stats_entity_ids:
+            stats_service.update_episode_stats_for_entities(
+                list(self.stats_entity_ids)
+            )
+            self.stats_entity_ids.clear()
+
+
+class TasksResource(BaseModelsResource, EpisodeStatsMixin):
     def __init__(self):
         BaseModelsResource.__init__(self, Task)
+        self.init_episode_stats()
 
     def check_read_permissions(self):
         return True
@@ -38,6 +65,36 @@ class TasksResource(BaseModelsResource):
             )
         return query
 
+    def check_creation_integrity(self, data):
+        task_type = tasks_service.get_task_type(data["task_type_id"])
+        entity = entities_service.get_entity(data["entity_id"])
+        if task_type["for_entity"] == "Asset":
+            if not assets_service.is_asset_dict(entity):
+                raise WrongTaskTypeForEntityException(
+                    "Task type of the task does not match entity type."
+                )
+        elif (
+            entities_service.get_temporal_entity_type_by_name(
+                task_type["for_entity"]
+            )["id"]
+            != entity["entity_type_id"]
+        ):
+            raise WrongTaskTypeForEntityException(
+                "Task type of the task does not match entity type."
+            )
+        return data
+
+    def update_data(self, data):
+        if "assignees" in data:
+            data["assignees"] = Person.query.filter(
+                Person.id.in_(data["assignees"])
+            ).all()
+        return data
+
+    def post_creation(self, instance):
+        self.update_episode_stats([instance.entity_id])
+        return instance.serialize()
+
     def post(self):
         """
         Create a task with data given in the request body. JSON format is
@@ -46,35 +103,13 @@ class TasksResource(BaseModelsResource):
         """
         try:
             data = request.json
-            is_assignees = "assignees" in data
-            assignees = None
-
-            task_type = tasks_service.get_task_type(data["task_type_id"])
-            entity = entities_service.get_entity(data["entity_id"])
-            if task_type["for_entity"] == "Asset":
-                if not assets_service.is_asset_dict(entity):
-                    raise WrongTaskTypeForEntityException(
-                        "Task type of the task does not match entity type."
-                    )
-            elif (
-                entities_service.get_temporal_entity_type_by_name(
-                    task_type["for_entity"]
-                )["id"]
-                != entity["entity_type_id"]
-            ):
-                raise WrongTaskTypeForEntityException(
-                    "Task type of the task does not match entity type."
-                )
-
-            if is_assignees:
-                assignees = data["assignees"]
-                persons = Person.query.filter(Person.id.in_(assignees)).all()
-                del data["assignees"]
-
+            self.check_creation_integrity(data)
+            data = self.update_data(data)
             instance = self.model(**data)
-            if assignees is not None:
-                instance.assignees = persons
             instance.save()
+            stats_service.update_episode_stats_for_entities(
+                [instance.entity_id]
+            )
 
             return tasks_service.get_task_with_relations(str(instance.id)), 201
 
@@ -87,9 +122,10 @@ class TasksResource(BaseModelsResource):
             return {"message": "Task already exists."}, 400
 
 
-class TaskResource(BaseModelResource, ArgsMixin):
+class TaskResource(BaseModelResource, ArgsMixin, EpisodeStatsMixin):
     def __init__(self):
         BaseModelResource.__init__(self, Task)
+        self.init_episode_stats()
 
     def check_read_permissions(self, task):
         user_service.check_project_access(task["project_id"])
@@ -103,9 +139,17 @@ class TaskResource(BaseModelResource, ArgsMixin):
 
     def post_update(self, instance_dict):
         tasks_service.clear_task_cache(instance_dict["id"])
+        shots_service.clear_quotas_cache(instance_dict["project_id"])
+        self.update_episode_stats()
         return instance_dict
 
     def pre_update(self, instance_dict, data):
+        # Entities are stored before the update: if the task moves to another
+        # entity, stats of both episodes are updated.
+        if any(field in data for field in tasks_service.EPISODE_STATS_FIELDS):
+            self.stats_entity_ids.add(instance_dict["entity_id"])
+            self.stats_entity_ids.add(data.get("entity_id", None))
+            self.stats_entity_ids.discard(None)
         if "assignees" in data:
             data["assignees"] = [
                 persons_service.get_person_raw(assignee)
@@ -135,3 +179,22 @@ class TaskResource(BaseModelResource, ArgsMixin):
             return {"message": str(exception)}, 400
 
         return "", 204
+
+
+class TasksBatchResource(BaseModelsBatchResource):
+    # Task deletion requires to remove related data, it can't be batched.
+    actions = ["create", "update"]
+
+    def __init__(self):
+        BaseModelsBatchResource.__init__(self, TasksResource, TaskResource)
+        # Episode stats are updated once for the whole batch.
+        self.model_resource.stats_entity_ids = (
+            self.models_resource.stats_entity_ids
+        )
+        self.models_resource.defer_episode_stats = True
+        self.model_resource.defer_episode_stats = True
+
+    def post_batch(self, results):
+        self.model_resource.defer_episode_stats = False
+        self.model_resource.update_episode_stats()
+        return results
@@ -2,7 +2,18 @@ from flask import abort
 from zou.app.models.time_spent import TimeSpent
 from sqlalchemy import func
 
-from zou.app.blueprints.crud.base import BaseModelsResource, BaseModelResource
+from zou.app.services import shots_service, tasks_service
+
+from zou.app.blueprints.crud.base import (
+    BaseModelsBatchResource,
+    BaseModelResource,
+    BaseModelsResource,
+)
+
+
+def _clear_quotas_cache(time_spent):
+    task = tasks_service.get_task(time_spent["task_id"])
+    shots_service.clear_quotas_cache(task["project_id"])
 
 
 class TimeSpentsResource(BaseModelsResource):
@@ -30,7 +41,27 @@ class TimeSpentsResource(BaseModelsResource):
             func.cast(end_date, TimeSpent.date.type),
         )
 
+    def post_creation(self, instance):
+        time_spent = instance.serialize()
+        _clear_quotas_cache(time_spent)
+        return time_spent
+
 
 class TimeSpentResource(BaseModelResource):
     def __init__(self):
         BaseModelResource.__init__(self, TimeSpent)
+
+    def post_update(self, instance_dict):
+        _clear_quotas_cache(instance_dict)
+        return instance_dict
+
+    def post_delete(self, instance_dict):
+        _clear_quotas_cache(instance_dict)
+        return instance_dict
+
+
+class TimeSpentsBatchResource(BaseModelsBatchResource):
+    def __init__(self):
+        BaseModelsBatchResource.__init__(
+            self, TimeSpentsResource, TimeSpentResource
+        )
@@ -1,8 +1,11 @@
+import datetime
+
 from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required
 
 from zou.app.services import (
+    entities_service,
     persons_service,
     projects_service,
     playlists_service,
@@ -305,6 +308,16 @@ class EditsAndTasksResource(Resource):
             required: False
             type: boolean
             default: False
+          - in: query
+            name: updated_after
+            required: False
+            type: string
+            format: date-time
+            x-example: "2024-01-31T12:00:00.000000"
+            description: Return only edits whose data, tasks or assignations
+                         changed after given date, with the IDs of the edits
+                         deleted since then and the timestamp to use for the
+                         next call.
         responses:
             200:
                 description: All edits and all related tasks.
@@ -319,7 +332,22 @@ class EditsAndTasksResource(Resource):
                 str(department.id)
                 for department in persons_service.get_current_user_raw().departments
             ]
-        return edits_service.get_edits_and_tasks(criterions)
+        updated_after = query.get_updated_after_from_request(request)
+        timestamp = datetime.datetime.utcnow()
+        if updated_after is not None:
+            criterions["updated_after"] = updated_after
+        edits = edits_service.get_edits_and_tasks(
+            criterions, field_names=query.get_fields_from_request(request)
+        )
+        if updated_after is None:
+            return edits
+        return entities_service.get_delta_result(
+            "edit",
+            edits,
+            updated_after,
+            timestamp,
+            project_id=criterions.get("project_id", None),
+        )
 
 
 class ProjectEditsResource(Resource, ArgsMixin):
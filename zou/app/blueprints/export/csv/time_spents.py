@@ -60,6 +60,15 @@ class TimeSpentsCsvExport(BaseCsvExport):
         )
         return query
 
+    def prepare_rows(self, results):
+        self.shot_name_map = names_service.get_full_entity_names(
+            {
+                entity_id
+                for _, _, entity_type_name, entity_id, *_ in results
+                if entity_type_name == "Shot"
+            }
+        )
+
     def build_row(self, time_spent_row):
         (
             time_spent,
@@ -72,7 +81,7 @@ class TimeSpentsCsvExport(BaseCsvExport):
             person_last_name,
         ) = time_spent_row
         if entity_type_name == "Shot":
-            entity_name, _ = names_service.get_full_entity_name(entity_id)
+            entity_name, _ = self.shot_name_map[str(entity_id)]
 
         date = ""
         if time_spent.date is not None:
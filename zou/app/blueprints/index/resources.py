@@ -9,7 +9,7 @@ from flask_restful import Resource
 from zou import __version__
 
 from zou.app import app, config
-from zou.app.utils import permissions, shell
+from zou.app.utils import cache, permissions, shell
 from zou.app.services import projects_service, stats_service
 
 from flask_jwt_extended import jwt_required
@@ -135,13 +135,13 @@ class StatusResource(BaseStatusResource):
 class StatusResourcesResource(BaseStatusResource):
     def get(self):
         """
-        Retrieve date and CPU, memory and jobs stats.
+        Retrieve date and CPU, memory, jobs and cache stats.
         ---
         tags:
           - Index
         responses:
             200:
-                description: Date and CPU, memory and jobs stats
+                description: Date and CPU, memory, jobs and cache stats
         """
         loadavg = list(psutil.getloadavg())
 
@@ -176,6 +176,7 @@ class StatusResourcesResource(BaseStatusResource):
             "cpu": cpu_stats,
             "memory": memory_stats,
             "jobs": job_stats,
+            "cache": cache.get_stats(),
         }
 
 
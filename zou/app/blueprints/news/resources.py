@@ -35,6 +35,7 @@ class NewsMixin:
             page_size=page_size,
             after=after,
             before=before,
+            estimate_total=self.get_bool_parameter("estimate_total"),
         )
         stats = news_service.get_news_stats_for_project(
             project_ids=project_ids,
@@ -109,6 +110,10 @@ class ProjectNewsResource(Resource, NewsMixin, ArgsMixin):
             name: page_size
             type: integer
             x-example: 50
+          - in: query
+            name: estimate_total
+            type: boolean
+            default: False
           - in: query
             name: person_id
             type: string
@@ -172,6 +177,10 @@ class NewsResource(Resource, NewsMixin, ArgsMixin):
             name: page_size
             type: integer
             x-example: 50
+          - in: query
+            name: estimate_total
+            type: boolean
+            default: False
           - in: query
             name: person_id
             type: string
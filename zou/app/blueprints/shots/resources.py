@@ -1,3 +1,5 @@
+import datetime
+
 from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required
@@ -19,6 +21,12 @@ from zou.app.services import (
 
 from zou.app.mixin import ArgsMixin
 from zou.app.utils import fields, query, permissions
+from zou.app.utils.flask import (
+    add_etag,
+    get_request_etag,
+    is_not_modified,
+    not_modified_response,
+)
 
 
 class ShotResource(Resource, ArgsMixin):
@@ -525,6 +533,25 @@ class ShotsAndTasksResource(Resource):
             type: string
             format: UUID
             x-example: a24a6ea4-ce75-4665-a070-57453082c25
+          - in: query
+            name: format
+            required: False
+            type: string
+            x-example: columnar
+            description: Set to columnar to get parallel lists of values
+                         per field for shots and for tasks, instead of a
+                         list of shots. Tasks reference their shot through
+                         its index in the shot lists (entity_index).
+          - in: query
+            name: updated_after
+            required: False
+            type: string
+            format: date-time
+            x-example: "2024-01-31T12:00:00.000000"
+            description: Return only shots whose data, tasks or assignations
+                         changed after given date, with the IDs of the shots
+                         deleted since then and the timestamp to use for the
+                         next call.
         responses:
             200:
                 description: All shots
@@ -539,7 +566,24 @@ class ShotsAndTasksResource(Resource):
                 str(department.id)
                 for department in persons_service.get_current_user_raw().departments
             ]
-        return shots_service.get_shots_and_tasks(criterions)
+        updated_after = query.get_updated_after_from_request(request)
+        timestamp = datetime.datetime.utcnow()
+        if updated_after is not None:
+            criterions["updated_after"] = updated_after
+        shots = shots_service.get_shots_and_tasks(
+            criterions, field_names=query.get_fields_from_request(request)
+        )
+        if request.args.get("format", None) == "columnar":
+            shots = fields.to_columnar(shots)
+        if updated_after is None:
+            return shots
+        return entities_service.get_delta_result(
+            "shot",
+            shots,
+            updated_after,
+            timestamp,
+            project_id=criterions.get("project_id", None),
+        )
 
 
 class SceneAndTasksResource(Resource):
@@ -564,7 +608,9 @@ class SceneAndTasksResource(Resource):
         criterions = query.get_query_criterions_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
         criterions["entity_type_id"] = shots_service.get_scene_type()["id"]
-        return entities_service.get_entities_and_tasks(criterions)
+        return entities_service.get_entities_and_tasks(
+            criterions, field_names=query.get_fields_from_request(request)
+        )
 
 
 class SequenceAndTasksResource(Resource):
@@ -589,7 +635,9 @@ class SequenceAndTasksResource(Resource):
         criterions = query.get_query_criterions_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
         criterions["entity_type_id"] = shots_service.get_sequence_type()["id"]
-        return entities_service.get_entities_and_tasks(criterions)
+        return entities_service.get_entities_and_tasks(
+            criterions, field_names=query.get_fields_from_request(request)
+        )
 
 
 class EpisodeAndTasksResource(Resource):
@@ -614,7 +662,9 @@ class EpisodeAndTasksResource(Resource):
         criterions = query.get_query_criterions_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
         criterions["entity_type_id"] = shots_service.get_episode_type()["id"]
-        return entities_service.get_entities_and_tasks(criterions)
+        return entities_service.get_entities_and_tasks(
+            criterions, field_names=query.get_fields_from_request(request)
+        )
 
 
 class ProjectShotsResource(Resource, ArgsMixin):
@@ -638,8 +688,19 @@ class ProjectShotsResource(Resource, ArgsMixin):
         """
         projects_service.get_project(project_id)
         user_service.check_project_access(project_id)
-        return shots_service.get_shots_for_project(
-            project_id, only_assigned=permissions.has_vendor_permissions()
+        only_assigned = permissions.has_vendor_permissions()
+        etag = get_request_etag(
+            shots_service.get_shots_for_project_version(
+                project_id, only_assigned=only_assigned
+            )
+        )
+        if is_not_modified(etag):
+            return not_modified_response(etag)
+        return add_etag(
+            shots_service.get_shots_for_project(
+                project_id, only_assigned=only_assigned
+            ),
+            etag,
         )
 
     @jwt_required()
@@ -6,7 +6,12 @@ from zou.app.blueprints.source.csv.base import (
 from zou.app.models.entity import Entity
 from zou.app.models.project import ProjectTaskTypeLink
 from zou.app.models.task_type import TaskType
-from zou.app.services import shots_service, projects_service, index_service
+from zou.app.services import (
+    shots_service,
+    projects_service,
+    index_service,
+    stats_service,
+)
 from zou.app.services.tasks_service import (
     create_task,
     create_tasks,
@@ -261,4 +266,5 @@ class ShotsCsvImportResource(BaseCsvProjectImportResource):
         entities = super().run_import(project_id, file_path)
         for task_type in self.task_types_in_project_for_shots:
             create_tasks(task_type.serialize(), self.created_shots)
+        stats_service.update_episode_stats(project_id)
         return entities
@@ -8,6 +8,8 @@ from zou.app.blueprints.tasks.resources import (
     DeleteAllTasksForTaskTypeResource,
     TaskAssignResource,
     TasksAssignResource,
+    TasksBatchAssignResource,
+    TasksBatchUnassignResource,
     ClearAssignationResource,
     PersonRelatedTasksResource,
     PersonTasksResource,
@@ -76,6 +78,8 @@ routes = [
     ("/actions/tasks/<task_id>/assign", TaskAssignResource),
     ("/actions/tasks/clear-assignation", ClearAssignationResource),
     ("/actions/persons/<person_id>/assign", TasksAssignResource),
+    ("/actions/tasks/assign", TasksBatchAssignResource),
+    ("/actions/tasks/unassign", TasksBatchUnassignResource),
     ("/actions/tasks/<task_id>/time-spents/<date>", GetTimeSpentDateResource),
     ("/actions/tasks/<task_id>/time-spents", GetTimeSpentResource),
     (
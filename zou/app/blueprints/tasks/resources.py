@@ -6,7 +6,6 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required
 
 from zou.app.services.exception import (
-    TaskNotFoundException,
     PersonNotFoundException,
     MalformedFileTreeException,
     WrongDateFormatException,
@@ -832,20 +831,11 @@ class ClearAssignationResource(Resource, ArgsMixin):
         """
         (task_ids, person_id) = self.get_arguments()
 
-        tasks = []
-        for task_id in task_ids:
-            try:
-                user_service.check_task_departement_access_for_unassign(
-                    task_id, person_id
-                )
-                tasks_service.clear_assignation(task_id, person_id=person_id)
-                tasks.append(task_id)
-            except permissions.PermissionDenied:
-                pass
-            except TaskNotFoundException:
-                pass
-
-        return tasks
+        assignations = user_service.get_allowed_assignations(
+            task_ids, [person_id], unassign=True
+        )
+        tasks_service.clear_assignations(assignations)
+        return list(dict.fromkeys(task_id for task_id, _ in assignations))
 
     def get_arguments(self):
         args = self.get_args(
@@ -911,29 +901,163 @@ class TasksAssignResource(Resource, ArgsMixin):
             ]
         )
 
-        tasks = []
-        current_user = persons_service.get_current_user()
-        for task_id in args["task_ids"]:
-            try:
-                user_service.check_task_departement_access(task_id, person_id)
-                task = self.assign_task(task_id, person_id, current_user["id"])
-                notifications_service.create_assignation_notification(
-                    task_id, person_id, current_user["id"]
-                )
-                tasks.append(task)
-            except TaskNotFoundException:
-                pass
-            except permissions.PermissionDenied:
-                pass
-            except PersonNotFoundException:
-                return {"error": "Assignee doesn't exist in database."}, 400
-        if len(tasks) > 0:
-            projects_service.add_team_member(tasks[0]["project_id"], person_id)
+        try:
+            return self.assign_tasks(args["task_ids"], [person_id])
+        except PersonNotFoundException:
+            return {"error": "Assignee doesn't exist in database."}, 400
 
+    def assign_tasks(self, task_ids, person_ids):
+        """
+        Assign given persons to given tasks in one transaction, skipping the
+        tasks the current user is not allowed to assign. Notifications are
+        created for new assignations and assignees are added to the project
+        teams.
+        """
+        current_user = persons_service.get_current_user()
+        assignations = user_service.get_allowed_assignations(
+            task_ids, person_ids
+        )
+        tasks, new_assignations = tasks_service.assign_tasks(
+            assignations, current_user["id"]
+        )
+        notifications_service.create_assignation_notifications(
+            new_assignations, current_user["id"]
+        )
+        task_project_ids = {task["id"]: task["project_id"] for task in tasks}
+        for project_id, person_id in dict.fromkeys(
+            (task_project_ids[task_id], person_id)
+            for task_id, person_id in assignations
+        ):
+            projects_service.add_team_member(project_id, person_id)
         return tasks
 
-    def assign_task(self, task_id, person_id, assigner_id):
-        return tasks_service.assign_task(task_id, person_id, assigner_id)
+
+class TasksBatchAssignResource(TasksAssignResource):
+    """
+    Assign given persons to given tasks. Tasks the current user is not
+    allowed to assign are ignored.
+    """
+
+    @jwt_required()
+    def put(self):
+        """
+        Assign given persons to given tasks.
+        ---
+        tags:
+        - Tasks
+        description: All assignations are written in a single transaction.
+                     Wrong task IDs and tasks the current user is not allowed
+                     to assign are ignored.
+        parameters:
+          - in: body
+            name: Assignations
+            description: List of task IDs and list of person IDs
+            schema:
+                type: object
+                required:
+                  - task_ids
+                  - person_ids
+                properties:
+                    task_ids:
+                        type: array
+                        items:
+                            type: string
+                            format: UUID
+                        example: ["a24a6ea4-ce75-4665-a070-57453082c25"]
+                    person_ids:
+                        type: array
+                        items:
+                            type: string
+                            format: UUID
+                        example: ["a24a6ea4-ce75-4665-a070-57453082c25"]
+        responses:
+            200:
+                description: Given tasks assigned to given persons
+            400:
+                description: Assignee non-existent in database
+        """
+        args = self.get_args(
+            [
+                {
+                    "name": "task_ids",
+                    "help": "Tasks list required.",
+                    "required": True,
+                    "action": "append",
+                },
+                {
+                    "name": "person_ids",
+                    "help": "Persons list required.",
+                    "required": True,
+                    "action": "append",
+                },
+            ]
+        )
+        try:
+            return self.assign_tasks(args["task_ids"], args["person_ids"])
+        except PersonNotFoundException:
+            return {"error": "Assignee doesn't exist in database."}, 400
+
+
+class TasksBatchUnassignResource(Resource, ArgsMixin):
+    """
+    Remove given persons from the assignees of given tasks.
+    """
+
+    @jwt_required()
+    def put(self):
+        """
+        Remove given persons from the assignees of given tasks.
+        ---
+        tags:
+        - Tasks
+        description: All assignations are removed in a single transaction.
+                     If no person is given, all assignees are removed. Tasks
+                     the current user is not allowed to unassign are ignored.
+        parameters:
+          - in: body
+            name: Assignations
+            description: List of task IDs and list of person IDs
+            schema:
+                type: object
+                required:
+                  - task_ids
+                properties:
+                    task_ids:
+                        type: array
+                        items:
+                            type: string
+                            format: UUID
+                        example: ["a24a6ea4-ce75-4665-a070-57453082c25"]
+                    person_ids:
+                        type: array
+                        items:
+                            type: string
+                            format: UUID
+                        example: ["a24a6ea4-ce75-4665-a070-57453082c25"]
+        responses:
+            200:
+                description: Removed assignations
+        """
+        args = self.get_args(
+            [
+                {
+                    "name": "task_ids",
+                    "help": "Tasks list required.",
+                    "required": True,
+                    "action": "append",
+                },
+                {"name": "person_ids", "action": "append"},
+            ]
+        )
+        assignations = user_service.get_allowed_assignations(
+            args["task_ids"], args["person_ids"] or [None], unassign=True
+        )
+        return [
+            {"task_id": task_id, "person_id": person_id}
+            for task_id, person_id in tasks_service.clear_assignations(
+                assignations
+            )
+        ]
 
 
 class TaskAssignResource(Resource, ArgsMixin):
@@ -1434,7 +1558,9 @@ class ProjectTasksResource(Resource, ArgsMixin):
         """
         projects_service.get_project(project_id)
         page = self.get_page()
-        return tasks_service.get_tasks_for_project(project_id, page)
+        return tasks_service.get_tasks_for_project(
+            project_id, page, stream=True
+        )
 
 
 class ProjectCommentsResource(Resource, ArgsMixin):
@@ -1465,7 +1591,9 @@ class ProjectCommentsResource(Resource, ArgsMixin):
         """
         projects_service.get_project(project_id)
         page = self.get_page()
-        return tasks_service.get_comments_for_project(project_id, page)
+        return tasks_service.get_comments_for_project(
+            project_id, page, stream=True
+        )
 
 
 class ProjectPreviewFilesResource(Resource, ArgsMixin):
@@ -1494,7 +1622,9 @@ class ProjectPreviewFilesResource(Resource, ArgsMixin):
         """
         projects_service.get_project(project_id)
         page = self.get_page()
-        return files_service.get_preview_files_for_project(project_id, page)
+        return files_service.get_preview_files_for_project(
+            project_id, page, stream=True
+        )
 
 
 class SetTaskMainPreviewResource(Resource):
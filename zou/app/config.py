@@ -23,6 +23,25 @@ AUTH_TOKEN_BLACKLIST_KV_INDEX = 0
 MEMOIZE_DB_INDEX = 1
 KV_EVENTS_DB_INDEX = 2
 KV_JOB_DB_INDEX = 3
+KV_COUNTERS_DB_INDEX = 4
+
+MEMOIZE_LOCAL_CACHE_ENABLED = envtobool("MEMOIZE_LOCAL_CACHE_ENABLED", True)
+MEMOIZE_LOCAL_CACHE_SIZE = int(os.getenv("MEMOIZE_LOCAL_CACHE_SIZE", 2048))
+MEMOIZE_LOCAL_CACHE_TTL = int(os.getenv("MEMOIZE_LOCAL_CACHE_TTL", 30))
+MEMOIZE_REQUEST_CACHE_ENABLED = envtobool(
+    "MEMOIZE_REQUEST_CACHE_ENABLED", True
+)
+MEMOIZE_REQUEST_CACHE_SIZE = int(os.getenv("MEMOIZE_REQUEST_CACHE_SIZE", 4096))
+MEMOIZE_REQUEST_CACHE_TTL = int(os.getenv("MEMOIZE_REQUEST_CACHE_TTL", 300))
+MEMOIZE_SINGLE_FLIGHT_ENABLED = envtobool(
+    "MEMOIZE_SINGLE_FLIGHT_ENABLED", True
+)
+MEMOIZE_SINGLE_FLIGHT_WAIT = float(os.getenv("MEMOIZE_SINGLE_FLIGHT_WAIT", 1))
+MEMOIZE_STALE_TTL = int(os.getenv("MEMOIZE_STALE_TTL", 60))
+MEMOIZE_SERIALIZER = os.getenv("MEMOIZE_SERIALIZER", "auto")
+MEMOIZE_COMPRESSION_THRESHOLD = int(
+    os.getenv("MEMOIZE_COMPRESSION_THRESHOLD", 4096)
+)
 
 JWT_BLACKLIST_ENABLED = True
 JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]
@@ -61,6 +80,9 @@ INDEXER = {
 }
 
 NB_RECORDS_PER_PAGE = int(os.getenv("NB_RECORDS_PER_PAGE", 100))
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", 1000))
+ESTIMATED_TOTAL_THRESHOLD = int(os.getenv("ESTIMATED_TOTAL_THRESHOLD", 10000))
+EXACT_TOTAL_CACHE_TTL = int(os.getenv("EXACT_TOTAL_CACHE_TTL", 30))
 
 PREVIEW_FOLDER = os.getenv(
     "PREVIEW_FOLDER",
@@ -142,6 +164,12 @@ SENTRY_SR = float(os.getenv("SENTRY_SR", 1.0))
 SENTRY_DEBUG_URL = os.getenv("SENTRY_DEBUG_URL", False)
 
 PROMETHEUS_METRICS_ENABLED = envtobool("PROMETHEUS_METRICS_ENABLED", False)
+SQL_MONITORING_ENABLED = envtobool(
+    "SQL_MONITORING_ENABLED", DEBUG or PROMETHEUS_METRICS_ENABLED
+)
+SQL_REPEATED_STATEMENT_THRESHOLD = int(
+    os.getenv("SQL_REPEATED_STATEMENT_THRESHOLD", 20)
+)
 
 CRISP_TOKEN = os.getenv("CRISP_TOKEN", "")
 IS_SELF_HOSTED = envtobool("IS_SELF_HOSTED", True)
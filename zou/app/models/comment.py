@@ -118,6 +118,14 @@ class Comment(db.Model, BaseMixin, SerializerMixin):
     )
     attachment_files = db.relationship("AttachmentFile", backref="comment")
 
+    __table_args__ = (
+        db.Index(
+            "ix_comment_object_id_created_at",
+            "object_id",
+            db.text("created_at DESC"),
+        ),
+    )
+
     def __repr__(self):
         return "<Comment of %s>" % self.object_id
 
@@ -0,0 +1,41 @@
+from sqlalchemy_utils import UUIDType
+from zou.app import db
+from zou.app.models.serializer import SerializerMixin
+from zou.app.models.base import BaseMixin
+
+
+class EpisodeTaskStat(db.Model, BaseMixin, SerializerMixin):
+    """
+    Number of tasks and number of frames of their shots for a given episode,
+    task type, task status and retake count. It's a summary of the task
+    table kept up to date when tasks or shots change, so episode stats don't
+    require to aggregate all the tasks of a production.
+    """
+
+    count = db.Column(db.Integer, default=0)
+    frames = db.Column(db.Integer, default=0)
+    retake_count = db.Column(db.Integer, default=0)
+
+    project_id = db.Column(
+        UUIDType(binary=False), db.ForeignKey("project.id"), index=True
+    )
+    episode_id = db.Column(
+        UUIDType(binary=False), db.ForeignKey("entity.id"), index=True
+    )
+    task_type_id = db.Column(
+        UUIDType(binary=False), db.ForeignKey("task_type.id")
+    )
+    task_status_id = db.Column(
+        UUIDType(binary=False), db.ForeignKey("task_status.id")
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "project_id",
+            "episode_id",
+            "task_type_id",
+            "task_status_id",
+            "retake_count",
+            name="episode_task_stat_uc",
+        ),
+    )
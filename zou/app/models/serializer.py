@@ -1,7 +1,124 @@
+import itertools
+import sqlalchemy as sa
 import sqlalchemy.orm as orm
 from sqlalchemy.inspection import inspect
+from sqlalchemy_utils import ChoiceType, UUIDType
+from zou.app.utils import fields
 from zou.app.utils.fields import serialize_value
 
+compiled_serializers = {}
+compiled_row_serializers = {}
+
+RELATIONS_CHUNK_SIZE = 1000
+
+
+def get_column_serializer(prop):
+    """
+    Return the function to use to serialize values of given model attribute.
+    Every function falls back on serialize_value for unexpected values, so
+    the output is the same as calling serialize_value directly.
+    """
+    if not is_single_column(prop):
+        return serialize_value
+    column_type = prop.columns[0].type
+    if isinstance(column_type, UUIDType):
+        return fields.serialize_uuid
+    elif isinstance(column_type, sa.DateTime):
+        return fields.serialize_datetime
+    elif isinstance(column_type, sa.Date):
+        return fields.serialize_date
+    elif isinstance(column_type, ChoiceType):
+        return fields.serialize_choice
+    elif isinstance(
+        column_type, (sa.String, sa.Integer, sa.Float, sa.Boolean)
+    ):
+        return fields.serialize_scalar
+    else:
+        return serialize_value
+
+
+def is_single_column(prop):
+    return isinstance(prop, orm.ColumnProperty) and len(prop.columns) == 1
+
+
+def compile_serializer(model_class):
+    """
+    Build the list of (attribute, serializer, is join) tuples of given model
+    class. It's done once per class to avoid inspecting the model and
+    checking value types for every serialized row.
+    """
+    orm.configure_mappers()
+    mapper = inspect(model_class)
+    attributes = []
+    for attr in mapper.class_manager.keys():
+        prop = mapper.attrs.get(attr, None)
+        is_join = isinstance(
+            getattr(model_class, attr).impl,
+            orm.attributes.CollectionAttributeImpl,
+        )
+        attributes.append((attr, get_column_serializer(prop), is_join))
+    compiled_serializers[model_class] = attributes
+    return attributes
+
+
+def get_relation_link(prop):
+    """
+    Return the (parent id column, related id column) pair that allows to list
+    the ids of a collection directly from the link table. None is returned
+    when the relationship is too specific to be read that way.
+    """
+    if not isinstance(prop, orm.RelationshipProperty) or prop.order_by:
+        return None
+    if len(prop.synchronize_pairs) != 1:
+        return None
+    parent_column, link_column = prop.synchronize_pairs[0]
+    if parent_column.key != "id":
+        return None
+    if prop.direction is orm.interfaces.MANYTOMANY:
+        secondary_pairs = prop.secondary_synchronize_pairs
+        if len(secondary_pairs) != 1:
+            return None
+        related_column, related_link_column = secondary_pairs[0]
+        if related_column.key != "id":
+            return None
+        return (link_column, related_link_column)
+    elif prop.direction is orm.interfaces.ONETOMANY:
+        primary_key = prop.mapper.primary_key
+        if len(primary_key) != 1 or primary_key[0].key != "id":
+            return None
+        return (link_column, primary_key[0])
+    else:
+        return None
+
+
+def compile_row_serializer(model_class):
+    """
+    Build what is needed to serialize the model from plain result rows:
+    the list of (attribute, serializer) of its columns and the list of
+    (attribute, link) of its collections. None is returned when the model
+    can't be serialized that way (custom serialize method, attributes that
+    are not plain columns...). Links are None when a collection can't be
+    read from its link table.
+    """
+    row_serializer = None
+    if model_class.serialize is SerializerMixin.serialize:
+        mapper = inspect(model_class)
+        columns = []
+        relations = []
+        for attr, serialize_attr, is_join in model_class.get_serializer():
+            prop = mapper.attrs.get(attr, None)
+            if is_join:
+                relations.append((attr, get_relation_link(prop)))
+            elif is_single_column(prop):
+                columns.append((attr, serialize_attr))
+            else:
+                columns = None
+                break
+        if columns is not None:
+            row_serializer = (columns, relations)
+    compiled_row_serializers[model_class] = row_serializer
+    return row_serializer
+
 
 class SerializerMixin(object):
     """
@@ -14,23 +131,25 @@ class SerializerMixin(object):
             orm.attributes.CollectionAttributeImpl,
         )
 
+    @classmethod
+    def get_serializer(cls):
+        attributes = compiled_serializers.get(cls, None)
+        if attributes is None:
+            attributes = compile_serializer(cls)
+        return attributes
+
+    @classmethod
+    def get_row_serializer(cls):
+        if cls in compiled_row_serializers:
+            return compiled_row_serializers[cls]
+        return compile_row_serializer(cls)
+
     def serialize(self, obj_type=None, relations=False, milliseconds=False):
-        attrs = inspect(self).attrs.keys()
-        if relations:
-            obj_dict = {
-                attr: serialize_value(
-                    getattr(self, attr), milliseconds=milliseconds
-                )
-                for attr in attrs
-            }
-        else:
-            obj_dict = {
-                attr: serialize_value(
-                    getattr(self, attr), milliseconds=milliseconds
-                )
-                for attr in attrs
-                if not self.is_join(attr)
-            }
+        obj_dict = {
+            attr: serialize_attr(getattr(self, attr), milliseconds)
+            for attr, serialize_attr, is_join in self.get_serializer()
+            if relations or not is_join
+        }
         obj_dict["type"] = obj_type or type(self).__name__
         return obj_dict
 
@@ -46,3 +165,155 @@ class SerializerMixin(object):
             )
             for model in models
         ]
+
+    @classmethod
+    def serialize_query(
+        cls,
+        query,
+        obj_type=None,
+        relations=False,
+        milliseconds=False,
+        field_names=None,
+    ):
+        """
+        Serialize models selected by given query. When the model allows it,
+        only its columns are selected and dicts are built straight from the
+        result rows. It avoids building ORM instances, registering them in the
+        session and loading their relations one by one. Collections are then
+        read from their link tables.
+        """
+        return list(
+            cls.iter_serialized_query(
+                query,
+                obj_type=obj_type,
+                relations=relations,
+                milliseconds=milliseconds,
+                field_names=field_names,
+            )
+        )
+
+    @classmethod
+    def iter_serialized_query(
+        cls,
+        query,
+        obj_type=None,
+        relations=False,
+        milliseconds=False,
+        chunk_size=None,
+        field_names=None,
+    ):
+        """
+        Generate serialized models selected by given query, like
+        serialize_query does. If a chunk size is given, rows are fetched from
+        the database by chunks of that size, so memory used doesn't depend on
+        the number of results. If field names are given, only these columns
+        are selected and serialized.
+        """
+        row_serializer = cls.get_row_serializer()
+        if row_serializer is not None and relations:
+            if any(
+                link is None
+                for attr, link in row_serializer[1]
+                if field_names is None or attr in field_names
+            ):
+                row_serializer = None
+        if row_serializer is None:
+            if chunk_size and not cls.has_joined_collections():
+                query = query.yield_per(chunk_size)
+            for model in query:
+                yield fields.filter_fields(
+                    model.serialize(
+                        obj_type=obj_type,
+                        relations=relations,
+                        milliseconds=milliseconds,
+                    ),
+                    field_names,
+                )
+            return
+
+        columns, relation_links = row_serializer
+        attributes = cls.get_serializer()
+        if field_names is not None:
+            columns = [
+                column for column in columns if column[0] in field_names
+            ]
+            relation_links = [
+                link for link in relation_links if link[0] in field_names
+            ]
+            attributes = [
+                attr for attr in attributes if attr[0] in field_names
+            ]
+        relations = relations and len(relation_links) > 0
+        hide_id = "id" not in [attr for attr, _ in columns] and (
+            relations or len(columns) == 0
+        )
+        if hide_id:
+            columns = columns + [("id", serialize_value)]
+        obj_type = obj_type or cls.__name__
+        rows = query.with_entities(
+            *[getattr(cls, attr) for attr, _ in columns]
+        )
+        if chunk_size:
+            rows = iter(rows.yield_per(chunk_size))
+        else:
+            rows = iter(rows.all())
+
+        while True:
+            chunk = list(
+                itertools.islice(rows, chunk_size or RELATIONS_CHUNK_SIZE)
+            )
+            if not chunk:
+                break
+            if relations:
+                relation_ids = cls.get_relation_ids(
+                    query.session, relation_links, [row.id for row in chunk]
+                )
+            for row in chunk:
+                obj_dict = {
+                    attr: serialize_attr(value, milliseconds)
+                    for (attr, serialize_attr), value in zip(columns, row)
+                }
+                if relations:
+                    obj_dict = {
+                        attr: (
+                            relation_ids[attr].get(row.id, [])
+                            if is_join
+                            else obj_dict[attr]
+                        )
+                        for attr, _, is_join in attributes
+                    }
+                elif hide_id:
+                    del obj_dict["id"]
+                obj_dict["type"] = obj_type
+                yield obj_dict
+
+    @staticmethod
+    def get_relation_ids(session, relation_links, ids):
+        """
+        Read ids of related models of given rows from link tables. Result is
+        a dict of dicts: relation attribute -> row id -> related ids.
+        """
+        relation_ids = {}
+        for attr, (link_column, related_column) in relation_links:
+            relation_ids[attr] = {}
+            links = session.execute(
+                sa.select(link_column, related_column).where(
+                    link_column.in_(ids)
+                )
+            )
+            for parent_id, related_id in links:
+                relation_ids[attr].setdefault(parent_id, []).append(
+                    str(related_id)
+                )
+        return relation_ids
+
+    @classmethod
+    def has_joined_collections(cls):
+        """
+        Tell if collections of the model are eager loaded with joins, which
+        prevents results from being fetched by chunks.
+        """
+        return any(
+            relationship.uselist and relationship.lazy == "joined"
+            for relationship in inspect(cls).relationships
+        )
@@ -68,6 +68,7 @@ class Task(db.Model, BaseMixin, SerializerMixin):
         db.UniqueConstraint(
             "name", "project_id", "task_type_id", "entity_id", name="task_uc"
         ),
+        db.Index("ix_task_updated_at_id", "updated_at", "id"),
     )
 
     def assignees_as_string(self):
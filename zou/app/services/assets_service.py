@@ -1,6 +1,6 @@
 from sqlalchemy import or_
 from sqlalchemy.exc import StatementError
-from sqlalchemy.orm import aliased
+from sqlalchemy.orm import aliased, defer
 
 from zou.app.utils import events, fields, cache
 from zou.app.utils import query as query_utils
@@ -34,13 +34,11 @@ from zou.app.services.exception import (
 
 
 def clear_asset_cache(asset_id):
-    cache.cache.delete_memoized(get_asset, asset_id)
-    cache.cache.delete_memoized(get_asset_with_relations, asset_id)
-    cache.cache.delete_memoized(get_full_asset, asset_id)
+    cache.invalidate_tags("entity:%s" % asset_id)
 
 
 def clear_asset_type_cache():
-    cache.cache.delete_memoized(get_asset_types)
+    cache.invalidate_tags("entity_type:*")
 
 
 def get_temporal_type_ids():
@@ -178,9 +176,12 @@ def get_full_assets(criterions={}):
     return assets
 
 
-def get_assets_and_tasks(criterions={}, page=1, with_episode_ids=False):
+def get_assets_and_tasks(
+    criterions={}, page=1, with_episode_ids=False, field_names=None
+):
     """
     Get all assets for given criterions with related tasks for each asset.
+    If field names are given, only these fields are returned for assets.
     """
     asset_map = {}
     task_map = {}
@@ -236,6 +237,13 @@ def get_assets_and_tasks(criterions={}, page=1, with_episode_ids=False):
                 )
             )
 
+    if "updated_after" in criterions:
+        tasks_query = tasks_query.filter(
+            entities_service.build_updated_after_filter(
+                criterions["updated_after"]
+            )
+        )
+
     if "assigned_to" in criterions:
         tasks_query = tasks_query.filter(user_service.build_assignee_filter())
         del criterions["assigned_to"]
@@ -262,6 +270,10 @@ def get_assets_and_tasks(criterions={}, page=1, with_episode_ids=False):
                 str(link.entity_in_id)
             )
 
+    load_data = entities_service.needs_entity_data(field_names)
+    if not load_data:
+        tasks_query = tasks_query.options(defer(Entity.data))
+
     query_result = tasks_query.all()
 
     if "vendor_departments" in criterions:
@@ -298,7 +310,9 @@ def get_assets_and_tasks(criterions={}, page=1, with_episode_ids=False):
         asset_id = str(asset.id)
 
         if asset_id not in asset_map:
-            data = fields.serialize_value(asset.data or {})
+            data = {}
+            if load_data:
+                data = fields.serialize_value(asset.data or {})
             if "vendor_departments" in criterions:
                 data = (
                     entities_service.remove_not_allowed_fields_from_metadata(
@@ -354,10 +368,13 @@ def get_assets_and_tasks(criterions={}, page=1, with_episode_ids=False):
             if person_id:
                 task_map[task_id]["assignees"].append(str(person_id))
 
-    return list(asset_map.values())
+    return [
+        fields.filter_fields(asset, field_names)
+        for asset in asset_map.values()
+    ]
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(240, tags=["entity_type:*"])
 def get_asset_types(criterions={}):
     """
     Retrieve all asset types available.
@@ -417,7 +434,7 @@ def get_asset_raw(entity_id):
     return entity
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{entity_id}"])
 def get_asset(entity_id):
     """
     Return a given asset as a dict.
@@ -425,7 +442,7 @@ def get_asset(entity_id):
     return get_asset_raw(entity_id).serialize(obj_type="Asset")
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{entity_id}"])
 def get_asset_with_relations(entity_id):
     """
     Return a given asset as a dict.
@@ -472,7 +489,7 @@ def get_raw_asset_by_shotgun_id(shotgun_id):
     return get_asset_raw(asset["id"])
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{asset_id}"])
 def get_full_asset(asset_id):
     """
     Return asset matching given id with additional information (project name,
@@ -527,7 +544,7 @@ def get_asset_type_raw(asset_type_id):
     return asset_type
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(240, tags=["entity_type:{asset_type_id}"])
 def get_asset_type(asset_type_id):
     """
     Return given asset type instance as a dict.
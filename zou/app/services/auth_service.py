@@ -252,7 +252,7 @@ def update_login_failed_attemps(
     if last_login_failed is not None:
         person.last_login_failed = last_login_failed
     person.commit()
-    persons_service.clear_person_cache()
+    persons_service.clear_person_cache(person.id)
     return person.serialize()
 
 
@@ -314,7 +314,7 @@ def remove_otp_revovery_code(person_id, recovery_hash):
     person.otp_recovery_codes.remove(recovery_hash.encode())
     flag_modified(person, "otp_recovery_codes")
     person.commit()
-    persons_service.clear_person_cache()
+    persons_service.clear_person_cache(person.id)
     return person.serialize()
 
 
@@ -387,7 +387,7 @@ def pre_enable_totp(person_id):
         )
         person.totp_enabled = False
         person.commit()
-        persons_service.clear_person_cache()
+        persons_service.clear_person_cache(person.id)
         return totp_provisionning_uri, person.totp_secret
 
 
@@ -407,7 +407,7 @@ def enable_totp(person_id, totp):
         if not person.preferred_two_factor_authentication:
             person.preferred_two_factor_authentication = "totp"
         person.commit()
-        persons_service.clear_person_cache()
+        persons_service.clear_person_cache(person.id)
         return otp_recovery_codes
     else:
         raise WrongOTPException
@@ -431,7 +431,7 @@ def disable_totp(person_id):
         elif person.email_otp_enabled:
             person.preferred_two_factor_authentication = "email_otp"
     person.commit()
-    persons_service.clear_person_cache()
+    persons_service.clear_person_cache(person.id)
     return True
 
 
@@ -447,7 +447,7 @@ def pre_enable_email_otp(person_id):
         person.email_otp_enabled = False
         person.commit()
         send_email_otp(person.serialize())
-        persons_service.clear_person_cache()
+        persons_service.clear_person_cache(person.id)
         return True
 
 
@@ -467,7 +467,7 @@ def enable_email_otp(person_id, email_otp):
         if not person.preferred_two_factor_authentication:
             person.preferred_two_factor_authentication = "email_otp"
         person.commit()
-        persons_service.clear_person_cache()
+        persons_service.clear_person_cache(person.id)
         return otp_recovery_codes
     else:
         raise WrongOTPException
@@ -491,7 +491,7 @@ def disable_email_otp(person_id):
         elif person.totp_enabled:
             person.preferred_two_factor_authentication = "totp"
     person.commit()
-    persons_service.clear_person_cache()
+    persons_service.clear_person_cache(person.id)
     return True
 
 
@@ -618,7 +618,7 @@ def register_fido(person_id, registration_response, device_name):
     if not person.preferred_two_factor_authentication:
         person.preferred_two_factor_authentication = "fido"
     person.commit()
-    persons_service.clear_person_cache()
+    persons_service.clear_person_cache(person.id)
     return otp_recovery_codes
 
 
@@ -643,7 +643,7 @@ def unregister_fido(person_id, device_name):
         elif person.email_otp_enabled:
             person.preferred_two_factor_authentication = "email_otp"
     person.commit()
-    persons_service.clear_person_cache()
+    persons_service.clear_person_cache(person.id)
     return True
 
 
@@ -674,7 +674,7 @@ def disable_two_factor_authentication_for_person(person_id):
     person.otp_recovery_codes = None
     person.preferred_two_factor_authentication = None
     person.commit()
-    persons_service.clear_person_cache()
+    persons_service.clear_person_cache(person.id)
     return True
 
 
@@ -687,7 +687,7 @@ def generate_new_recovery_codes(person_id):
     person.otp_recovery_codes = hash_recovery_codes(otp_recovery_codes)
     flag_modified(person, "otp_recovery_codes")
     person.commit()
-    persons_service.clear_person_cache()
+    persons_service.clear_person_cache(person.id)
     return otp_recovery_codes
 
 
@@ -24,6 +24,7 @@ from zou.app.services import (
     notifications_service,
     persons_service,
     projects_service,
+    stats_service,
     tasks_service,
 )
 from zou.app.services.exception import (
@@ -271,6 +272,7 @@ def new_comment(
         created_at=created_at_date,
     )
 
+    stats_service.update_comment_stats(1)
     comment = comment.serialize(relations=True)
     add_attachments_to_comment(comment, files)
     events.emit(
@@ -3,9 +3,9 @@ from zou.app.utils import cache, fields
 
 
 def clear_custom_action_cache():
-    cache.cache.delete_memoized(get_custom_actions)
+    cache.invalidate_tags("custom_action:*")
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["custom_action:*"])
 def get_custom_actions():
     return fields.serialize_models(CustomAction.get_all())
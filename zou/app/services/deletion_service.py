@@ -6,6 +6,7 @@ from zou.app.models.attachment_file import AttachmentFile
 from zou.app.models.comment import Comment
 from zou.app.models.desktop_login_log import DesktopLoginLog
 from zou.app.models.entity import Entity, EntityLink, EntityVersion
+from zou.app.models.episode_task_stat import EpisodeTaskStat
 from zou.app.models.event import ApiEvent
 from zou.app.models.metadata_descriptor import MetadataDescriptor
 from zou.app.models.login_log import LoginLog
@@ -43,6 +44,8 @@ def remove_comment(comment_id):
     Remove a comment from database and everything related (notifs, news, and
     preview files)
     """
+    from zou.app.services import stats_service
+
     comment = Comment.get(comment_id)
     if comment is not None:
         task = Task.get(comment.object_id)
@@ -63,6 +66,7 @@ def remove_comment(comment_id):
         previews = [preview for preview in comment.previews]
         attachments = [attachment for attachment in comment.attachment_files]
         comment.delete()
+        stats_service.update_comment_stats(-1)
 
         for preview in previews:
             remove_preview_file(preview)
@@ -81,12 +85,14 @@ def remove_comment(comment_id):
         raise CommentNotFoundException
 
 
-def remove_task(task_id, force=False):
+def remove_task(task_id, force=False, update_stats=True):
     """
     Remove given task. Force deletion if the task has some comments and files
-    related. This will lead to the deletion of all of them.
+    related. This will lead to the deletion of all of them. Callers removing
+    many tasks can disable the episode stats update and do it once at the
+    end.
     """
-    from zou.app.services import tasks_service
+    from zou.app.services import stats_service, tasks_service
 
     task = Task.get(task_id)
     if force:
@@ -108,6 +114,7 @@ def remove_task(task_id, force=False):
             for news in news_list:
                 news.delete()
             comment.delete()
+            stats_service.update_comment_stats(-1)
 
         subscriptions = Subscription.query.filter_by(task_id=task_id)
         for subscription in subscriptions:
@@ -132,6 +139,10 @@ def remove_task(task_id, force=False):
     task.delete()
     tasks_service.clear_task_cache(task_id)
     task_serialized = task.serialize()
+    if update_stats:
+        stats_service.update_episode_stats_for_entities(
+            [task_serialized["entity_id"]]
+        )
     events.emit(
         "task:delete",
         {
@@ -154,6 +165,8 @@ def remove_preview_file(preview_file):
     Remove all files related to given preview file, then remove the preview file
     entry from the database.
     """
+    from zou.app.services import stats_service
+
     task = Task.get(preview_file.task_id)
     entity = Entity.get(task.entity_id)
     news = News.get_by(preview_file_id=preview_file.id)
@@ -175,6 +188,9 @@ def remove_preview_file(preview_file):
     preview_file.comments = []
     preview_file.save()
     preview_file.delete()
+    stats_service.update_preview_stats(
+        previous_extension=preview_file.extension
+    )
     return preview_file.serialize()
 
 
@@ -286,12 +302,17 @@ def remove_tasks(project_id, task_ids):
     Remove fully given tasks and related for given project. The project id
     filter is there to facilitate right management.
     """
+    from zou.app.services import stats_service
+
     task_ids = [task_id for task_id in task_ids if fields.is_valid_id(task_id)]
     tasks = Task.query.filter(Project.id == project_id).filter(
         Task.id.in_(task_ids)
     )
+    entity_ids = set()
     for task in tasks:
-        remove_task(task.id, force=True)
+        remove_task(task.id, force=True, update_stats=False)
+        entity_ids.add(task.entity_id)
+    stats_service.update_episode_stats_for_entities(list(entity_ids))
     return task_ids
 
 
@@ -299,22 +320,29 @@ def remove_tasks_for_project_and_task_type(project_id, task_type_id):
     """
     Remove fully all tasks and related for given project and task type.
     """
+    from zou.app.services import stats_service
+
     tasks = Task.query.filter_by(
         project_id=project_id, task_type_id=task_type_id
     )
     task_ids = []
+    entity_ids = set()
     for task in tasks:
-        remove_task(task.id, force=True)
+        remove_task(task.id, force=True, update_stats=False)
         task_ids.append(str(task.id))
+        entity_ids.add(task.entity_id)
+    stats_service.update_episode_stats_for_entities(list(entity_ids))
     return task_ids
 
 
 def remove_project(project_id):
     from zou.app.services import playlists_service
 
+    # Episode stats of the project are dropped below, there is no need to
+    # update them.
     tasks = Task.query.filter_by(project_id=project_id)
     for task in tasks:
-        remove_task(task.id, force=True)
+        remove_task(task.id, force=True, update_stats=False)
 
     query = EntityLink.query.join(
         Entity, EntityLink.entity_in_id == Entity.id
@@ -335,6 +363,7 @@ def remove_project(project_id):
         playlists_service.remove_playlist(playlist.id)
 
     ApiEvent.delete_all_by(project_id=project_id)
+    EpisodeTaskStat.delete_all_by(project_id=project_id)
     Entity.delete_all_by(project_id=project_id)
     MetadataDescriptor.delete_all_by(project_id=project_id)
     Milestone.delete_all_by(project_id=project_id)
@@ -444,18 +473,29 @@ def remove_episode(episode_id, force=False):
     """
     Remove an episode and all related sequences and shots.
     """
-    from zou.app.services import shots_service, assets_service, tasks_service
+    from zou.app.services import (
+        shots_service,
+        assets_service,
+        stats_service,
+        tasks_service,
+    )
 
     episode = shots_service.get_episode_raw(episode_id)
     if force:
         for sequence in Entity.get_all_by(parent_id=episode_id):
-            shots_service.remove_sequence(sequence.id, force=True)
+            shots_service.remove_sequence(
+                sequence.id, force=True, update_stats=False
+            )
         for asset in Entity.get_all_by(source_id=episode_id):
             assets_service.remove_asset(asset.id, force=True)
         tasks = Task.query.filter_by(entity_id=episode_id).all()
         for task in tasks:
-            remove_task(task.id, force=True)
+            remove_task(task.id, force=True, update_stats=False)
             tasks_service.clear_task_cache(str(task.id))
+        # No task is left in the episode: it drops its stored stats.
+        stats_service.update_episode_stats(
+            str(episode.project_id), [episode_id]
+        )
         Playlist.delete_all_by(episode_id=episode_id)
         ScheduleItem.delete_all_by(object_id=episode_id)
     try:
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import aliased
+from sqlalchemy.orm import aliased, defer
 from sqlalchemy.exc import StatementError
 
 from zou.app.utils import (
@@ -27,12 +27,10 @@ from zou.app.services.exception import (
 
 
 def clear_edit_cache(edit_id):
-    cache.cache.delete_memoized(get_edit, edit_id)
-    cache.cache.delete_memoized(get_edit_with_relations, edit_id)
-    cache.cache.delete_memoized(get_full_edit, edit_id)
+    cache.invalidate_tags("entity:%s" % edit_id)
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, tags=["entity_type:{result[id]}"])
 def get_edit_type():
     return entities_service.get_temporal_entity_type_by_name("Edit")
 
@@ -69,9 +67,10 @@ def get_edits(criterions={}):
     return edits
 
 
-def get_edits_and_tasks(criterions={}):
+def get_edits_and_tasks(criterions={}, field_names=None):
     """
     Get all edits for given criterions with related tasks for each edit.
+    If field names are given, only these fields are returned for edits.
     """
     edit_type = get_edit_type()
     edit_map = {}
@@ -117,10 +116,21 @@ def get_edits_and_tasks(criterions={}):
     if "episode_id" in criterions:
         query = query.filter(Entity.parent_id == criterions["episode_id"])
 
+    if "updated_after" in criterions:
+        query = query.filter(
+            entities_service.build_updated_after_filter(
+                criterions["updated_after"]
+            )
+        )
+
     if "assigned_to" in criterions:
         query = query.filter(user_service.build_assignee_filter())
         del criterions["assigned_to"]
 
+    load_data = entities_service.needs_entity_data(field_names)
+    if not load_data:
+        query = query.options(defer(Entity.data))
+
     query_result = query.all()
 
     if "vendor_departments" in criterions:
@@ -156,7 +166,9 @@ def get_edits_and_tasks(criterions={}):
         edit_id = str(edit.id)
 
         if edit_id not in edit_map:
-            data = fields.serialize_value(edit.data or {})
+            data = {}
+            if load_data:
+                data = fields.serialize_value(edit.data or {})
             if "vendor_departments" in criterions:
                 data = (
                     entities_service.remove_not_allowed_fields_from_metadata(
@@ -216,7 +228,9 @@ def get_edits_and_tasks(criterions={}):
             if person_id:
                 task_map[task_id]["assignees"].append(str(person_id))
 
-    return list(edit_map.values())
+    return [
+        fields.filter_fields(edit, field_names) for edit in edit_map.values()
+    ]
 
 
 def get_edit_raw(edit_id):
@@ -235,7 +249,7 @@ def get_edit_raw(edit_id):
     return edit
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{edit_id}"])
 def get_edit(edit_id):
     """
     Return given edit as a dictionary.
@@ -243,7 +257,7 @@ def get_edit(edit_id):
     return get_edit_raw(edit_id).serialize(obj_type="Edit")
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{edit_id}"])
 def get_edit_with_relations(edit_id):
     """
     Return given edit as a dictionary.
@@ -251,7 +265,7 @@ def get_edit_with_relations(edit_id):
     return get_edit_raw(edit_id).serialize(obj_type="Edit", relations=True)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{edit_id}"])
 def get_full_edit(edit_id):
     """
     Return given edit as a dictionary with extra data like project.
@@ -1,3 +1,6 @@
+from sqlalchemy import or_, select
+from sqlalchemy.orm import defer
+
 from zou.app.services import (
     base_service,
     projects_service,
@@ -13,6 +16,7 @@ from zou.app.utils import (
 
 from zou.app.models.entity import Entity, EntityLink
 from zou.app.models.entity_type import EntityType
+from zou.app.models.event import ApiEvent
 from zou.app.models.preview_file import PreviewFile
 from zou.app.models.task import assignees_table
 from zou.app.models.task import Task
@@ -26,12 +30,11 @@ from zou.app.services.exception import (
 
 
 def clear_entity_cache(entity_id):
-    cache.cache.delete_memoized(get_entity, entity_id)
+    cache.invalidate_tags("entity:%s" % entity_id)
 
 
 def clear_entity_type_cache(entity_type_id):
-    cache.cache.delete_memoized(get_entity_type, entity_type_id)
-    cache.cache.delete_memoized(get_entity_type_by_name)
+    cache.invalidate_tags("entity_type:%s" % entity_type_id)
 
 
 def get_temporal_entity_type_by_name(name):
@@ -42,7 +45,7 @@ def get_temporal_entity_type_by_name(name):
     return entity_type
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(240, tags=["entity_type:{entity_type_id}"])
 def get_entity_type(entity_type_id):
     """
     Return an entity type matching given id, as a dict. Raises an exception
@@ -53,7 +56,7 @@ def get_entity_type(entity_type_id):
     ).serialize()
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(240, tags=["entity_type:{result[id]}"])
 def get_entity_type_by_name(name):
     """
     Return entity type maching *name*. If it doesn't exist, it creates it.
@@ -64,7 +67,7 @@ def get_entity_type_by_name(name):
     return entity_type.serialize()
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(240, tags=["entity_type:{result[id]}"])
 def get_entity_type_by_name_or_not_found(name):
     """
     Return entity type maching *name*. If it doesn't exist, it creates it.
@@ -93,7 +96,7 @@ def get_entity_raw(entity_id):
     )
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{entity_id}"])
 def get_entity(entity_id):
     """
     Return an entity type matching given id, as a dict. Raises an exception if
@@ -147,6 +150,35 @@ def get_entities_for_project(
     Retrieve all entities related to given project of which entity is entity
     type.
     """
+    query = build_entities_for_project_query(
+        project_id,
+        entity_type_id,
+        episode_id=episode_id,
+        only_assigned=only_assigned,
+    )
+    result = query.all()
+    return Entity.serialize_list(result, obj_type=obj_type)
+
+
+def get_entities_for_project_version(
+    project_id, entity_type_id, episode_id=None, only_assigned=False
+):
+    """
+    Return the version of the entities returned by get_entities_for_project
+    for the same arguments. It changes when one of them is modified.
+    """
+    query = build_entities_for_project_query(
+        project_id,
+        entity_type_id,
+        episode_id=episode_id,
+        only_assigned=only_assigned,
+    )
+    return query_utils.get_query_version(Entity, query)
+
+
+def build_entities_for_project_query(
+    project_id, entity_type_id, episode_id=None, only_assigned=False
+):
     from zou.app.services import user_service
 
     query = (
@@ -162,8 +194,7 @@ def get_entities_for_project(
         query = query.outerjoin(Task).filter(
             user_service.build_assignee_filter()
         )
-    result = query.all()
-    return Entity.serialize_list(result, obj_type=obj_type)
+    return query
 
 
 def get_entity_links_for_project(
@@ -216,9 +247,20 @@ def get_entity_links_for_project(
     return results
 
 
-def get_entities_and_tasks(criterions={}):
+def needs_entity_data(field_names):
+    """
+    Tell if the data column of entities must be loaded to build given fields.
+    """
+    return field_names is None or any(
+        field_name in field_names
+        for field_name in ["data", "fps", "frame_in", "frame_out"]
+    )
+
+
+def get_entities_and_tasks(criterions={}, field_names=None):
     """
     Get all entities for given criterions with related tasks for each entity.
+    If field names are given, only these fields are returned for entities.
     """
     if "episode_id" in criterions and criterions["episode_id"] == "all":
         return []
@@ -261,6 +303,10 @@ def get_entities_and_tasks(criterions={}):
     if "episode_id" in criterions:
         query = query.filter(Entity.parent_id == criterions["episode_id"])
 
+    load_data = needs_entity_data(field_names)
+    if not load_data:
+        query = query.options(defer(Entity.data))
+
     for (
         entity,
         task_id,
@@ -279,9 +325,10 @@ def get_entities_and_tasks(criterions={}):
     ) in query.all():
         entity_id = str(entity.id)
 
-        entity.data = entity.data or {}
-
         if entity_id not in entity_map:
+            data = {}
+            if load_data:
+                data = entity.data or {}
             status = "running"
             if entity.status is not None:
                 status = str(entity.status.code)
@@ -291,12 +338,12 @@ def get_entities_and_tasks(criterions={}):
                 "status": status,
                 "episode_id": str(entity.parent_id),
                 "description": entity.description,
-                "frame_in": entity.data.get("frame_in", None),
-                "frame_out": entity.data.get("frame_out", None),
-                "fps": entity.data.get("fps", None),
+                "frame_in": data.get("frame_in", None),
+                "frame_out": data.get("frame_out", None),
+                "fps": data.get("fps", None),
                 "preview_file_id": str(entity.preview_file_id or ""),
                 "canceled": entity.canceled,
-                "data": fields.serialize_value(entity.data),
+                "data": fields.serialize_value(data),
                 "tasks": [],
             }
 
@@ -329,7 +376,10 @@ def get_entities_and_tasks(criterions={}):
             if person_id:
                 task_map[task_id]["assignees"].append(str(person_id))
 
-    return list(entity_map.values())
+    return [
+        fields.filter_fields(entity, field_names)
+        for entity in entity_map.values()
+    ]
 
 
 def remove_entity_link(link_id):
@@ -366,3 +416,71 @@ def remove_not_allowed_fields_from_metadata(
         for key in data.keys()
         if key not in not_allowed_descriptors_field_names
     }
+
+
+def build_updated_after_filter(updated_after):
+    """
+    Build a filter matching entities whose row, tasks or assignations changed
+    after given date. Entities that lost tasks since then are matched too,
+    their deletion being retrieved from task:delete events.
+    """
+    deleted_task_entity_ids = {
+        entity_id
+        for (entity_id,) in ApiEvent.query.filter(
+            ApiEvent.name == "task:delete"
+        )
+        .filter(ApiEvent.created_at > updated_after)
+        .with_entities(ApiEvent.data["entity_id"].astext)
+        if entity_id and fields.is_valid_id(entity_id)
+    }
+    return or_(
+        Entity.updated_at > updated_after,
+        Entity.id.in_(
+            select(Task.entity_id).where(Task.updated_at > updated_after)
+        ),
+        Entity.id.in_(deleted_task_entity_ids),
+    )
+
+
+def get_deleted_entity_ids(entity_type, updated_after, project_id=None):
+    """
+    Return ids of entities of given type (shot, asset, edit...) deleted
+    after given date, based on the deletion events. Entities that still
+    exist (canceled ones) are not listed.
+    """
+    query = (
+        ApiEvent.query.filter(ApiEvent.name == "%s:delete" % entity_type)
+        .filter(ApiEvent.created_at > updated_after)
+        .with_entities(ApiEvent.data["%s_id" % entity_type].astext)
+    )
+    if project_id is not None:
+        query = query.filter(ApiEvent.project_id == project_id)
+    entity_ids = {
+        entity_id
+        for (entity_id,) in query
+        if entity_id and fields.is_valid_id(entity_id)
+    }
+    existing_entity_ids = {
+        str(entity_id)
+        for (entity_id,) in Entity.query.filter(
+            Entity.id.in_(entity_ids)
+        ).with_entities(Entity.id)
+    }
+    return sorted(entity_ids - existing_entity_ids)
+
+
+def get_delta_result(
+    entity_type, entries, updated_after, timestamp, project_id=None
+):
+    """
+    Wrap entries changed after given date with the ids of entities of given
+    type deleted since then. The timestamp, taken before reading entries, is
+    the date to give as updated_after for the next synchronization.
+    """
+    return {
+        "data": entries,
+        "deleted_ids": get_deleted_entity_ids(
+            entity_type, updated_after, project_id=project_id
+        ),
+        "timestamp": fields.serialize_value(timestamp, milliseconds=True),
+    }
@@ -13,7 +13,7 @@ from zou.app.models.software import Software
 from zou.app.models.task import Task
 
 
-from zou.app.services import entities_service
+from zou.app.services import entities_service, stats_service
 from zou.app.services.base_service import (
     get_instance,
     get_or_create_instance_by_name,
@@ -38,7 +38,7 @@ from sqlalchemy.sql.expression import and_
 
 
 def clear_preview_file_cache(preview_file_id):
-    cache.cache.delete_memoized(get_preview_file, preview_file_id)
+    cache.invalidate_tags("preview_file:%s" % preview_file_id)
 
 
 def get_default_status():
@@ -686,7 +686,7 @@ def get_preview_file_raw(preview_file_id):
     return preview_file
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(240, tags=["preview_file:{preview_file_id}"])
 def get_preview_file(preview_file_id):
     """
     Get preview file as dict.
@@ -714,7 +714,7 @@ def create_preview_file_raw(
     extension="mp4",
     position=1,
 ):
-    return PreviewFile.create(
+    preview_file = PreviewFile.create(
         name=name,
         revision=revision,
         source=source,
@@ -724,6 +724,8 @@ def create_preview_file_raw(
         position=position,
         status="processing",
     )
+    stats_service.update_preview_stats(extension=extension)
+    return preview_file
 
 
 def create_preview_file(
@@ -823,6 +825,9 @@ def get_output_files_for_output_type_and_asset_instance(
 def remove_preview_file(preview_file_id):
     preview_file = get_preview_file_raw(preview_file_id)
     preview_file.delete()
+    stats_service.update_preview_stats(
+        previous_extension=preview_file.extension
+    )
     task = Task.get(preview_file.task_id)
     events.emit(
         "preview-file:delete",
@@ -832,23 +837,23 @@ def remove_preview_file(preview_file_id):
     return preview_file.serialize()
 
 
-def get_preview_files_for_project(project_id, page=-1):
+def get_preview_files_for_project(project_id, page=-1, stream=False):
     """
-    Return all preview files for given project.
+    Return all preview files for given project. If stream is True and no page
+    is given, a response streaming the preview files is returned.
     """
     query = (
         PreviewFile.query.join(Task)
         .filter(Task.project_id == project_id)
         .order_by(desc(PreviewFile.updated_at))
     )
-    return query_utils.get_paginated_results(query, page)
+    return query_utils.get_paginated_results(query, page, stream=stream)
 
 
 def clear_preview_background_file_cache(preview_background_file_id):
-    cache.cache.delete_memoized(
-        get_preview_background_file, preview_background_file_id
+    cache.invalidate_tags(
+        "preview_background_file:%s" % preview_background_file_id
     )
-    cache.cache.delete_memoized(get_preview_background_files)
 
 
 def get_preview_background_file_raw(preview_background_file_id):
@@ -868,7 +873,9 @@ def get_preview_background_file_raw(preview_background_file_id):
     return preview_background
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(
+    1200, tags=["preview_background_file:{preview_background_file_id}"]
+)
 def get_preview_background_file(preview_background_file_id):
     """
     Get preview background file matching given id as a dictionary.
@@ -878,7 +885,7 @@ def get_preview_background_file(preview_background_file_id):
     ).serialize()
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["preview_background_file:*"])
 def get_preview_background_files():
     """
     Get all preview backgrounds files.
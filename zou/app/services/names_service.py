@@ -1,5 +1,9 @@
 import slugify
 
+from sqlalchemy.orm import aliased
+
+from zou.app.models.entity import Entity
+from zou.app.models.entity_type import EntityType
 from zou.app.models.organisation import Organisation
 from zou.app.services import (
     entities_service,
@@ -8,6 +12,7 @@ from zou.app.services import (
     tasks_service,
     shots_service,
 )
+from zou.app.utils import fields
 
 
 def get_full_entity_name(entity_id):
@@ -50,6 +55,69 @@ def get_full_entity_name(entity_id):
     return (name, episode_id)
 
 
+def get_full_entity_names(entity_ids):
+    """
+    Get full names of given entities, built like get_full_entity_name does.
+    Result is a dict of (full name, episode id) tuples keyed by entity id.
+    Names are resolved with a single query joining entities to their
+    parents and grandparents, whatever the number of entities. Unknown
+    entities are not listed.
+    """
+    Parent = aliased(Entity, name="parent")
+    GrandParent = aliased(Entity, name="grand_parent")
+    query = (
+        Entity.query.filter(Entity.id.in_(entity_ids))
+        .join(EntityType, EntityType.id == Entity.entity_type_id)
+        .outerjoin(Parent, Parent.id == Entity.parent_id)
+        .outerjoin(GrandParent, GrandParent.id == Parent.parent_id)
+        .with_entities(
+            Entity.id,
+            Entity.name,
+            Entity.source_id,
+            EntityType.name,
+            Parent.id,
+            Parent.name,
+            GrandParent.id,
+            GrandParent.name,
+        )
+    )
+    names = {}
+    for (
+        entity_id,
+        entity_name,
+        source_id,
+        entity_type_name,
+        parent_id,
+        parent_name,
+        grand_parent_id,
+        grand_parent_name,
+    ) in query:
+        episode_id = None
+        if entity_type_name == "Shot":
+            if grand_parent_id is None:
+                name = "%s / %s" % (parent_name, entity_name)
+            else:
+                episode_id = grand_parent_id
+                name = "%s / %s / %s" % (
+                    grand_parent_name,
+                    parent_name,
+                    entity_name,
+                )
+        elif entity_type_name == "Episode":
+            name = entity_name
+        elif entity_type_name == "Sequence":
+            if parent_id is None:
+                name = entity_name
+            else:
+                episode_id = parent_id
+                name = "%s / %s" % (parent_name, entity_name)
+        else:
+            episode_id = source_id
+            name = "%s / %s" % (entity_type_name, entity_name)
+        names[str(entity_id)] = (name, fields.serialize_value(episode_id))
+    return names
+
+
 def get_preview_file_name(preview_file_id):
     """
     Build unique and human readable file name for preview downloads. The
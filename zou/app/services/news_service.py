@@ -10,7 +10,7 @@ from zou.app.models.preview_file import PreviewFile
 from zou.app.models.project import Project
 from zou.app.models.task import Task
 
-from zou.app.utils import cache, events, fields
+from zou.app.utils import cache, events, fields, query as query_utils
 from zou.app.services import names_service, tasks_service
 
 
@@ -96,10 +96,11 @@ def get_last_news_for_project(
     before=None,
     after=None,
     episode_id=None,
+    estimate_total=False,
 ):
     """
     Return last 50 news for given project. Add related information to make it
-    displayable.
+    displayable. If estimate_total is True, the total is estimated.
     """
     offset = (page - 1) * page_size
 
@@ -154,7 +155,9 @@ def get_last_news_for_project(
             News.created_at < func.cast(before, News.created_at.type)
         )
 
-    (total, nb_pages) = _get_news_total(query, page_size)
+    (total, nb_pages) = _get_news_total(
+        query, page_size, estimate=estimate_total
+    )
 
     query = query.add_columns(
         Project.id,
@@ -171,6 +174,9 @@ def get_last_news_for_project(
     query = query.limit(page_size)
     query = query.offset(offset)
     news_list = query.all()
+    entity_names = names_service.get_full_entity_names(
+        {row.entity_id for row in news_list}
+    )
     result = []
 
     for (
@@ -185,9 +191,7 @@ def get_last_news_for_project(
         preview_file_annotations,
         entity_preview_file_id,
     ) in news_list:
-        (full_entity_name, episode_id) = names_service.get_full_entity_name(
-            task_entity_id
-        )
+        (full_entity_name, episode_id) = entity_names[str(task_entity_id)]
 
         result.append(
             fields.serialize_dict(
@@ -223,8 +227,8 @@ def get_last_news_for_project(
     }
 
 
-def _get_news_total(query, page_size):
-    total = query.count()
+def _get_news_total(query, page_size, estimate=False):
+    total = query_utils.get_query_total(query, estimate=estimate)
     nb_pages = int(math.ceil(total / float(page_size)))
     return total, nb_pages
 
@@ -1,5 +1,8 @@
+import datetime
+
 from sqlalchemy.exc import StatementError
 
+from zou.app import db
 from zou.app.models.comment import Comment
 from zou.app.models.project import Project
 from zou.app.models.entity import Entity
@@ -310,6 +313,73 @@ def create_assignation_notification(task_id, person_id, author_id=None):
         return None
 
 
+def create_assignation_notifications(assignations, author_id):
+    """
+    Create notifications following the assignation of tasks, given as
+    (task id, person id) pairs. Notifications are stored with a single
+    multi-row insert. No notification is created for people assigning
+    themselves.
+    """
+    assignations = [
+        (task_id, person_id)
+        for task_id, person_id in assignations
+        if person_id != str(author_id)
+    ]
+    if not assignations:
+        return []
+
+    now = datetime.datetime.utcnow()
+    notification_rows = [
+        {
+            "id": fields.gen_uuid(),
+            "read": False,
+            "change": False,
+            "type": "assignation",
+            "person_id": person_id,
+            "author_id": author_id,
+            "task_id": task_id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for task_id, person_id in assignations
+    ]
+    db.session.execute(Notification.__table__.insert(), notification_rows)
+    Notification.commit()
+
+    tasks = {
+        task["id"]: task
+        for task in Task.serialize_query(
+            Task.query.filter(
+                Task.id.in_({task_id for task_id, _ in assignations})
+            )
+        )
+    }
+    for notification in notification_rows:
+        emails_service.send_assignation_notification(
+            notification["person_id"],
+            author_id,
+            tasks[notification["task_id"]],
+        )
+    events.emit_many(
+        [
+            (
+                "notification:new",
+                {
+                    "notification_id": notification["id"],
+                    "person_id": notification["person_id"],
+                },
+                tasks[notification["task_id"]]["project_id"],
+            )
+            for notification in notification_rows
+        ],
+        persist=False,
+    )
+    return [
+        fields.serialize_dict(notification)
+        for notification in notification_rows
+    ]
+
+
 def get_task_subscription_raw(person_id, task_id):
     """
     Return subscription matching given person and task.
@@ -28,16 +28,14 @@ from zou.app.services.exception import (
 )
 
 
-def clear_person_cache():
-    cache.cache.delete_memoized(get_person)
-    cache.cache.delete_memoized(get_person_by_email)
-    cache.cache.delete_memoized(get_person_by_desktop_login)
-    cache.cache.delete_memoized(get_person_by_email_dekstop_login)
-    cache.cache.delete_memoized(get_active_persons)
-    cache.cache.delete_memoized(get_persons)
+def clear_person_cache(person_id=None):
+    if person_id is None:
+        cache.invalidate_tags("person:*")
+    else:
+        cache.invalidate_tags("person:%s" % person_id)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["person:*"])
 def get_persons(minimal=False):
     """
     Return all person stored in database.
@@ -58,7 +56,7 @@ def get_all_raw_active_persons():
     return Person.get_all_by(active=True)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["person:*"])
 def get_active_persons():
     """
     Return all person with flag active set to True.
@@ -89,7 +87,7 @@ def get_person_raw(person_id):
     return person
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["person:{person_id}"])
 def get_person(person_id):
     """
     Return given person as a dictionary.
@@ -109,7 +107,7 @@ def get_person_by_email_raw(email):
     return person
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["person:{result[id]}"])
 def get_person_by_email(email, unsafe=False, relations=False):
     """
     Return person that matches given email as a dictionary.
@@ -121,7 +119,7 @@ def get_person_by_email(email, unsafe=False, relations=False):
         return person.serialize_safe(relations=relations)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["person:{result[id]}"])
 def get_person_by_desktop_login(desktop_login):
     """
     Return person that matches given desktop login as a dictionary. It is useful
@@ -153,7 +151,7 @@ def get_person_by_ldap_uid(ldap_uid):
     return person.serialize()
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["person:{result[id]}"])
 def get_person_by_email_dekstop_login(email_or_desktop_login):
     """
     Return person that matches given email or desktop login as a dictionary.
@@ -235,7 +233,7 @@ def create_person(
     )
     index_service.index_person(person)
     events.emit("person:new", {"person_id": person.id})
-    clear_person_cache()
+    clear_person_cache(person.id)
     return person.serialize(relations=True) if serialize else person
 
 
@@ -245,7 +243,7 @@ def update_password(email, password):
     """
     person = get_person_by_email_raw(email)
     person.update({"password": password})
-    clear_person_cache()
+    clear_person_cache(person.id)
     return person.serialize()
 
 
@@ -269,7 +267,7 @@ def update_person(person_id, data):
     if person.active:
         index_service.index_person(person)
     events.emit("person:update", {"person_id": person_id})
-    clear_person_cache()
+    clear_person_cache(person_id)
     return person.serialize()
 
 
@@ -282,7 +280,7 @@ def delete_person(person_id):
     person.delete()
     index_service.remove_person_index(person_id)
     events.emit("person:delete", {"person_id": person_id})
-    clear_person_cache()
+    clear_person_cache(person_id)
     return person_dict
 
 
@@ -479,7 +477,7 @@ def clear_avatar(person_id):
     """
     person = get_person_raw(person_id)
     person.update({"has_avatar": False})
-    clear_person_cache()
+    clear_person_cache(person_id)
     # stop removing files for now
     # try:
     #     file_store.remove_picture("thumbnails", person_id)
@@ -23,6 +23,7 @@ from zou.app.services import (
     assets_service,
     shots_service,
     projects_service,
+    stats_service,
 )
 from zou.utils import movie
 from zou.app.utils import (
@@ -134,8 +135,12 @@ def update_preview_file(preview_file_id, data, silent=False):
 
 
 def update_preview_file_raw(preview_file, data, silent=False):
+    previous_extension = preview_file.extension
     preview_file.update(data)
     files_service.clear_preview_file_cache(str(preview_file.id))
+    stats_service.update_preview_stats(
+        previous_extension, preview_file.extension
+    )
     if not silent:
         task = Task.get(preview_file.task_id)
         events.emit(
@@ -548,14 +553,16 @@ def get_running_preview_files():
         .order_by(PreviewFile.created_at.desc())
     )
 
+    entries = entries.all()
+    entity_names = names_service.get_full_entity_names(
+        {entity_id for _, _, _, entity_id in entries}
+    )
     results = []
     for preview_file, project_id, task_type_id, entity_id in entries:
         result = preview_file.serialize()
         result["project_id"] = fields.serialize_value(project_id)
         result["task_type_id"] = fields.serialize_value(task_type_id)
-        (result["full_entity_name"], _) = names_service.get_full_entity_name(
-            entity_id
-        )
+        (result["full_entity_name"], _) = entity_names[str(entity_id)]
         results.append(result)
     return results
 
@@ -36,14 +36,14 @@ from sqlalchemy.orm.exc import ObjectDeletedError
 from sqlalchemy import or_
 
 
-def clear_project_cache(project_id):
-    cache.cache.delete_memoized(get_project, project_id)
-    cache.cache.delete_memoized(get_project_with_relations, project_id)
-    cache.cache.delete_memoized(get_project_by_name)
-    cache.cache.delete_memoized(open_projects)
+def clear_project_cache(project_id=None):
+    if not project_id:
+        cache.invalidate_tags("project:*")
+    else:
+        cache.invalidate_tags("project:%s" % project_id)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["project:*"])
 def open_projects(name=None):
     """
     Return all open projects. Allow to filter projects by name.
@@ -246,7 +246,7 @@ def get_project_raw(project_id):
     return project
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(240, tags=["project:{project_id}"])
 def get_project(project_id):
     """
     Get project matching given id, as a dict. Raises an exception if project is
@@ -255,7 +255,7 @@ def get_project(project_id):
     return get_project_raw(project_id).serialize()
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(240, tags=["project:{project_id}"])
 def get_project_with_relations(project_id):
     """
     Get project matching given id, as a dict. Raises an exception if project is
@@ -264,7 +264,7 @@ def get_project_with_relations(project_id):
     return get_project_raw(project_id).serialize(relations=True)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["project:{result[id]}"])
 def get_project_by_name(project_name):
     """
     Get project matching given name. Raises an exception if project is not
@@ -1,8 +1,18 @@
-from datetime import timedelta
 from operator import itemgetter
-from sqlalchemy.orm import aliased
+from sqlalchemy.orm import aliased, defer
 from sqlalchemy.exc import IntegrityError, StatementError
-from sqlalchemy import func
+from sqlalchemy import (
+    DateTime,
+    Float,
+    Integer,
+    cast,
+    extract,
+    func,
+    select,
+    union_all,
+)
+
+from zou.app import db
 
 from zou.app.utils import (
     cache,
@@ -13,7 +23,6 @@ from zou.app.utils import (
 )
 
 from zou.app.models.entity import Entity, EntityLink, EntityVersion
-from zou.app.models.person import Person
 from zou.app.models.project import Project
 from zou.app.models.schedule_item import ScheduleItem
 from zou.app.models.subscription import Subscription
@@ -30,6 +39,7 @@ from zou.app.services import (
     names_service,
     user_service,
     index_service,
+    stats_service,
 )
 from zou.app.services.exception import (
     EpisodeNotFoundException,
@@ -42,47 +52,43 @@ from zou.app.services.exception import (
 
 
 def clear_shot_cache(shot_id):
-    cache.cache.delete_memoized(get_shot, shot_id)
-    cache.cache.delete_memoized(get_shot_with_relations, shot_id)
-    cache.cache.delete_memoized(get_full_shot, shot_id)
+    cache.invalidate_tags("entity:%s" % shot_id)
 
 
 def clear_sequence_cache(sequence_id):
-    cache.cache.delete_memoized(get_sequence, sequence_id)
-    cache.cache.delete_memoized(get_full_sequence, sequence_id)
+    cache.invalidate_tags("entity:%s" % sequence_id)
 
 
 def clear_episode_cache(episode_id):
-    cache.cache.delete_memoized(get_episode, episode_id)
-    cache.cache.delete_memoized(get_episode_by_name)
+    cache.invalidate_tags("entity:%s" % episode_id)
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, tags=["entity_type:{result[id]}"])
 def get_episode_type():
     return entities_service.get_temporal_entity_type_by_name("Episode")
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, tags=["entity_type:{result[id]}"])
 def get_edit_type():
     return entities_service.get_temporal_entity_type_by_name("Edit")
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, tags=["entity_type:{result[id]}"])
 def get_sequence_type():
     return entities_service.get_temporal_entity_type_by_name("Sequence")
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, tags=["entity_type:{result[id]}"])
 def get_shot_type():
     return entities_service.get_temporal_entity_type_by_name("Shot")
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, tags=["entity_type:{result[id]}"])
 def get_scene_type():
     return entities_service.get_temporal_entity_type_by_name("Scene")
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, tags=["entity_type:{result[id]}"])
 def get_camera_type():
     return entities_service.get_entity_type_by_name("Camera")
 
@@ -208,9 +214,10 @@ def get_episode_map(criterions={}):
     return episode_map
 
 
-def get_shots_and_tasks(criterions={}):
+def get_shots_and_tasks(criterions={}, field_names=None):
     """
     Get all shots for given criterions with related tasks for each shot.
+    If field names are given, only these fields are returned for shots.
     """
     shot_type = get_shot_type()
     shot_map = {}
@@ -261,10 +268,21 @@ def get_shots_and_tasks(criterions={}):
     if "episode_id" in criterions and criterions["episode_id"] != "all":
         query = query.filter(Sequence.parent_id == criterions["episode_id"])
 
+    if "updated_after" in criterions:
+        query = query.filter(
+            entities_service.build_updated_after_filter(
+                criterions["updated_after"]
+            )
+        )
+
     if "assigned_to" in criterions:
         query = query.filter(user_service.build_assignee_filter())
         del criterions["assigned_to"]
 
+    load_data = entities_service.needs_entity_data(field_names)
+    if not load_data:
+        query = query.options(defer(Entity.data))
+
     query_result = query.all()
 
     if "vendor_departments" in criterions:
@@ -302,7 +320,9 @@ def get_shots_and_tasks(criterions={}):
         shot_id = str(shot.id)
 
         if shot_id not in shot_map:
-            data = fields.serialize_value(shot.data or {})
+            data = {}
+            if load_data:
+                data = fields.serialize_value(shot.data or {})
             if "vendor_departments" in criterions:
                 data = (
                     entities_service.remove_not_allowed_fields_from_metadata(
@@ -369,7 +389,9 @@ def get_shots_and_tasks(criterions={}):
             if person_id:
                 task_map[task_id]["assignees"].append(str(person_id))
 
-    return list(shot_map.values())
+    return [
+        fields.filter_fields(shot, field_names) for shot in shot_map.values()
+    ]
 
 
 def get_shot_raw(shot_id):
@@ -388,7 +410,7 @@ def get_shot_raw(shot_id):
     return shot
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{shot_id}"])
 def get_shot(shot_id):
     """
     Return given shot as a dictionary.
@@ -396,7 +418,7 @@ def get_shot(shot_id):
     return get_shot_raw(shot_id).serialize(obj_type="Shot")
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{shot_id}"])
 def get_shot_with_relations(shot_id):
     """
     Return given shot as a dictionary.
@@ -404,7 +426,7 @@ def get_shot_with_relations(shot_id):
     return get_shot_raw(shot_id).serialize(obj_type="Shot", relations=True)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{shot_id}"])
 def get_full_shot(shot_id):
     """
     Return given shot as a dictionary with extra data like project and
@@ -479,7 +501,7 @@ def get_sequence_raw(sequence_id):
     return sequence
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{sequence_id}"])
 def get_sequence(sequence_id):
     """
     Return given sequence as a dictionary.
@@ -487,7 +509,7 @@ def get_sequence(sequence_id):
     return get_sequence_raw(sequence_id).serialize(obj_type="Sequence")
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{sequence_id}"])
 def get_full_sequence(sequence_id):
     """
     Return given sequence as a dictionary with extra data like project name.
@@ -535,7 +557,7 @@ def get_episode_raw(episode_id):
     return episode
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{episode_id}"])
 def get_episode(episode_id):
     """
     Return given episode as a dictionary.
@@ -543,7 +565,7 @@ def get_episode(episode_id):
     return get_episode_raw(episode_id).serialize(obj_type="Episode")
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["entity:{result[id]}"])
 def get_episode_by_name(project_id, episode_name):
     """
     Get episode matching given name project_id. Raises an exception if episode
@@ -820,6 +842,16 @@ def get_shots_for_project(project_id, only_assigned=False):
     )
 
 
+def get_shots_for_project_version(project_id, only_assigned=False):
+    """
+    Return the version of the shots of given project. It changes when one of
+    them is modified.
+    """
+    return entities_service.get_entities_for_project_version(
+        project_id, get_shot_type()["id"], only_assigned=only_assigned
+    )
+
+
 def get_shots_for_episode(episode_id, relations=False):
     """
     Get all shots for given episode.
@@ -861,10 +893,11 @@ def get_scenes_for_sequence(sequence_id):
     return Entity.serialize_list(result, "Scene")
 
 
-def remove_shot(shot_id, force=False):
+def remove_shot(shot_id, force=False, update_stats=True):
     """
     Remove given shot from database. If it has tasks linked to it, it marks
-    the shot as canceled. Deletion can be forced.
+    the shot as canceled. Deletion can be forced. Episode stats are updated
+    once all the shot tasks are removed, unless update_stats is False.
     """
     shot = get_shot_raw(shot_id)
     is_tasks_related = Task.query.filter_by(entity_id=shot_id).count() > 0
@@ -882,8 +915,12 @@ def remove_shot(shot_id, force=False):
 
         tasks = Task.query.filter_by(entity_id=shot_id).all()
         for task in tasks:
-            deletion_service.remove_task(task.id, force=True)
+            deletion_service.remove_task(
+                task.id, force=True, update_stats=False
+            )
             tasks_service.clear_task_cache(str(task.id))
+        if tasks and update_stats:
+            stats_service.update_episode_stats_for_entities([shot_id])
 
         EntityVersion.delete_all_by(entity_id=shot_id)
         Subscription.delete_all_by(entity_id=shot_id)
@@ -920,24 +957,31 @@ def remove_scene(scene_id):
     return deleted_scene
 
 
-def remove_sequence(sequence_id, force=False):
+def remove_sequence(sequence_id, force=False, update_stats=True):
     """
-    Remove a sequence and all related shots.
+    Remove a sequence and all related shots. Stats of the sequence episode
+    are updated once at the end, unless update_stats is False.
     """
     sequence = get_sequence_raw(sequence_id)
     if force:
         from zou.app.services import tasks_service
 
         for shot in Entity.get_all_by(parent_id=sequence_id):
-            remove_shot(shot.id, force=True)
+            remove_shot(shot.id, force=True, update_stats=False)
         Subscription.delete_all_by(entity_id=sequence_id)
         ScheduleItem.delete_all_by(object_id=sequence_id)
 
         tasks = Task.query.filter_by(entity_id=sequence_id).all()
         for task in tasks:
-            deletion_service.remove_task(task.id, force=True)
+            deletion_service.remove_task(
+                task.id, force=True, update_stats=False
+            )
             tasks_service.clear_task_cache(str(task.id))
         Subscription.delete_all_by(entity_id=sequence_id)
+        if update_stats and sequence.parent_id is not None:
+            stats_service.update_episode_stats(
+                str(sequence.project_id), [sequence.parent_id]
+            )
     try:
         sequence.delete()
         events.emit(
@@ -1087,11 +1131,13 @@ def update_shot(shot_id, data_dict):
     Update shot fields matching given id with data from dict given in parameter.
     """
     shot = get_shot_raw(shot_id)
+    previous_shot = shot.serialize()
     shot.update(data_dict)
 
     index_service.remove_shot_index(shot.id)
     index_service.index_shot(shot)
     clear_shot_cache(shot_id)
+    update_stats_for_shot(shot, previous_shot)
     events.emit(
         "shot:update", {"shot_id": shot_id}, project_id=str(shot.project_id)
     )
@@ -1099,6 +1145,52 @@ def update_shot(shot_id, data_dict):
     return shot.serialize()
 
 
+def update_stats_for_shot(shot, previous_shot):
+    """
+    Update stored episode stats and clear cached quotas if given shot changes
+    affect them. Previous shot is the serialized shot before its update.
+    Moving a shot to another sequence requires to recompute the episodes of
+    both sequences.
+    """
+    previous_parent_id = previous_shot.get("parent_id")
+    parent_id = str(shot.parent_id) if shot.parent_id is not None else None
+    is_nb_frames_changed = shot.nb_frames != previous_shot.get("nb_frames")
+    if parent_id != previous_parent_id:
+        stats_service.update_episode_stats_for_sequences(
+            str(shot.project_id),
+            [
+                sequence_id
+                for sequence_id in [previous_parent_id, parent_id]
+                if sequence_id is not None
+            ],
+        )
+    elif is_nb_frames_changed:
+        stats_service.update_episode_stats_for_entities([shot.id])
+    if is_nb_frames_changed:
+        clear_quotas_cache(shot.project_id)
+
+
+def update_stats_for_sequence(sequence, previous_sequence):
+    """
+    Update stored stats of the old and new episodes of given sequence if it
+    was moved to another episode. Previous sequence is the serialized
+    sequence before its update.
+    """
+    previous_parent_id = previous_sequence.get("parent_id")
+    parent_id = (
+        str(sequence.parent_id) if sequence.parent_id is not None else None
+    )
+    if parent_id != previous_parent_id:
+        stats_service.update_episode_stats(
+            str(sequence.project_id),
+            [
+                episode_id
+                for episode_id in [previous_parent_id, parent_id]
+                if episode_id is not None
+            ],
+        )
+
+
 def get_shot_versions(shot_id):
     """
     Shot metadata changes are versioned. This function returns all versions
@@ -1128,6 +1220,10 @@ def get_base_entity_type_name(entity_dict):
     return type_name
 
 
+def clear_quotas_cache(project_id):
+    cache.invalidate_tags("quotas:%s" % project_id)
+
+
 def get_weighted_quotas(project_id, task_type_id, detail_level):
     """
     Build quota statistics. It counts the number of frames done for each day.
@@ -1137,65 +1233,40 @@ def get_weighted_quotas(project_id, task_type_id, detail_level):
     from the wip date to the feedback date.
     It computes the shot count and the number of seconds too.
     """
-    fps = projects_service.get_project_fps(project_id)
-    timezone = user_service.get_timezone()
-    shot_type = get_shot_type()
-    quotas = {}
-    query = (
-        Task.query.filter(Task.project_id == project_id)
-        .filter(Entity.entity_type_id == shot_type["id"])
-        .filter(Task.task_type_id == task_type_id)
-        .filter(Task.end_date != None)
-        .join(Entity, Entity.id == Task.entity_id)
-        .join(Project, Project.id == Task.project_id)
-        .join(TimeSpent, Task.id == TimeSpent.task_id)
-        .add_columns(
-            Entity.nb_frames,
-            TimeSpent.date,
-            TimeSpent.duration,
-            TimeSpent.person_id,
-        )
+    return _get_weighted_quotas(
+        project_id, task_type_id, detail_level, user_service.get_timezone()
     )
-    result = query.all()
-
-    for task, nb_frames, date, duration, person_id in result:
-        person_id = str(person_id)
-        if task.duration > 0 and nb_frames is not None:
-            nb_frames = round(nb_frames * (duration / task.duration))
-            _add_quota_entry(quotas, person_id, date, timezone, nb_frames, fps)
 
-    query = (
-        Task.query.filter(Task.project_id == project_id)
-        .filter(Entity.entity_type_id == shot_type["id"])
-        .filter(Task.task_type_id == task_type_id)
-        .filter(Task.real_start_date != None)
-        .filter(Task.end_date != None)
-        .filter(TimeSpent.id == None)
-        .join(Entity, Entity.id == Task.entity_id)
-        .join(Project, Project.id == Task.project_id)
-        .outerjoin(TimeSpent, Task.id == TimeSpent.task_id)
-        .join(Task.assignees)
-        .add_columns(Entity.nb_frames, Person.id)
-    )
-    result = query.all()
 
-    for task, nb_frames, person_id in result:
-        business_days = (
-            date_helpers.get_business_days(task.real_start_date, task.end_date)
-            + 1
+@cache.memoize_function(120, tags=["quotas:{project_id}"])
+def _get_weighted_quotas(project_id, task_type_id, detail_level, timezone):
+    time_spent_entries = (
+        _select_quota_tasks(
+            project_id,
+            task_type_id,
+            TimeSpent.person_id.label("person_id"),
+            cast(TimeSpent.date, DateTime).label("date"),
+            func.round(
+                Entity.nb_frames * TimeSpent.duration / Task.duration
+            ).label("nb_frames"),
         )
-        if nb_frames is not None:
-            nb_frames = round(nb_frames / business_days) or 0
-        else:
-            nb_frames = 0
-        date = task.real_start_date
-        for x in range((task.end_date - task.real_start_date).days + 1):
-            if date.weekday() < 5:
-                _add_quota_entry(
-                    quotas, str(person_id), date, timezone, nb_frames, fps
-                )
-            date = date + timedelta(1)
-    return quotas
+        .join(TimeSpent, TimeSpent.task_id == Task.id)
+        .where(Task.duration > 0)
+        .where(Entity.nb_frames != None)
+    )
+    calendar = _get_quota_calendar(project_id, task_type_id)
+    calendar_entries = select(
+        calendar.c.person_id,
+        calendar.c.date,
+        func.round(calendar.c.nb_frames / calendar.c.business_days).label(
+            "nb_frames"
+        ),
+    ).where(calendar.c.is_business_day)
+    return _get_quotas_from_entries(
+        project_id,
+        union_all(time_spent_entries, calendar_entries),
+        timezone,
+    )
 
 
 def get_raw_quotas(project_id, task_type_id, detail_level):
@@ -1205,55 +1276,142 @@ def get_raw_quotas(project_id, task_type_id, detail_level):
     date). It considers that all the work was done at the end date.
     It computes the shot count and the number of seconds too.
     """
-    fps = projects_service.get_project_fps(project_id)
-    timezone = user_service.get_timezone()
-    shot_type = get_shot_type()
-    quotas = {}
-    query = (
-        Task.query.filter(Task.project_id == project_id)
-        .filter(Entity.entity_type_id == shot_type["id"])
-        .filter(Task.task_type_id == task_type_id)
-        .filter(Task.end_date != None)
+    return _get_raw_quotas(
+        project_id, task_type_id, detail_level, user_service.get_timezone()
+    )
+
+
+@cache.memoize_function(120, tags=["quotas:{project_id}"])
+def _get_raw_quotas(project_id, task_type_id, detail_level, timezone):
+    entries = _select_quota_tasks(
+        project_id,
+        task_type_id,
+        assignees_table.c.person.label("person_id"),
+        Task.end_date.label("date"),
+        func.coalesce(Entity.nb_frames, 0).label("nb_frames"),
+    ).join(assignees_table, assignees_table.c.task == Task.id)
+    return _get_quotas_from_entries(project_id, entries, timezone)
+
+
+def _select_quota_tasks(project_id, task_type_id, *columns):
+    """
+    Select given columns for the finished tasks of given type and project
+    that are related to a shot.
+    """
+    return (
+        select(*columns)
+        .select_from(Task)
         .join(Entity, Entity.id == Task.entity_id)
-        .join(Project, Project.id == Task.project_id)
-        .join(Task.assignees)
-        .add_columns(Entity.nb_frames, Person.id)
+        .where(Task.project_id == project_id)
+        .where(Task.task_type_id == task_type_id)
+        .where(Entity.entity_type_id == get_shot_type()["id"])
+        .where(Task.end_date != None)
+    )
+
+
+def _get_quota_calendar(project_id, task_type_id):
+    """
+    Build a calendar listing, for each assignee of a finished task without
+    time spent, every day from the WIP date to the feedback date. Each day
+    tells if it is a business day and the number of business days of the
+    task, to share the frames of the shot among them.
+    """
+    days = (
+        _select_quota_tasks(
+            project_id,
+            task_type_id,
+            Task.id.label("task_id"),
+            assignees_table.c.person.label("person_id"),
+            Task.real_start_date.label("start_date"),
+            cast(func.coalesce(Entity.nb_frames, 0), Float).label("nb_frames"),
+            func.generate_series(
+                0,
+                cast(
+                    func.date_part(
+                        "day", Task.end_date - Task.real_start_date
+                    ),
+                    Integer,
+                ),
+            ).label("day_index"),
+        )
+        .join(assignees_table, assignees_table.c.task == Task.id)
+        .outerjoin(TimeSpent, TimeSpent.task_id == Task.id)
+        .where(Task.real_start_date != None)
+        .where(Task.end_date >= Task.real_start_date)
+        .where(TimeSpent.id == None)
+        .cte("quota_days")
     )
-    result = query.all()
-
-    for task, nb_frames, person_id in result:
-        date = task.end_date
-        if nb_frames is None:
-            nb_frames = 0
-        _add_quota_entry(
-            quotas, str(person_id), date, timezone, nb_frames, fps
+    date = days.c.start_date + func.make_interval(0, 0, 0, days.c.day_index)
+    is_business_day = extract("isodow", date) < 6
+    business_days = 1 + func.count().filter(
+        is_business_day & (days.c.day_index > 0)
+    ).over(partition_by=(days.c.task_id, days.c.person_id))
+    return select(
+        days.c.person_id,
+        date.label("date"),
+        days.c.nb_frames,
+        is_business_day.label("is_business_day"),
+        business_days.label("business_days"),
+    ).cte("quota_calendar")
+
+
+def _get_quotas_from_entries(project_id, entries, timezone):
+    """
+    Sum frames and count given (person, date, frames) entries for each
+    person, day in given timezone and week. Then build quota statistics from
+    these sums.
+    """
+    fps = projects_service.get_project_fps(project_id)
+    entries = entries.subquery("quota_entries")
+    buckets = select(
+        entries.c.person_id,
+        func.to_char(
+            func.timezone(timezone, func.timezone("UTC", entries.c.date)),
+            "YYYY-MM-DD",
+        ).label("day"),
+        cast(extract("week", entries.c.date), Integer).label("week"),
+        entries.c.nb_frames,
+    ).subquery("quota_buckets")
+    query = select(
+        buckets.c.person_id,
+        buckets.c.day,
+        buckets.c.week,
+        cast(func.sum(buckets.c.nb_frames), Integer),
+        func.count(),
+    ).group_by(buckets.c.person_id, buckets.c.day, buckets.c.week)
+
+    quotas = {}
+    for person_id, date_str, week, nb_frames, count in db.session.execute(
+        query
+    ):
+        _add_quota_entries(
+            quotas, str(person_id), date_str, week, nb_frames, count, fps
         )
     return quotas
 
 
-def _add_quota_entry(quotas, person_id, date, timezone, nb_frames, fps):
+def _add_quota_entries(
+    quotas, person_id, date_str, week, nb_frames, count, fps
+):
     nb_seconds = nb_frames / fps
-    date_str = date_helpers.get_simple_string_with_timezone_from_date(
-        date, timezone
-    )
     year = date_str[:4]
-    week = year + "-" + str(date.isocalendar()[1])
+    week = year + "-" + str(week)
     month = date_str[:7]
     if person_id not in quotas:
         _init_quota_person(quotas, person_id)
     _init_quota_date(quotas, person_id, date_str, week, month)
     quotas[person_id]["day"]["frames"][date_str] += nb_frames
     quotas[person_id]["day"]["seconds"][date_str] += nb_seconds
-    quotas[person_id]["day"]["count"][date_str] += 1
+    quotas[person_id]["day"]["count"][date_str] += count
     quotas[person_id]["week"]["frames"][week] += nb_frames
     quotas[person_id]["week"]["seconds"][week] += nb_seconds
-    quotas[person_id]["week"]["count"][week] += 1
+    quotas[person_id]["week"]["count"][week] += count
     quotas[person_id]["month"]["frames"][month] += nb_frames
     quotas[person_id]["month"]["seconds"][month] += nb_seconds
-    quotas[person_id]["month"]["count"][month] += 1
+    quotas[person_id]["month"]["count"][month] += count
     quotas[person_id]["year"]["frames"][year] += nb_frames
     quotas[person_id]["year"]["seconds"][year] += nb_seconds
-    quotas[person_id]["year"]["count"][year] += 1
+    quotas[person_id]["year"]["count"][year] += count
 
 
 def _init_quota_date(quotas, person_id, date_str, week, month):
@@ -1416,8 +1574,6 @@ def get_weighted_quota_shots_between(
     for entity, task_duration, duration in query_shots:
         shot = entity.serialize()
         if shot["id"] not in already_listed:
-            full_name, _ = names_service.get_full_entity_name(shot["id"])
-            shot["full_name"] = full_name
             shot["weight"] = round(duration / task_duration, 2) or 0
             shots.append(shot)
             already_listed[shot["id"]] = shot
@@ -1449,8 +1605,6 @@ def get_weighted_quota_shots_between(
             business_days = (
                 date_helpers.get_business_days(task_start, task_end) + 1
             )
-            full_name, _ = names_service.get_full_entity_name(shot["id"])
-            shot["full_name"] = full_name
             multiplicator = 1
             if task_start >= start and task_end <= end:
                 multiplicator = business_days
@@ -1466,7 +1620,7 @@ def get_weighted_quota_shots_between(
             already_listed[shot["id"]] = True
             shots.append(shot)
 
-    return sorted(shots, key=itemgetter("full_name"))
+    return _sort_quota_shots_by_full_name(shots)
 
 
 def get_raw_quota_shots_between(
@@ -1497,11 +1651,20 @@ def get_raw_quota_shots_between(
 
     for entity in query_shots:
         shot = entity.serialize()
-        full_name, _ = names_service.get_full_entity_name(shot["id"])
-        shot["full_name"] = full_name
         shot["weight"] = 1
         shots.append(shot)
 
+    return _sort_quota_shots_by_full_name(shots)
+
+
+def _sort_quota_shots_by_full_name(shots):
+    """
+    Set full names of given shots, resolved in one query, and sort shots by
+    full name.
+    """
+    names = names_service.get_full_entity_names([shot["id"] for shot in shots])
+    for shot in shots:
+        shot["full_name"], _ = names[shot["id"]]
     return sorted(shots, key=itemgetter("full_name"))
 
 
@@ -1,9 +1,14 @@
 import copy
-from sqlalchemy import func
+import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 
 from sqlalchemy.orm import aliased
 
+from zou.app import app, db
 from zou.app.models.entity import Entity
+from zou.app.models.episode_task_stat import EpisodeTaskStat
 from zou.app.models.comment import Comment
 from zou.app.models.preview_file import PreviewFile
 from zou.app.models.project import Project
@@ -11,6 +16,8 @@ from zou.app.models.task import Task
 from zou.app.models.task_status import TaskStatus
 
 from zou.app.services import user_service
+from zou.app.stores import counters_store
+from zou.app.utils import fields
 
 
 DEFAULT_RETAKE_STATS = {
@@ -38,19 +45,229 @@ DEFAULT_EVOLUTION_STATS = {
 }
 
 
+MAIN_STATS_TTL = 86400
+MAIN_STATS_PREVIEW_COUNTERS = {
+    "mp4": "number_of_video_previews",
+    "png": "number_of_picture_previews",
+    "obj": "number_of_model_previews",
+}
+MAIN_STATS_COMMENT_COUNTER = "number_of_comments"
+MAIN_STATS_COUNTERS = list(MAIN_STATS_PREVIEW_COUNTERS.values()) + [
+    MAIN_STATS_COMMENT_COUNTER
+]
+
+
 def get_main_stats():
-    return {
-        "number_of_video_previews": PreviewFile.query.filter(
-            PreviewFile.extension == "mp4"
-        ).count(),
-        "number_of_picture_previews": PreviewFile.query.filter(
-            PreviewFile.extension == "png"
-        ).count(),
-        "number_of_model_previews": PreviewFile.query.filter(
-            PreviewFile.extension == "obj"
-        ).count(),
-        "number_of_comments": Comment.query.count(),
+    """
+    Return the number of previews by kind and the number of comments. They
+    are read from counters kept in the key value store. Counters are
+    computed from the database when they are not set or when they expired.
+    """
+    values = counters_store.get_values(MAIN_STATS_COUNTERS)
+    if None in values:
+        return reconcile_main_stats()
+    return dict(zip(MAIN_STATS_COUNTERS, values))
+
+
+def reconcile_main_stats():
+    """
+    Count previews and comments in the database and store the results as the
+    new values of main stats counters.
+    """
+    preview_counts = dict(
+        PreviewFile.query.with_entities(
+            PreviewFile.extension, func.count(PreviewFile.id)
+        )
+        .filter(PreviewFile.extension.in_(list(MAIN_STATS_PREVIEW_COUNTERS)))
+        .group_by(PreviewFile.extension)
+        .all()
+    )
+    stats = {
+        counter: preview_counts.get(extension, 0)
+        for extension, counter in MAIN_STATS_PREVIEW_COUNTERS.items()
     }
+    stats[MAIN_STATS_COMMENT_COUNTER] = Comment.query.count()
+    counters_store.set_values(stats, ttl=MAIN_STATS_TTL)
+    return stats
+
+
+def reconcile_main_stats_job():
+    """
+    Run reconcile_main_stats from the job queue.
+    """
+    with app.app_context():
+        return reconcile_main_stats()
+
+
+def update_preview_stats(previous_extension=None, extension=None):
+    """
+    Update main stats counters after a preview creation (no previous
+    extension), deletion (no extension) or extension change.
+    """
+    if previous_extension == extension:
+        return
+    if previous_extension in MAIN_STATS_PREVIEW_COUNTERS:
+        counters_store.increment(
+            MAIN_STATS_PREVIEW_COUNTERS[previous_extension], -1
+        )
+    if extension in MAIN_STATS_PREVIEW_COUNTERS:
+        counters_store.increment(MAIN_STATS_PREVIEW_COUNTERS[extension], 1)
+
+
+def update_comment_stats(amount):
+    """
+    Add given amount to the comment counter of main stats.
+    """
+    counters_store.increment(MAIN_STATS_COMMENT_COUNTER, amount)
+
+
+def update_episode_stats(project_id, episode_ids=None):
+    """
+    Recompute the stored episode stats of given project from its tasks. If
+    episode ids are given, only stats of these episodes are recomputed.
+    Recomputations of the same project are serialized with a transaction
+    level advisory lock: without it, two concurrent recomputations could mix
+    their rows.
+    """
+    Sequence = aliased(Entity, name="sequence")
+    task_retake_count = func.coalesce(Task.retake_count, 0)
+    query = (
+        Task.query.with_entities(
+            Sequence.parent_id,
+            Task.task_type_id,
+            Task.task_status_id,
+            task_retake_count,
+            func.count(Task.id),
+            func.sum(func.coalesce(Entity.nb_frames, 0)),
+        )
+        .join(Entity, Entity.id == Task.entity_id)
+        .join(Sequence, Sequence.id == Entity.parent_id)
+        .filter(Task.project_id == project_id)
+        .filter(Sequence.parent_id != None)
+        .group_by(
+            Sequence.parent_id,
+            Task.task_type_id,
+            Task.task_status_id,
+            task_retake_count,
+        )
+    )
+    stats = EpisodeTaskStat.query.filter(
+        EpisodeTaskStat.project_id == project_id
+    )
+    if episode_ids is not None:
+        if len(episode_ids) == 0:
+            return
+        query = query.filter(Sequence.parent_id.in_(episode_ids))
+        stats = stats.filter(EpisodeTaskStat.episode_id.in_(episode_ids))
+
+    db.session.execute(
+        select(
+            func.pg_advisory_xact_lock(
+                func.hashtext("episode_task_stat:%s" % project_id)
+            )
+        )
+    )
+    now = datetime.datetime.utcnow()
+    rows = [
+        {
+            "id": fields.gen_uuid(),
+            "project_id": project_id,
+            "episode_id": episode_id,
+            "task_type_id": task_type_id,
+            "task_status_id": task_status_id,
+            "retake_count": retake_count,
+            "count": count,
+            "frames": frames,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for (
+            episode_id,
+            task_type_id,
+            task_status_id,
+            retake_count,
+            count,
+            frames,
+        ) in query.all()
+    ]
+    stats.delete(synchronize_session=False)
+    if rows:
+        statement = insert(EpisodeTaskStat).values(rows)
+        db.session.execute(
+            statement.on_conflict_do_update(
+                constraint="episode_task_stat_uc",
+                set_={
+                    "count": statement.excluded.count,
+                    "frames": statement.excluded.frames,
+                    "updated_at": statement.excluded.updated_at,
+                },
+            )
+        )
+    EpisodeTaskStat.commit()
+
+
+def update_episode_stats_for_entities(entity_ids):
+    """
+    Recompute the stored stats of the episodes of given shots.
+    """
+    Sequence = aliased(Entity, name="sequence")
+    episodes = (
+        Entity.query.join(Sequence, Sequence.id == Entity.parent_id)
+        .filter(Entity.id.in_(entity_ids))
+        .filter(Sequence.parent_id != None)
+        .with_entities(Entity.project_id, Sequence.parent_id)
+        .distinct()
+        .all()
+    )
+    episode_ids = {}
+    for project_id, episode_id in episodes:
+        episode_ids.setdefault(project_id, []).append(episode_id)
+    for project_id in episode_ids:
+        update_episode_stats(project_id, episode_ids[project_id])
+
+
+def update_episode_stats_for_sequences(project_id, sequence_ids):
+    """
+    Recompute the stored stats of the episodes of given sequences.
+    """
+    episode_ids = [
+        episode_id
+        for (episode_id,) in Entity.query.filter(Entity.id.in_(sequence_ids))
+        .filter(Entity.parent_id != None)
+        .with_entities(Entity.parent_id)
+        .distinct()
+    ]
+    update_episode_stats(project_id, episode_ids)
+
+
+def update_episode_stats_for_tasks(task_ids):
+    """
+    Recompute the stored stats of the episodes of given tasks.
+    """
+    entity_ids = [
+        entity_id
+        for (entity_id,) in Task.query.filter(Task.id.in_(task_ids))
+        .with_entities(Task.entity_id)
+        .distinct()
+    ]
+    update_episode_stats_for_entities(entity_ids)
+
+
+def rebuild_episode_stats(project_id=None):
+    """
+    Recompute all the stored episode stats of given project, or of all
+    projects if no project is given. Return the ids of rebuilt projects.
+    """
+    if project_id is None:
+        project_ids = [
+            str(project_id)
+            for (project_id,) in Project.query.with_entities(Project.id)
+        ]
+    else:
+        project_ids = [project_id]
+    for project_id in project_ids:
+        update_episode_stats(project_id)
+    return project_ids
 
 
 def get_episode_stats_for_project(project_id, only_assigned=False):
@@ -60,13 +277,55 @@ def get_episode_stats_for_project(project_id, only_assigned=False):
     """
 
     results = {}
-    episode_counts = _get_episode_counts(project_id, only_assigned)
+    if only_assigned:
+        episode_counts = _get_episode_counts(project_id, only_assigned)
+    else:
+        episode_counts = _get_stored_episode_counts(project_id)
     for data in episode_counts:
         add_entry_to_stats(results, *data)
         add_entry_to_all_stats(results, *data)
     return results
 
 
+def _get_stored_episode_counts(project_id):
+    """
+    Read episode counts from stored stats. Stats are built first if none
+    were stored for this project yet.
+    """
+    _build_episode_stats_if_missing(project_id)
+    return (
+        EpisodeTaskStat.query.with_entities(
+            EpisodeTaskStat.project_id,
+            EpisodeTaskStat.episode_id,
+            EpisodeTaskStat.task_type_id,
+            EpisodeTaskStat.task_status_id,
+            TaskStatus.short_name,
+            TaskStatus.color,
+        )
+        .join(TaskStatus, TaskStatus.id == EpisodeTaskStat.task_status_id)
+        .filter(EpisodeTaskStat.project_id == project_id)
+        .group_by(
+            EpisodeTaskStat.project_id,
+            EpisodeTaskStat.episode_id,
+            EpisodeTaskStat.task_type_id,
+            EpisodeTaskStat.task_status_id,
+            TaskStatus.short_name,
+            TaskStatus.color,
+        )
+        .add_columns(func.sum(EpisodeTaskStat.count))
+        .add_columns(func.sum(EpisodeTaskStat.frames))
+        .all()
+    )
+
+
+def _build_episode_stats_if_missing(project_id):
+    query = EpisodeTaskStat.query.filter(
+        EpisodeTaskStat.project_id == project_id
+    )
+    if not db.session.query(query.exists()).scalar():
+        update_episode_stats(project_id)
+
+
 def _get_episode_counts(project_id, only_assigned=False):
     Sequence = aliased(Entity, name="sequence")
     Episode = aliased(Entity, name="episode")
@@ -240,7 +499,10 @@ def get_episode_retake_stats_for_project(project_id, only_assigned=False):
         },
     """
     results = {"all": {"all": copy.deepcopy(DEFAULT_RETAKE_STATS)}}
-    query = _get_retake_stats_query(project_id, only_assigned)
+    if only_assigned:
+        query = _get_retake_stats_query(project_id, only_assigned)
+    else:
+        query = _get_stored_retake_stats_query(project_id)
     query_results = query.all()
     for (
         episode_id,
@@ -249,6 +511,7 @@ def get_episode_retake_stats_for_project(project_id, only_assigned=False):
         retake_count,
         is_done,
         is_retake,
+        task_count,
     ) in query_results:
         episode_id = str(episode_id)
         task_type_id = str(task_type_id)
@@ -262,6 +525,7 @@ def get_episode_retake_stats_for_project(project_id, only_assigned=False):
             is_done,
             retake_count,
             nb_frames,
+            task_count,
         )
 
     # Another loop is needed because we need to know the max retake count
@@ -273,6 +537,7 @@ def get_episode_retake_stats_for_project(project_id, only_assigned=False):
         retake_count,
         is_done,
         is_retake,
+        task_count,
     ) in query_results:
         results = _add_evolution_stats(
             results,
@@ -282,6 +547,7 @@ def get_episode_retake_stats_for_project(project_id, only_assigned=False):
             is_done,
             retake_count,
             nb_frames,
+            task_count,
         )
     return results
 
@@ -292,11 +558,12 @@ def _get_retake_stats_query(project_id, only_assigned):
     query = (
         Task.query.with_entities(
             Episode.id,
-            Entity.nb_frames,
+            func.sum(Entity.nb_frames),
             Task.task_type_id,
             Task.retake_count,
             TaskStatus.is_done,
             TaskStatus.is_retake,
+            func.count(Task.id),
         )
         .join(Project, Project.id == Task.project_id)
         .join(Entity, Entity.id == Task.entity_id)
@@ -304,12 +571,47 @@ def _get_retake_stats_query(project_id, only_assigned):
         .join(Episode, Episode.id == Sequence.parent_id)
         .join(TaskStatus, TaskStatus.id == Task.task_status_id)
         .filter(Project.id == project_id)
+        .group_by(
+            Episode.id,
+            Task.task_type_id,
+            Task.retake_count,
+            TaskStatus.is_done,
+            TaskStatus.is_retake,
+        )
     )
     if only_assigned:
         query = query.filter(user_service.build_assignee_filter())
     return query
 
 
+def _get_stored_retake_stats_query(project_id):
+    """
+    Build a query returning the same rows as the retake stats query, read
+    from stored stats.
+    """
+    _build_episode_stats_if_missing(project_id)
+    return (
+        EpisodeTaskStat.query.with_entities(
+            EpisodeTaskStat.episode_id,
+            func.sum(EpisodeTaskStat.frames),
+            EpisodeTaskStat.task_type_id,
+            EpisodeTaskStat.retake_count,
+            TaskStatus.is_done,
+            TaskStatus.is_retake,
+            func.sum(EpisodeTaskStat.count),
+        )
+        .join(TaskStatus, TaskStatus.id == EpisodeTaskStat.task_status_id)
+        .filter(EpisodeTaskStat.project_id == project_id)
+        .group_by(
+            EpisodeTaskStat.episode_id,
+            EpisodeTaskStat.task_type_id,
+            EpisodeTaskStat.retake_count,
+            TaskStatus.is_done,
+            TaskStatus.is_retake,
+        )
+    )
+
+
 def _init_entries(results, episode_id, task_type_id):
     if episode_id not in results:
         results[episode_id] = {"all": copy.deepcopy(DEFAULT_RETAKE_STATS)}
@@ -328,6 +630,7 @@ def _add_stats(
     is_done,
     retake_count,
     nb_frames,
+    task_count=1,
 ):
     for key1, key2 in [
         ("all", "all"),
@@ -343,13 +646,13 @@ def _add_stats(
 
         if is_done:
             # For the "current" stats we prioritize `is_done` over `is_retake`
-            results[key1][key2]["done"]["count"] += 1
+            results[key1][key2]["done"]["count"] += task_count
             results[key1][key2]["done"]["frames"] += nb_frames or 0
         elif is_retake:
-            results[key1][key2]["retake"]["count"] += 1
+            results[key1][key2]["retake"]["count"] += task_count
             results[key1][key2]["retake"]["frames"] += nb_frames or 0
         else:
-            results[key1][key2]["other"]["count"] += 1
+            results[key1][key2]["other"]["count"] += task_count
             results[key1][key2]["other"]["frames"] += nb_frames or 0
     return results
 
@@ -362,6 +665,7 @@ def _add_evolution_stats(
     is_done,
     retake_count,
     nb_frames,
+    task_count=1,
 ):
     for key1, key2 in [(episode_id, "all"), (episode_id, task_type_id)]:
         # In this loop we compute the "evolution" statistics
@@ -378,15 +682,15 @@ def _add_evolution_stats(
                     DEFAULT_EVOLUTION_STATS
                 )
             if retake_count > 0 and i <= retake_count:
-                evolution_data[take_number]["retake"]["count"] += 1
+                evolution_data[take_number]["retake"]["count"] += task_count
                 evolution_data[take_number]["retake"]["frames"] += (
                     nb_frames or 0
                 )
             elif is_done:
-                evolution_data[take_number]["done"]["count"] += 1
+                evolution_data[take_number]["done"]["count"] += task_count
                 evolution_data[take_number]["done"]["frames"] += nb_frames or 0
             else:
-                evolution_data[take_number]["other"]["count"] += 1
+                evolution_data[take_number]["other"]["count"] += task_count
                 evolution_data[take_number]["other"]["frames"] += (
                     nb_frames or 0
                 )
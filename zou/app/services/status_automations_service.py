@@ -5,10 +5,10 @@ from zou.app.services.exception import StatusAutomationNotFoundException
 
 
 def clear_status_automation_cache():
-    cache.cache.delete_memoized(get_status_automations)
+    cache.invalidate_tags("status_automation:*")
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["status_automation:*"])
 def get_status_automations():
     return fields.serialize_models(StatusAutomation.get_all())
 
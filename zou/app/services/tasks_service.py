@@ -3,6 +3,8 @@ import datetime
 import uuid
 
 from sqlalchemy.exc import StatementError, IntegrityError, DataError
+from sqlalchemy import or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql import func
 from sqlalchemy.orm import aliased
 
@@ -24,7 +26,7 @@ from zou.app.models.news import News
 from zou.app.models.person import Person
 from zou.app.models.preview_file import PreviewFile
 from zou.app.models.project import Project
-from zou.app.models.task import Task
+from zou.app.models.task import Task, assignees_table
 from zou.app.models.task_type import TaskType
 from zou.app.models.task_status import TaskStatus
 from zou.app.models.time_spent import TimeSpent
@@ -50,57 +52,62 @@ from zou.app.services import (
     persons_service,
     projects_service,
     shots_service,
+    stats_service,
     entities_service,
     edits_service,
 )
 
+TASK_CREATION_CHUNK_SIZE = 1000
+TASK_RESET_CHUNK_SIZE = 5000
+EPISODE_STATS_FIELDS = [
+    "task_status_id",
+    "retake_count",
+    "task_type_id",
+    "entity_id",
+]
+
 
 def clear_task_status_cache(task_status_id):
-    cache.cache.delete_memoized(get_task_statuses)
+    cache.invalidate_tags("task_status:%s" % task_status_id)
 
 
 def clear_task_type_cache(task_type_id):
-    cache.cache.delete_memoized(get_task_type, task_type_id)
-    cache.cache.delete_memoized(get_task_types)
+    cache.invalidate_tags("task_type:%s" % task_type_id)
 
 
 def clear_department_cache(department_id):
-    cache.cache.delete_memoized(get_department, department_id)
-    cache.cache.delete_memoized(get_departments)
+    cache.invalidate_tags("department:%s" % department_id)
 
 
 def clear_task_cache(task_id):
-    cache.cache.delete_memoized(get_task, task_id)
-    cache.cache.delete_memoized(get_task_with_relations, task_id)
+    cache.invalidate_tags("task:%s" % task_id)
 
 
-@cache.memoize_function(120)
 def clear_comment_cache(comment_id):
-    cache.cache.delete_memoized(get_comment, comment_id)
-    cache.cache.delete_memoized(get_comment_with_relations, comment_id)
+    cache.invalidate_tags("comment:%s" % comment_id)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["department:*"])
 def get_departments():
     return fields.serialize_models(Department.get_all())
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["task_type:*"])
 def get_task_types():
     return fields.serialize_models(TaskType.get_all())
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["task_status:*"])
 def get_task_statuses():
     return fields.serialize_models(TaskStatus.get_all())
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["task_status:{result[id]}"])
 def get_to_review_status():
     return get_or_create_status(app.config["TO_REVIEW_TASK_STATUS"], "pndng")
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["task_status:{result[id]}"])
 def get_default_status():
     return get_or_create_status("Todo", "todo", "#f5f5f5", is_default=True)
 
@@ -114,7 +121,7 @@ def get_task_status_raw(task_status_id):
     )
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, tags=["task_status:{task_status_id}"])
 def get_task_status(task_status_id):
     """
     Get task status matching given id  as a dictionary.
@@ -122,7 +129,7 @@ def get_task_status(task_status_id):
     return get_task_status_raw(task_status_id).serialize()
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["department:{department_id}"])
 def get_department(department_id):
     """
     Get department matching given id as a dictionary.
@@ -169,7 +176,7 @@ def get_task_type_raw(task_type_id):
     return task_type
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, tags=["task_type:{task_type_id}"])
 def get_task_type(task_type_id):
     """
     Get task type matching given id as a dictionary.
@@ -192,7 +199,7 @@ def get_task_raw(task_id):
     return task
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["task:{task_id}"])
 def get_task(task_id, relations=False):
     """
     Get task matching given id as a dictionary.
@@ -200,7 +207,7 @@ def get_task(task_id, relations=False):
     return get_task_raw(task_id).serialize(relations=relations)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["task:{task_id}"])
 def get_task_with_relations(task_id):
     """
     Get task matching given id as a dictionary.
@@ -708,7 +715,7 @@ def get_comment_raw(comment_id):
     return comment
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["comment:{comment_id}"])
 def get_comment(comment_id):
     """
     Return comment matching give id as a dict.
@@ -717,7 +724,7 @@ def get_comment(comment_id):
     return comment.serialize()
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["comment:{comment_id}"])
 def get_comment_with_relations(comment_id):
     """
     Return comment matching give id as a dict with joins information.
@@ -744,24 +751,20 @@ def get_tasks_for_entity_and_task_type(entity_id, task_type_id):
     """
     For a task type, returns all tasks related to given entity.
     """
-    tasks = (
-        Task.query.filter_by(entity_id=entity_id, task_type_id=task_type_id)
-        .order_by(Task.name)
-        .all()
-    )
-    return Task.serialize_list(tasks)
+    query = Task.query.filter_by(
+        entity_id=entity_id, task_type_id=task_type_id
+    ).order_by(Task.name)
+    return Task.serialize_query(query)
 
 
 def get_tasks_for_project_and_task_type(project_id, task_type_id):
     """
     For a project and a task type returns all tasks.
     """
-    tasks = (
-        Task.query.filter_by(project_id=project_id, task_type_id=task_type_id)
-        .order_by(Task.name)
-        .all()
-    )
-    return Task.serialize_list(tasks)
+    query = Task.query.filter_by(
+        project_id=project_id, task_type_id=task_type_id
+    ).order_by(Task.name)
+    return Task.serialize_query(query)
 
 
 def get_task_status_map():
@@ -1093,29 +1096,41 @@ def get_person_tasks_to_check(department_ids, project_ids):
 
 
 def get_last_comment_map(task_ids):
+    """
+    Return a dict of the last comment of given tasks, keyed by task id.
+    Comments posted by clients are ignored. Only the latest comment of each
+    task is read from the database (DISTINCT ON object_id), using the index
+    on comment object id and creation date.
+    """
     task_comment_map = {}
     comments = (
         Comment.query.filter(Comment.object_id.in_(task_ids))
-        .join(Person)
+        .join(Person, Person.id == Comment.person_id)
         .filter(Person.role != "client")
-        .order_by(Comment.object_id, Comment.created_at)
-        .all()
+        .distinct(Comment.object_id)
+        .order_by(Comment.object_id, Comment.created_at.desc())
+        .with_entities(
+            Comment.object_id,
+            Comment.text,
+            Comment.created_at,
+            Comment.person_id,
+        )
     )
-    task_id = None
-    for comment in comments:
-        if comment.object_id != task_id:
-            task_id = fields.serialize_value(comment.object_id)
-            task_comment_map[task_id] = {
-                "text": comment.text,
-                "date": fields.serialize_value(comment.created_at),
-                "person_id": fields.serialize_value(comment.person_id),
-            }
+    for task_id, text, created_at, person_id in comments:
+        task_comment_map[fields.serialize_value(task_id)] = {
+            "text": text,
+            "date": fields.serialize_value(created_at),
+            "person_id": fields.serialize_value(person_id),
+        }
     return task_comment_map
 
 
 def create_tasks(task_type, entities):
     """
-    Create a new task for given task type and for each entity.
+    Create a new task for given task type and for each entity. Entities that
+    already have a task of this type are skipped. Existing tasks are
+    retrieved, new tasks inserted and creation events stored with a few
+    queries, whatever the number of entities.
     """
     task_status = get_default_status()
     current_user_id = None
@@ -1124,36 +1139,71 @@ def create_tasks(task_type, entities):
     except RuntimeError:
         pass
 
-    tasks = []
+    entity_ids = [str(entity["id"]) for entity in entities]
+    skipped_entity_ids = set()
+    for index in range(0, len(entity_ids), TASK_CREATION_CHUNK_SIZE):
+        chunk = entity_ids[index : index + TASK_CREATION_CHUNK_SIZE]
+        skipped_entity_ids.update(
+            str(entity_id)
+            for (entity_id,) in Task.query.filter(
+                Task.task_type_id == task_type["id"]
+            )
+            .filter(Task.entity_id.in_(chunk))
+            .with_entities(Task.entity_id)
+        )
+
+    now = datetime.datetime.utcnow()
+    task_rows = []
     for entity in entities:
-        existing_task = Task.query.filter_by(
-            entity_id=entity["id"], task_type_id=task_type["id"]
-        ).scalar()
-        if existing_task is None:
-            task = Task.create_no_commit(
-                name="main",
-                duration=0,
-                estimation=0,
-                completion_rate=0,
-                start_date=None,
-                end_date=None,
-                due_date=None,
-                real_start_date=None,
-                project_id=entity["project_id"],
-                task_type_id=task_type["id"],
-                task_status_id=task_status["id"],
-                entity_id=entity["id"],
-                assigner_id=current_user_id,
-                assignees=[],
+        entity_id = str(entity["id"])
+        if entity_id not in skipped_entity_ids:
+            skipped_entity_ids.add(entity_id)
+            task_rows.append(
+                {
+                    "id": fields.gen_uuid(),
+                    "name": "main",
+                    "duration": 0,
+                    "estimation": 0,
+                    "completion_rate": 0,
+                    "start_date": None,
+                    "end_date": None,
+                    "due_date": None,
+                    "real_start_date": None,
+                    "project_id": entity["project_id"],
+                    "task_type_id": task_type["id"],
+                    "task_status_id": task_status["id"],
+                    "entity_id": entity_id,
+                    "assigner_id": current_user_id,
+                    "created_at": now,
+                    "updated_at": now,
+                }
             )
-            tasks.append(task)
+    if not task_rows:
+        return []
+    db.session.execute(Task.__table__.insert(), task_rows)
     Task.commit()
 
-    task_dicts = []
-    for task in tasks:
-        task_dict = _finalize_task_creation(task_type, task_status, task)
-        task_dicts.append(task_dict)
-
+    tasks = {}
+    task_ids = [task_row["id"] for task_row in task_rows]
+    for index in range(0, len(task_ids), TASK_CREATION_CHUNK_SIZE):
+        chunk = task_ids[index : index + TASK_CREATION_CHUNK_SIZE]
+        query = Task.query.filter(Task.id.in_(chunk))
+        for task in Task.serialize_query(query):
+            tasks[task["id"]] = task
+
+    task_dicts = [
+        _build_created_task_dict(task_type, task_status, tasks[str(task_id)])
+        for task_id in task_ids
+    ]
+    stats_service.update_episode_stats_for_entities(
+        [task_row["entity_id"] for task_row in task_rows]
+    )
+    events.emit_many(
+        [
+            ("task:new", {"task_id": task["id"]}, task["project_id"])
+            for task in task_dicts
+        ]
+    )
     return task_dicts
 
 
@@ -1191,7 +1241,17 @@ def create_task(task_type, entity, name="main"):
 
 
 def _finalize_task_creation(task_type, task_status, task):
-    task_dict = task.serialize()
+    task_dict = _build_created_task_dict(
+        task_type, task_status, task.serialize()
+    )
+    stats_service.update_episode_stats_for_entities([task.entity_id])
+    events.emit(
+        "task:new", {"task_id": task.id}, project_id=task_dict["project_id"]
+    )
+    return task_dict
+
+
+def _build_created_task_dict(task_type, task_status, task_dict):
     task_dict["assignees"] = []
     task_dict.update(
         {
@@ -1205,9 +1265,6 @@ def _finalize_task_creation(task_type, task_status, task):
             "task_type_priority": task_type.get("priority", ""),
         }
     )
-    events.emit(
-        "task:new", {"task_id": task.id}, project_id=task_dict["project_id"]
-    )
     return task_dict
 
 
@@ -1220,8 +1277,16 @@ def update_task(task_id, data):
     if is_finished(task, data):
         data["end_date"] = datetime.datetime.utcnow()
 
+    previous_entity_id = task.entity_id
     task.update(data)
     clear_task_cache(task_id)
+    shots_service.clear_quotas_cache(task.project_id)
+    if any(field in data for field in EPISODE_STATS_FIELDS):
+        # The task may have moved to another entity: the episode it left
+        # needs its stats updated too.
+        stats_service.update_episode_stats_for_entities(
+            list({previous_entity_id, task.entity_id})
+        )
     events.emit(
         "task:update", {"task_id": task_id}, project_id=str(task.project_id)
     )
@@ -1362,6 +1427,7 @@ def create_or_update_time_spent(task_id, person_id, date, duration, add=False):
         task.duration += task_time_spent.duration
     task.save()
     clear_task_cache(task_id)
+    shots_service.clear_quotas_cache(project_id)
     events.emit("task:update", {"task_id": task_id}, project_id=project_id)
 
     return time_spent.serialize()
@@ -1401,6 +1467,7 @@ def clear_assignation(task_id, person_id=None):
         removed_assignments = [{"id": person_id}]
 
     clear_task_cache(task_id)
+    shots_service.clear_quotas_cache(project_id)
     task_dict = task.serialize()
     for assignee in removed_assignments:
         events.emit(
@@ -1425,6 +1492,7 @@ def assign_task(task_id, person_id, assigner_id=None):
         task.update({"assigner_id": assigner_id})
     task_dict = task.serialize()
     clear_task_cache(task_id)
+    shots_service.clear_quotas_cache(project_id)
     events.emit(
         "task:assign",
         {"task_id": task.id, "person_id": person.id},
@@ -1435,6 +1503,196 @@ def assign_task(task_id, person_id, assigner_id=None):
     return task_dict
 
 
+def assign_tasks(assignations, assigner_id=None):
+    """
+    Assign persons to tasks for given (task id, person id) pairs. Unknown
+    tasks are ignored. All assignations are written with a single multi-row
+    insert, already existing ones are skipped. Emit a *task:assign* event per
+    new assignation and a *task:update* event per updated task, like
+    assign_task does, plus one *task:batch-assign* event per project listing
+    all the new assignations. Return the tasks of given pairs and the new
+    assignations.
+    """
+    assignations = list(
+        dict.fromkeys(
+            (str(task_id), str(person_id))
+            for task_id, person_id in assignations
+        )
+    )
+    person_ids = {person_id for _, person_id in assignations}
+    if not all(fields.is_valid_id(person_id) for person_id in person_ids):
+        raise PersonNotFoundException
+    if Person.query.filter(Person.id.in_(person_ids)).count() != len(
+        person_ids
+    ):
+        raise PersonNotFoundException
+
+    task_ids = [
+        task_id
+        for task_id in dict.fromkeys(task_id for task_id, _ in assignations)
+        if fields.is_valid_id(task_id)
+    ]
+    task_project_ids = {
+        str(task_id): str(project_id)
+        for task_id, project_id in Task.query.filter(
+            Task.id.in_(task_ids)
+        ).with_entities(Task.id, Task.project_id)
+    }
+    assignations = [
+        (task_id, person_id)
+        for task_id, person_id in assignations
+        if task_id in task_project_ids
+    ]
+    if not assignations:
+        return [], []
+
+    new_assignations = [
+        (str(task_id), str(person_id))
+        for task_id, person_id in db.session.execute(
+            insert(assignees_table)
+            .values(
+                [
+                    {"task": task_id, "person": person_id}
+                    for task_id, person_id in assignations
+                ]
+            )
+            .on_conflict_do_nothing()
+            .returning(assignees_table.c.task, assignees_table.c.person)
+        )
+    ]
+    updated_task_ids = list(
+        dict.fromkeys(task_id for task_id, _ in new_assignations)
+    )
+    values = {"updated_at": datetime.datetime.utcnow()}
+    if assigner_id is not None:
+        values["assigner_id"] = assigner_id
+    if updated_task_ids:
+        db.session.execute(
+            update(Task).where(Task.id.in_(updated_task_ids)).values(values)
+        )
+    Task.commit()
+
+    for project_id in {
+        task_project_ids[task_id] for task_id in updated_task_ids
+    }:
+        shots_service.clear_quotas_cache(project_id)
+    _emit_assignation_events(
+        "assign", task_project_ids, updated_task_ids, new_assignations
+    )
+    task_ids = list(dict.fromkeys(task_id for task_id, _ in assignations))
+    tasks = {
+        task["id"]: task
+        for task in Task.serialize_query(
+            Task.query.filter(Task.id.in_(task_ids))
+        )
+    }
+    return [tasks[task_id] for task_id in task_ids], new_assignations
+
+
+def clear_assignations(assignations):
+    """
+    Remove assignations matching given (task id, person id) pairs. When the
+    person id is None, every assignee of the task is removed. Deletion is
+    done with a single statement. Emit a *task:unassign* event per removed
+    assignation and a *task:update* event per updated task, like
+    clear_assignation does, plus one *task:batch-unassign* event per project.
+    Return the removed assignations.
+    """
+    all_task_ids = [
+        str(task_id)
+        for task_id, person_id in assignations
+        if person_id is None and fields.is_valid_id(str(task_id))
+    ]
+    pairs = [
+        (str(task_id), str(person_id))
+        for task_id, person_id in assignations
+        if person_id is not None
+        and fields.is_valid_id(str(task_id))
+        and fields.is_valid_id(str(person_id))
+    ]
+    conditions = []
+    if all_task_ids:
+        conditions.append(assignees_table.c.task.in_(all_task_ids))
+    if pairs:
+        conditions.append(
+            tuple_(assignees_table.c.task, assignees_table.c.person).in_(pairs)
+        )
+    if not conditions:
+        return []
+
+    removed_assignations = [
+        (str(task_id), str(person_id))
+        for task_id, person_id in db.session.execute(
+            assignees_table.delete()
+            .where(or_(*conditions))
+            .returning(assignees_table.c.task, assignees_table.c.person)
+        )
+    ]
+    updated_task_ids = list(
+        dict.fromkeys(task_id for task_id, _ in removed_assignations)
+    )
+    task_project_ids = {}
+    if updated_task_ids:
+        task_project_ids = {
+            str(task_id): str(project_id)
+            for task_id, project_id in db.session.execute(
+                update(Task)
+                .where(Task.id.in_(updated_task_ids))
+                .values(updated_at=datetime.datetime.utcnow())
+                .returning(Task.id, Task.project_id)
+            )
+        }
+    Task.commit()
+
+    for project_id in set(task_project_ids.values()):
+        shots_service.clear_quotas_cache(project_id)
+    _emit_assignation_events(
+        "unassign", task_project_ids, updated_task_ids, removed_assignations
+    )
+    return removed_assignations
+
+
+def _emit_assignation_events(
+    action, task_project_ids, updated_task_ids, assignations
+):
+    """
+    Clear cache of updated tasks and emit the events of given assign or
+    unassign action in one batch.
+    """
+    if not updated_task_ids:
+        return
+    cache.invalidate_tags(
+        *["task:%s" % task_id for task_id in updated_task_ids]
+    )
+    project_assignations = {}
+    event_list = []
+    for task_id, person_id in assignations:
+        project_id = task_project_ids[task_id]
+        project_assignations.setdefault(project_id, []).append(
+            {"task_id": task_id, "person_id": person_id}
+        )
+        event_list.append(
+            (
+                "task:%s" % action,
+                {"task_id": task_id, "person_id": person_id},
+                project_id,
+            )
+        )
+    for task_id in updated_task_ids:
+        event_list.append(
+            ("task:update", {"task_id": task_id}, task_project_ids[task_id])
+        )
+    for project_id, project_assignation_list in project_assignations.items():
+        event_list.append(
+            (
+                "task:batch-%s" % action,
+                {"assignations": project_assignation_list},
+                project_id,
+            )
+        )
+    events.emit_many(event_list)
+
+
 def task_to_review(
     task_id, person, comment, preview_path={}, change_status=True
 ):
@@ -1521,16 +1779,19 @@ def add_preview_file_to_comment(comment_id, person_id, task_id, revision=0):
     return preview_file.serialize()
 
 
-def get_comments_for_project(project_id, page=0):
+def get_comments_for_project(project_id, page=0, stream=False):
     """
-    Return all comments for given project.
+    Return all comments for given project. If stream is True and no page is
+    given, a response streaming the comments is returned.
     """
     query = (
         Comment.query.join(Task, Task.id == Comment.object_id)
         .filter(Task.project_id == project_id)
         .order_by(Comment.updated_at.desc())
     )
-    return query_utils.get_paginated_results(query, page, relations=True)
+    return query_utils.get_paginated_results(
+        query, page, relations=True, stream=stream
+    )
 
 
 def get_time_spents_for_project(project_id, page=0):
@@ -1541,14 +1802,17 @@ def get_time_spents_for_project(project_id, page=0):
     return query_utils.get_paginated_results(query, page)
 
 
-def get_tasks_for_project(project_id, page=0):
+def get_tasks_for_project(project_id, page=0, stream=False):
     """
-    Return all tasks for given project.
+    Return all tasks for given project. If stream is True and no page is
+    given, a response streaming the tasks is returned.
     """
     query = Task.query.filter(Task.project_id == project_id).order_by(
         Task.updated_at.desc()
     )
-    return query_utils.get_paginated_results(query, page, relations=True)
+    return query_utils.get_paginated_results(
+        query, page, relations=True, stream=stream
+    )
 
 
 def get_full_task(task_id, user_id):
@@ -1604,9 +1868,178 @@ def get_full_task(task_id, user_id):
     return task
 
 
-def reset_tasks_data(project_id):
-    for task in Task.get_all_by(project_id=project_id):
-        reset_task_data(str(task.id))
+def reset_tasks_data(project_id, progress_callback=None):
+    """
+    Recompute retake count, real start date, end date, last comment date,
+    duration and status of all tasks of given project from their comments
+    and time spents, like reset_task_data does for a single task. Values are
+    computed and applied with a few set-based queries per chunk of tasks.
+    Only tasks whose data changed are modified. If a progress callback is
+    given, it's called with the number of processed tasks and the total
+    number of tasks after each chunk. Return the number of modified tasks.
+    """
+    default_status_id = get_default_status()["id"]
+    task_ids = [
+        task_id
+        for (task_id,) in Task.query.filter(Task.project_id == project_id)
+        .with_entities(Task.id)
+        .order_by(Task.id)
+    ]
+    updated_task_ids = []
+    for index in range(0, len(task_ids), TASK_RESET_CHUNK_SIZE):
+        chunk = task_ids[index : index + TASK_RESET_CHUNK_SIZE]
+        updated_task_ids += _reset_tasks_data_chunk(chunk, default_status_id)
+        Task.commit()
+        if progress_callback is not None:
+            progress_callback(index + len(chunk), len(task_ids))
+
+    if updated_task_ids:
+        cache.invalidate_tags(
+            *["task:%s" % task_id for task_id in updated_task_ids]
+        )
+        stats_service.update_episode_stats(project_id)
+        shots_service.clear_quotas_cache(project_id)
+        events.emit_many(
+            [
+                ("task:update", {"task_id": task_id}, project_id)
+                for task_id in updated_task_ids
+            ]
+        )
+    return len(updated_task_ids)
+
+
+def reset_tasks_data_job(project_id):
+    """
+    Run reset_tasks_data from the job queue. Progress is stored in the job
+    metadata as a {"done": nb processed tasks, "total": nb tasks} dict.
+    """
+    from rq import get_current_job
+
+    job = get_current_job()
+
+    def save_progress(done, total):
+        if job is not None:
+            job.meta["progress"] = {"done": done, "total": total}
+            job.save_meta()
+
+    with app.app_context():
+        return reset_tasks_data(project_id, progress_callback=save_progress)
+
+
+def _reset_tasks_data_chunk(task_ids, default_status_id):
+    """
+    Update data of given tasks with a single UPDATE statement and return the
+    ids of modified tasks.
+    """
+    ordered_comments = (
+        select(
+            Comment.object_id.label("task_id"),
+            Comment.created_at,
+            Comment.task_status_id,
+            func.coalesce(TaskStatus.is_retake, False).label("is_retake"),
+            func.coalesce(
+                func.lag(TaskStatus.is_retake).over(
+                    partition_by=Comment.object_id,
+                    order_by=Comment.created_at,
+                ),
+                False,
+            ).label("previous_is_retake"),
+            func.coalesce(TaskStatus.is_feedback_request, False).label(
+                "is_feedback_request"
+            ),
+            func.lower(TaskStatus.short_name).label("short_name"),
+            func.row_number()
+            .over(
+                partition_by=Comment.object_id,
+                order_by=Comment.created_at.desc(),
+            )
+            .label("reverse_rank"),
+        )
+        .join(TaskStatus, Comment.task_status_id == TaskStatus.id)
+        .where(Comment.object_id.in_(task_ids))
+        .subquery()
+    )
+    comment_stats = (
+        select(
+            ordered_comments.c.task_id,
+            func.count()
+            .filter(
+                ordered_comments.c.is_retake
+                & ~ordered_comments.c.previous_is_retake
+            )
+            .label("retake_count"),
+            func.min(ordered_comments.c.created_at)
+            .filter(ordered_comments.c.short_name == "wip")
+            .label("real_start_date"),
+            func.max(ordered_comments.c.created_at)
+            .filter(ordered_comments.c.is_feedback_request)
+            .label("end_date"),
+            func.max(ordered_comments.c.created_at).label("last_comment_date"),
+        )
+        .group_by(ordered_comments.c.task_id)
+        .subquery()
+    )
+    last_statuses = (
+        select(ordered_comments.c.task_id, ordered_comments.c.task_status_id)
+        .where(ordered_comments.c.reverse_rank == 1)
+        .subquery()
+    )
+    durations = (
+        select(
+            TimeSpent.task_id,
+            func.sum(TimeSpent.duration).label("duration"),
+        )
+        .where(TimeSpent.task_id.in_(task_ids))
+        .group_by(TimeSpent.task_id)
+        .subquery()
+    )
+    task_data = (
+        select(
+            Task.id,
+            func.coalesce(durations.c.duration, 0).label("duration"),
+            func.coalesce(comment_stats.c.retake_count, 0).label(
+                "retake_count"
+            ),
+            comment_stats.c.real_start_date,
+            comment_stats.c.last_comment_date,
+            comment_stats.c.end_date,
+            func.coalesce(
+                last_statuses.c.task_status_id, default_status_id
+            ).label("task_status_id"),
+        )
+        .outerjoin(durations, durations.c.task_id == Task.id)
+        .outerjoin(comment_stats, comment_stats.c.task_id == Task.id)
+        .outerjoin(last_statuses, last_statuses.c.task_id == Task.id)
+        .where(Task.id.in_(task_ids))
+        .subquery()
+    )
+    task_table = Task.__table__
+    columns = [
+        "duration",
+        "retake_count",
+        "real_start_date",
+        "last_comment_date",
+        "end_date",
+        "task_status_id",
+    ]
+    result = db.session.execute(
+        update(task_table)
+        .where(task_table.c.id == task_data.c.id)
+        .where(
+            or_(
+                *[
+                    task_table.c[column].is_distinct_from(task_data.c[column])
+                    for column in columns
+                ]
+            )
+        )
+        .values(
+            updated_at=datetime.datetime.utcnow(),
+            **{column: task_data.c[column] for column in columns},
+        )
+        .returning(task_table.c.id)
+    )
+    return [str(task_id) for (task_id,) in result]
 
 
 def reset_task_data(task_id):
@@ -1665,6 +2098,8 @@ def reset_task_data(task_id):
         }
     )
     project_id = str(task.project_id)
+    shots_service.clear_quotas_cache(project_id)
+    stats_service.update_episode_stats_for_tasks([task.id])
     events.emit("task:update", {"task_id": task.id}, project_id)
     return task.serialize()
 
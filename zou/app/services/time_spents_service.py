@@ -29,7 +29,7 @@ def get_time_spents_for_entity(entity_id):
         .filter(Task.entity_id == entity_id)
         .order_by(TimeSpent.date.desc())
     )
-    return TimeSpent.serialize_list(query.all())
+    return TimeSpent.serialize_query(query)
 
 
 def get_year_table(person_id=None, project_id=None, department_ids=None):
@@ -37,11 +37,11 @@ from zou.app.utils import cache, fields, permissions
 
 
 def clear_filter_cache(user_id):
-    cache.cache.delete_memoized(get_user_filters, user_id)
+    cache.invalidate_tags("search_filter:%s" % user_id)
 
 
 def clear_filter_group_cache(user_id):
-    cache.cache.delete_memoized(get_user_filter_groups, user_id)
+    cache.invalidate_tags("search_filter_group:%s" % user_id)
 
 
 def clear_project_cache():
@@ -719,6 +719,91 @@ def check_task_departement_access_for_unassign(task_id, person_id=None):
     return is_allowed
 
 
+def get_allowed_assignations(task_ids, person_ids, unassign=False):
+    """
+    Return the (task id, person id) pairs, among given tasks and persons,
+    the current user is allowed to assign (or unassign), following the rules
+    of check_task_departement_access (or
+    check_task_departement_access_for_unassign). Tasks, project teams and
+    person departments are read once for all pairs instead of once per
+    pair. Unknown task ids are ignored.
+    """
+    user = persons_service.get_current_user(relations=True)
+    user_departments = set(user["departments"])
+    is_admin = permissions.has_admin_permissions()
+    is_manager = permissions.has_manager_permissions()
+    is_supervisor = permissions.has_supervisor_permissions()
+
+    task_ids = [
+        task_id for task_id in task_ids if fields.is_valid_id(str(task_id))
+    ]
+    tasks = (
+        Task.query.filter(Task.id.in_(task_ids))
+        .join(TaskType, TaskType.id == Task.task_type_id)
+        .with_entities(Task.id, Task.project_id, TaskType.department_id)
+        .all()
+    )
+    user_task_ids = set()
+    if unassign and tasks:
+        user_task_ids = {
+            str(task_id)
+            for (task_id,) in Task.query.filter(Task.id.in_(task_ids))
+            .filter(Task.assignees.any(Person.id == user["id"]))
+            .with_entities(Task.id)
+        }
+
+    project_access = {}
+    person_departments = {}
+    assignations = []
+    for task_id, project_id, department_id in tasks:
+        task_id = str(task_id)
+        project_id = str(project_id)
+        department_id = fields.serialize_value(department_id)
+        if not is_admin:
+            if project_id not in project_access:
+                project_access[project_id] = check_belong_to_project(
+                    project_id
+                )
+            if not project_access[project_id]:
+                continue
+        for person_id in person_ids:
+            if is_admin or is_manager:
+                is_allowed = True
+            elif unassign:
+                is_allowed = (
+                    is_supervisor
+                    and (
+                        len(user_departments) == 0
+                        or department_id in user_departments
+                    )
+                ) or (task_id in user_task_ids and person_id == user["id"])
+            else:
+                if is_supervisor and person_id not in person_departments:
+                    person_departments[person_id] = set(
+                        persons_service.get_person(person_id)["departments"]
+                    )
+                is_allowed = (
+                    is_supervisor
+                    and (
+                        len(user_departments) == 0
+                        or (
+                            department_id in user_departments
+                            and len(
+                                person_departments[person_id]
+                                & user_departments
+                            )
+                            > 0
+                        )
+                    )
+                ) or (
+                    department_id in user_departments
+                    and person_id == user["id"]
+                )
+            if is_allowed:
+                assignations.append((task_id, person_id))
+    return assignations
+
+
 def check_all_departments_access(project_id, departments=[]):
     """
     Return true if current user is admin or is manager and is in team or is
@@ -785,7 +870,7 @@ def get_filters():
     return get_user_filters(current_user["id"])
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["search_filter:{current_user_id}"])
 def get_user_filters(current_user_id):
     """
     Retrieve search filters used for given user. It groups them by
@@ -886,7 +971,7 @@ def get_filter_groups():
     return get_user_filter_groups(current_user["id"])
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=["search_filter_group:{current_user_id}"])
 def get_user_filter_groups(current_user_id):
     """
     Retrieve search filter groups used for given user. It groups them by
@@ -1078,6 +1163,9 @@ def get_last_notifications(
         query = query.filter(Notification.type == notification_type)
 
     notifications = query.limit(100).all()
+    entity_names = names_service.get_full_entity_names(
+        {row.entity_id for row in notifications}
+    )
 
     for (
         notification,
@@ -1091,9 +1179,7 @@ def get_last_notifications(
         task_entity_id,
         role,
     ) in notifications:
-        (full_entity_name, episode_id) = names_service.get_full_entity_name(
-            task_entity_id
-        )
+        (full_entity_name, episode_id) = entity_names[str(task_entity_id)]
         preview_file_id = None
         mentions = []
         department_mentions = []
@@ -0,0 +1,64 @@
+import sys
+import redis
+
+from zou.app import config
+
+try:
+    counters_store = redis.StrictRedis(
+        host=config.KEY_VALUE_STORE["host"],
+        port=config.KEY_VALUE_STORE["port"],
+        db=config.KV_COUNTERS_DB_INDEX,
+        decode_responses=True,
+    )
+    counters_store.get("test")
+except redis.ConnectionError:
+    try:
+        import fakeredis
+
+        counters_store = fakeredis.FakeStrictRedis()
+    except BaseException:
+        print("Cannot access to the required Redis instance")
+        sys.exit(1)
+
+
+def get_values(keys):
+    """
+    Retrieve values of given counters. None is returned for counters that are
+    not set.
+    """
+    return [
+        int(value) if value is not None else None
+        for value in counters_store.mget(keys)
+    ]
+
+
+def set_values(values, ttl):
+    """
+    Set counters from given dict of values. Counters expire after given time
+    to live (in seconds), so they are regularly computed again.
+    """
+    pipeline = counters_store.pipeline()
+    for key, value in values.items():
+        pipeline.set(key, value, ex=ttl)
+    pipeline.execute()
+
+
+def increment(key, amount=1):
+    """
+    Add given amount to given counter. Nothing is done if the counter is not
+    set: it will be computed again from the database when it's needed.
+    """
+    if counters_store.exists(key):
+        pipeline = counters_store.pipeline()
+        pipeline.incrby(key, amount)
+        pipeline.ttl(key)
+        _, ttl = pipeline.execute()
+        if ttl == -1:  # The counter expired before being incremented.
+            counters_store.delete(key)
+
+
+def clear():
+    """
+    Remove all counters.
+    """
+    counters_store.flushdb()
@@ -2,14 +2,627 @@
 This module is a wrapper for flask_caching. It configures it and rename
 the memoize function. The aim with that cache is to minimize the requests
 made on the target database.
+
+Memoized values are stored in two tiers: a small in-process LRU cache placed
+in front of the Redis backend. The local tier avoids a network round trip for
+the hottest lookups. Invalidations are broadcasted through Redis pub/sub so
+every worker drops its local copy.
+
+Memoized functions can declare tags like `project:{project_id}` or
+`task_type:*`. They are resolved from the function arguments (and from the
+result with `{result[id]}`) and stored in Redis sets. `invalidate_tags` evicts
+exactly the entries depending on given tags.
+
+In single-flight mode, only one worker recomputes an expired entry while the
+others wait briefly or get the stale value. Entries are also refreshed
+randomly before they expire to avoid recomputing them all at the same time.
+
+When the zstandard module is available, values are stored in the backend
+with a compact serializer: plain dict/list payloads are encoded with orjson
+and compressed with zstd above a size threshold. Without compression, orjson
+payloads are bigger than pickle ones, so pickle is kept in that case.
+
+During a request, memoized results are also kept in a request-local cache
+stored on `flask.g`. The same lookup done many times while serving a request
+(like the current user or a task status) is computed once. This cache is
+dropped when the request is torn down.
 """
+import os
+import math
+import random
+import inspect
+import time
+import uuid
+import pickle
+import struct
+import functools
+import threading
+import orjson as json
 import redis
 
-from flask_caching import Cache
+from collections import OrderedDict, namedtuple
+
+from flask import g, has_request_context
+from flask_caching import Cache, function_namespace
 from zou.app import config
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+INVALIDATION_CHANNEL = "zou-memoize-invalidation"
+TAG_KEY_PREFIX = "memoize-tag:"
+TAGS_TIMEOUT = 3600
+LOCK_KEY_PREFIX = "memoize-lock:"
+LOCK_TIMEOUT = 10
+EARLY_REFRESH_BETA = 1.0
+
+stats = {
+    "request": {"hits": 0, "misses": 0},
+    "local": {"hits": 0, "misses": 0},
+    "redis": {"lookups": 0, "misses": 0, "stale": 0},
+}
+
+CacheEntry = namedtuple("CacheEntry", ["value", "delta", "expires_at"])
+
+
+def needs_refresh(entry, beta=EARLY_REFRESH_BETA):
+    """
+    Tell if given entry must be recomputed. Once expired it always needs a
+    refresh. Before that, the closer the expiration and the longer the
+    computation, the more likely an early refresh is (XFetch algorithm).
+    """
+    rand = 1.0 - random.random()
+    return time.time() - entry.delta * beta * math.log(rand) >= (
+        entry.expires_at
+    )
+
+
+def is_plain(value):
+    """
+    Tell if given value is made only of types that survive a JSON round trip
+    unchanged.
+    """
+    value_type = type(value)
+    if value_type in (str, int, bool) or value is None:
+        return True
+    elif value_type is float:
+        return math.isfinite(value)
+    elif value_type is dict:
+        return all(
+            type(key) is str and is_plain(item) for key, item in value.items()
+        )
+    elif value_type is list:
+        return all(is_plain(item) for item in value)
+    else:
+        return False
+
+
+class CompactSerializer(object):
+    """
+    Serializer for the cache backend. Plain payloads, which are what services
+    return, are encoded with orjson. Other values fall back on pickle like the
+    default serializer. Payloads bigger than the compression threshold are
+    compressed with zstd if available. A one byte prefix tells how the value
+    is encoded.
+    """
+
+    def __init__(self, compression_threshold=4096):
+        self.compression_threshold = compression_threshold
+
+    def dumps(self, value, protocol=pickle.HIGHEST_PROTOCOL):
+        if isinstance(value, CacheEntry):
+            return (
+                b"e"
+                + struct.pack("!dd", value.delta, value.expires_at)
+                + self.dumps(value.value, protocol)
+            )
+
+        payload = None
+        if is_plain(value):
+            try:
+                payload = b"j" + json.dumps(value)
+            except json.JSONEncodeError:
+                pass
+        if payload is None:
+            payload = b"!" + pickle.dumps(value, protocol)
+
+        if (
+            zstandard is not None
+            and self.compression_threshold > 0
+            and len(payload) > self.compression_threshold
+        ):
+            payload = b"z" + zstandard.compress(payload)
+        return payload
+
+    def loads(self, value):
+        if value is None:
+            return None
+        prefix = value[:1]
+        if prefix == b"j":
+            return json.loads(value[1:])
+        elif prefix == b"e":
+            delta, expires_at = struct.unpack("!dd", value[1:17])
+            return CacheEntry(self.loads(value[17:]), delta, expires_at)
+        elif prefix == b"z":
+            return self.loads(zstandard.decompress(value[1:]))
+        elif prefix == b"!":
+            try:
+                return pickle.loads(value[1:])
+            except pickle.PickleError:
+                return None
+        try:
+            return int(value)
+        except ValueError:
+            return value
+
+
+class LocalCache(object):
+    """
+    Bounded LRU cache living in the memory of the current process. Values are
+    stored pickled so callers can't alter cached data by mutating the dicts
+    they get back.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return False, None
+            self.entries.move_to_end(key)
+        return True, pickle.loads(value)
+
+    def set(self, key, value, timeout=None):
+        ttl = self.ttl
+        if timeout:
+            ttl = min(ttl, timeout)
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, fname, args_key=None):
+        """
+        Remove entries related to given function. If args_key is given, only
+        the entry matching these arguments is removed.
+        """
+        with self.lock:
+            if args_key is not None:
+                self.entries.pop((fname, args_key), None)
+            else:
+                for key in [key for key in self.entries if key[0] == fname]:
+                    del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def get_request_cache():
+    """
+    Return the memoize cache of the current request. It's created on first
+    use. None is returned outside of a request.
+    """
+    if not config.MEMOIZE_REQUEST_CACHE_ENABLED or not has_request_context():
+        return None
+    request_cache = g.get("memoize_request_cache", None)
+    if request_cache is None:
+        request_cache = LocalCache(
+            max_size=config.MEMOIZE_REQUEST_CACHE_SIZE,
+            ttl=config.MEMOIZE_REQUEST_CACHE_TTL,
+        )
+        g.memoize_request_cache = request_cache
+    return request_cache
+
+
+def clear_request_cache(exception=None):
+    if has_request_context():
+        g.pop("memoize_request_cache", None)
+
+
+class TwoTierCache(Cache):
+    """
+    Flask caching object that adds a per-process LRU cache in front of the
+    configured backend for memoized functions.
+    """
+
+    def __init__(
+        self, redis_store=None, local_cache=None, serializer=None, **kwargs
+    ):
+        super(TwoTierCache, self).__init__(**kwargs)
+        self.redis_store = redis_store
+        self.local_cache = local_cache
+        self.serializer = serializer
+        self.process_id = str(uuid.uuid4())
+        self.listener_pid = None
+        self.listener = None
+        self.memory_tags = {}
+        self.tags_lock = threading.Lock()
+
+    def init_app(self, app, config=None):
+        super(TwoTierCache, self).init_app(app, config)
+        if self.serializer is not None:
+            app.extensions["cache"][self].serializer = self.serializer
+        app.teardown_request(clear_request_cache)
+
+    def memoize(
+        self, timeout=None, *args, tags=None, single_flight=None, **kwargs
+    ):
+        redis_memoize = super(TwoTierCache, self).memoize(
+            timeout, *args, **kwargs
+        )
+        if single_flight is None:
+            single_flight = config.MEMOIZE_SINGLE_FLIGHT_ENABLED
+
+        def decorator(f):
+            @functools.wraps(f)
+            def compute(*fargs, **fkwargs):
+                stats["redis"]["misses"] += 1
+                value = f(*fargs, **fkwargs)
+                if tags:
+                    self.tag_entry(
+                        tags, redis_memoized, value, *fargs, **fkwargs
+                    )
+                return value
+
+            redis_memoized = redis_memoize(compute)
+            if single_flight and timeout:
+                # The version key of the function must outlive its entries
+                # for stale values to remain reachable.
+                redis_memoized.cache_timeout = (
+                    timeout + config.MEMOIZE_STALE_TTL
+                )
+
+            def fetch(*fargs, **fkwargs):
+                stats["redis"]["lookups"] += 1
+                if single_flight:
+                    return self.single_flight_get(
+                        redis_memoized, timeout, *fargs, **fkwargs
+                    )
+                else:
+                    return redis_memoized(*fargs, **fkwargs)
+
+            @functools.wraps(f)
+            def decorated_function(*fargs, **fkwargs):
+                request_cache = get_request_cache()
+                if self.local_cache is None and request_cache is None:
+                    return fetch(*fargs, **fkwargs)
+
+                key = self.make_local_key(compute, *fargs, **fkwargs)
+                if request_cache is not None:
+                    found, value = request_cache.get(key)
+                    if found:
+                        stats["request"]["hits"] += 1
+                        return value
+                    stats["request"]["misses"] += 1
+
+                found = False
+                if self.local_cache is not None:
+                    self.listen_invalidations()
+                    found, value = self.local_cache.get(key)
+                    if found:
+                        stats["local"]["hits"] += 1
+                    else:
+                        stats["local"]["misses"] += 1
+
+                if not found:
+                    value = fetch(*fargs, **fkwargs)
+                    if value is not None and self.local_cache is not None:
+                        self.local_cache.set(key, value, timeout=timeout)
+                if value is not None and request_cache is not None:
+                    request_cache.set(key, value, timeout=timeout)
+                return value
+
+            decorated_function.uncached = redis_memoized.uncached
+            decorated_function.cache_timeout = redis_memoized.cache_timeout
+            decorated_function.make_cache_key = redis_memoized.make_cache_key
+            decorated_function.delete_memoized = lambda: self.delete_memoized(
+                decorated_function
+            )
+            decorated_function.tags = tags or []
+            return decorated_function
+
+        return decorator
+
+    def single_flight_get(self, redis_memoized, timeout, *args, **kwargs):
+        """
+        Get memoized value from the backend. When it's missing or expired, a
+        short lock makes sure that only one worker recomputes it. Others
+        return the stale value if there is one, or wait for the new value.
+        """
+        f = redis_memoized.uncached
+        try:
+            key = redis_memoized.make_cache_key(f, *args, **kwargs)
+            entry = self.cache.get(key)
+        except redis.ConnectionError:
+            return f(*args, **kwargs)
+
+        if isinstance(entry, CacheEntry):
+            if not needs_refresh(entry):
+                return entry.value
+            elif self.acquire_lock(key):
+                return self.compute_entry(f, key, timeout, *args, **kwargs)
+            else:
+                stats["redis"]["stale"] += 1
+                return entry.value
+        elif entry is not None:
+            return entry
+
+        if self.acquire_lock(key):
+            return self.compute_entry(f, key, timeout, *args, **kwargs)
+
+        deadline = time.monotonic() + config.MEMOIZE_SINGLE_FLIGHT_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = self.cache.get(key)
+            if isinstance(entry, CacheEntry):
+                return entry.value
+        return f(*args, **kwargs)
+
+    def compute_entry(self, f, key, timeout, *args, **kwargs):
+        """
+        Compute the value and store it with the information needed for early
+        refresh. The entry is kept a bit longer than its timeout to be served
+        as a stale value while a worker recomputes it.
+        """
+        timeout = timeout or self.config.get("CACHE_DEFAULT_TIMEOUT", 300)
+        try:
+            start = time.time()
+            value = f(*args, **kwargs)
+            end = time.time()
+            if value is not None:
+                self.cache.set(
+                    key,
+                    CacheEntry(value, end - start, end + timeout),
+                    timeout=timeout + config.MEMOIZE_STALE_TTL,
+                )
+            return value
+        finally:
+            self.release_lock(key)
+
+    def acquire_lock(self, key):
+        try:
+            return self.cache.add(
+                LOCK_KEY_PREFIX + key, self.process_id, timeout=LOCK_TIMEOUT
+            )
+        except redis.ConnectionError:
+            return True
+
+    def release_lock(self, key):
+        try:
+            self.cache.delete(LOCK_KEY_PREFIX + key)
+        except redis.ConnectionError:
+            pass
+
+    def make_local_key(self, f, *args, **kwargs):
+        fname, _ = function_namespace(f)
+        keyargs, keykwargs = self._memoize_kwargs_to_args(f, *args, **kwargs)
+        return (fname, "%s%s" % (keyargs, dict(keykwargs)))
+
+    def delete_memoized(self, f, *args, **kwargs):
+        super(TwoTierCache, self).delete_memoized(f, *args, **kwargs)
+        request_cache = get_request_cache()
+        if self.local_cache is not None or request_cache is not None:
+            fname, _ = function_namespace(f)
+            args_key = None
+            if args or kwargs:
+                _, args_key = self.make_local_key(f.uncached, *args, **kwargs)
+            if request_cache is not None:
+                request_cache.delete(fname, args_key)
+        if self.local_cache is not None:
+            self.local_cache.delete(fname, args_key)
+            self.publish_invalidation([(fname, args_key)])
+
+    def clear(self):
+        result = super(TwoTierCache, self).clear()
+        self.delete_tag_sets(self.get_tag_keys(TAG_KEY_PREFIX + "*"))
+        clear_request_cache()
+        if self.local_cache is not None:
+            self.local_cache.clear()
+            self.publish_invalidation(None)
+        return result
+
+    def resolve_tags(self, tags, f, value, *args, **kwargs):
+        """
+        Build tag names by filling tag templates with the memoized function
+        arguments and result. Tags that can't be resolved are skipped.
+        """
+        try:
+            arguments = inspect.signature(f).bind(*args, **kwargs)
+            arguments.apply_defaults()
+            arguments = arguments.arguments
+        except TypeError:
+            arguments = {}
+        resolved_tags = []
+        for tag in tags:
+            try:
+                resolved_tags.append(tag.format(result=value, **arguments))
+            except (KeyError, IndexError, TypeError, AttributeError):
+                pass
+        return resolved_tags
+
+    def tag_entry(self, tags, redis_memoized, value, *args, **kwargs):
+        """
+        Register the cache entry matching given arguments in the sets of the
+        tags it depends on.
+        """
+        f = redis_memoized.uncached
+        resolved_tags = self.resolve_tags(tags, f, value, *args, **kwargs)
+        if not resolved_tags:
+            return
+        fname, args_key = self.make_local_key(f, *args, **kwargs)
+        entry = json.dumps(
+            {
+                "fname": fname,
+                "args_key": args_key,
+                "key": redis_memoized.make_cache_key(f, *args, **kwargs),
+            }
+        ).decode("utf-8")
+        tag_keys = [TAG_KEY_PREFIX + tag for tag in resolved_tags]
+        if self.redis_store is None:
+            with self.tags_lock:
+                for tag_key in tag_keys:
+                    self.memory_tags.setdefault(tag_key, set()).add(entry)
+        else:
+            try:
+                pipeline = self.redis_store.pipeline()
+                for tag_key in tag_keys:
+                    pipeline.sadd(tag_key, entry)
+                    pipeline.expire(tag_key, TAGS_TIMEOUT)
+                pipeline.execute()
+            except redis.ConnectionError:
+                pass
+
+    def get_tag_keys(self, pattern):
+        if self.redis_store is None:
+            prefix = pattern.rstrip("*")
+            with self.tags_lock:
+                return [
+                    key for key in self.memory_tags if key.startswith(prefix)
+                ]
+        else:
+            try:
+                return list(self.redis_store.scan_iter(match=pattern))
+            except redis.ConnectionError:
+                return []
+
+    def delete_tag_sets(self, tag_keys):
+        """
+        Remove given tag sets and return the entries they contained.
+        """
+        entries = set()
+        if not tag_keys:
+            return entries
+        if self.redis_store is None:
+            with self.tags_lock:
+                for tag_key in tag_keys:
+                    entries.update(self.memory_tags.pop(tag_key, set()))
+        else:
+            try:
+                pipeline = self.redis_store.pipeline()
+                for tag_key in tag_keys:
+                    pipeline.smembers(tag_key)
+                pipeline.delete(*tag_keys)
+                for members in pipeline.execute()[:-1]:
+                    entries.update(members)
+            except redis.ConnectionError:
+                pass
+        return entries
+
+    def invalidate_tags(self, *tags):
+        """
+        Evict every memoized entry depending on given tags. A tag like
+        `project:<id>` evicts entries tagged with it and entries tagged with
+        `project:*` (entries depending on all projects). A wildcard tag like
+        `project:*` evicts all entries tagged with a project.
+        """
+        tag_keys = set()
+        for tag in tags:
+            kind, _, value = tag.partition(":")
+            if value == "*":
+                tag_keys.update(
+                    self.get_tag_keys("%s%s:*" % (TAG_KEY_PREFIX, kind))
+                )
+            else:
+                tag_keys.add(TAG_KEY_PREFIX + tag)
+                tag_keys.add("%s%s:*" % (TAG_KEY_PREFIX, kind))
+
+        entries = [
+            json.loads(entry) for entry in self.delete_tag_sets(tag_keys)
+        ]
+        if not entries:
+            return []
+
+        self.cache.delete_many(*[entry["key"] for entry in entries])
+        local_entries = [
+            (entry["fname"], entry["args_key"]) for entry in entries
+        ]
+        request_cache = get_request_cache()
+        if request_cache is not None:
+            for fname, args_key in local_entries:
+                request_cache.delete(fname, args_key)
+        if self.local_cache is not None:
+            for fname, args_key in local_entries:
+                self.local_cache.delete(fname, args_key)
+            self.publish_invalidation(local_entries)
+        return entries
+
+    def publish_invalidation(self, entries):
+        """
+        Tell other workers to drop their local copy of given entries. Entries
+        are (function name, arguments key) pairs, a None arguments key meaning
+        all results of the function. None entries means the whole local cache
+        must be cleared.
+        """
+        if self.redis_store is None:
+            return
+        message = {"sender": self.process_id, "entries": entries}
+        try:
+            self.redis_store.publish(INVALIDATION_CHANNEL, json.dumps(message))
+        except redis.ConnectionError:
+            self.local_cache.clear()
+
+    def handle_invalidation(self, message):
+        data = json.loads(message["data"])
+        if data["sender"] == self.process_id:
+            return
+        if data["entries"] is None:
+            self.local_cache.clear()
+        else:
+            for fname, args_key in data["entries"]:
+                self.local_cache.delete(fname, args_key)
+
+    def listen_invalidations(self):
+        """
+        Start listening to invalidation messages. It's done lazily and once
+        per process because the listening thread must not be shared by
+        forked workers.
+        """
+        if self.redis_store is None or self.listener_pid == os.getpid():
+            return
+        self.listener_pid = os.getpid()
+        self.local_cache.clear()
+        try:
+            pubsub = self.redis_store.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(
+                **{INVALIDATION_CHANNEL: self.handle_invalidation}
+            )
+            self.listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except redis.ConnectionError:
+            self.listener = None
+
 
 cache = None
+local_cache = None
+serializer = None
+if config.MEMOIZE_SERIALIZER == "compact" or (
+    config.MEMOIZE_SERIALIZER == "auto" and zstandard is not None
+):
+    serializer = CompactSerializer(
+        compression_threshold=config.MEMOIZE_COMPRESSION_THRESHOLD
+    )
+if config.MEMOIZE_LOCAL_CACHE_ENABLED:
+    local_cache = LocalCache(
+        max_size=config.MEMOIZE_LOCAL_CACHE_SIZE,
+        ttl=config.MEMOIZE_LOCAL_CACHE_TTL,
+    )
 
 try:
     redis_cache = redis.StrictRedis(
@@ -19,19 +632,26 @@ try:
         decode_responses=True,
     )
     redis_cache.get("test")
-    cache = Cache(
+    cache = TwoTierCache(
+        redis_store=redis_cache,
+        local_cache=local_cache,
+        serializer=serializer,
         config={
             "CACHE_TYPE": "redis",
             "CACHE_REDIS_HOST": config.KEY_VALUE_STORE["host"],
             "CACHE_REDIS_PORT": config.KEY_VALUE_STORE["port"],
             "CACHE_REDIS_DB": config.MEMOIZE_DB_INDEX,
-        }
+        },
     )
 
 # This is needed to run tests which. This way they do not require a Redis
 # instance to work properly
 except redis.ConnectionError:
-    cache = Cache(config={"CACHE_TYPE": "simple"})
+    cache = TwoTierCache(
+        local_cache=local_cache,
+        serializer=serializer,
+        config={"CACHE_TYPE": "simple"},
+    )
 
 memoize_function = cache.memoize
 
@@ -40,5 +660,35 @@ def invalidate(*args):
     cache.delete_memoized(*args)
 
 
+def invalidate_tags(*tags):
+    return cache.invalidate_tags(*tags)
+
+
 def clear():
     cache.clear()
+
+
+def get_stats():
+    """
+    Return hit and miss counters for the request, local and Redis tiers of
+    the current process.
+    """
+    redis_stats = stats["redis"]
+    return {
+        "request": {
+            "enabled": config.MEMOIZE_REQUEST_CACHE_ENABLED,
+            "hits": stats["request"]["hits"],
+            "misses": stats["request"]["misses"],
+        },
+        "local": {
+            "enabled": local_cache is not None,
+            "size": len(local_cache) if local_cache is not None else 0,
+            "hits": stats["local"]["hits"],
+            "misses": stats["local"]["misses"],
+        },
+        "redis": {
+            "hits": redis_stats["lookups"] - redis_stats["misses"],
+            "misses": redis_stats["misses"],
+            "stale": redis_stats["stale"],
+        },
+    }
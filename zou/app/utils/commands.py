@@ -1,10 +1,12 @@
 # coding: utf-8
 
 import os
+import time
 import orjson as json
 import datetime
 import tempfile
 
+from multiprocessing.pool import ThreadPool as Pool
 
 from ldap3 import Server, Connection, ALL, NTLM, SIMPLE
 from zou.app.utils import thumbnail as thumbnail_utils
@@ -15,11 +17,13 @@ from zou.app.services import (
     backup_service,
     deletion_service,
     edits_service,
+    entities_service,
     index_service,
     persons_service,
     preview_files_service,
     projects_service,
     shots_service,
+    stats_service,
     sync_service,
     tasks_service,
 )
@@ -599,9 +603,167 @@ def upload_files_to_cloud_storage(days):
         backup_service.upload_preview_files_to_storage(days)
 
 
-def reset_tasks_data(project_id):
+def _run_warm_up_call(name, func, *args):
     with app.app_context():
-        tasks_service.reset_tasks_data(project_id)
+        start = time.time()
+        error = None
+        try:
+            func(*args)
+        except Exception as exception:
+            error = str(exception)
+        return name, time.time() - start, error
+
+
+def warm_memory_cache(number_workers=10):
+    """
+    Pre-populate the memoize cache with the most used lookups: task types,
+    task statuses, departments, entity types, persons and open projects.
+    Lookups are run concurrently by a pool of workers. It returns timings
+    grouped by function name.
+    """
+    start = time.time()
+    calls = [
+        ("get_shot_type", shots_service.get_shot_type),
+        ("get_sequence_type", shots_service.get_sequence_type),
+        ("get_episode_type", shots_service.get_episode_type),
+        ("get_scene_type", shots_service.get_scene_type),
+        ("get_camera_type", shots_service.get_camera_type),
+        ("get_edit_type", edits_service.get_edit_type),
+        ("get_default_status", tasks_service.get_default_status),
+        ("get_active_persons", persons_service.get_active_persons),
+    ]
+    with app.app_context():
+        for task_type in tasks_service.get_task_types():
+            calls.append(
+                ("get_task_type", tasks_service.get_task_type, task_type["id"])
+            )
+        for task_status in tasks_service.get_task_statuses():
+            calls.append(
+                (
+                    "get_task_status",
+                    tasks_service.get_task_status,
+                    task_status["id"],
+                )
+            )
+        for department in tasks_service.get_departments():
+            calls.append(
+                (
+                    "get_department",
+                    tasks_service.get_department,
+                    department["id"],
+                )
+            )
+        for asset_type in assets_service.get_asset_types():
+            calls.append(
+                (
+                    "get_entity_type",
+                    entities_service.get_entity_type,
+                    asset_type["id"],
+                )
+            )
+        for person in persons_service.get_persons():
+            if person["active"]:
+                calls.append(
+                    ("get_person", persons_service.get_person, person["id"])
+                )
+                calls.append(
+                    (
+                        "get_person_by_email",
+                        persons_service.get_person_by_email,
+                        person["email"],
+                    )
+                )
+        for project_id in projects_service.open_project_ids():
+            calls.append(
+                ("get_project", projects_service.get_project, project_id)
+            )
+            calls.append(
+                (
+                    "get_project_with_relations",
+                    projects_service.get_project_with_relations,
+                    project_id,
+                )
+            )
+    print("Lists warmed in %.2fs." % (time.time() - start))
+
+    pool = Pool(number_workers)
+    results = pool.starmap(_run_warm_up_call, calls)
+    pool.close()
+    pool.join()
+
+    timings = {}
+    for name, duration, error in results:
+        timing = timings.setdefault(
+            name, {"calls": 0, "duration": 0.0, "errors": 0}
+        )
+        timing["calls"] += 1
+        timing["duration"] += duration
+        if error is not None:
+            timing["errors"] += 1
+            print("%s failed: %s" % (name, error))
+
+    for name, timing in sorted(timings.items()):
+        print(
+            "%s: %d calls, %.2fs, %d errors"
+            % (name, timing["calls"], timing["duration"], timing["errors"])
+        )
+    print(
+        "Memory cache warmed in %.2fs (%d calls)."
+        % (time.time() - start, len(calls))
+    )
+    return timings
+
+
+def reset_tasks_data(project_id, background=False):
+    if background:
+        from zou.app.stores import queue_store
+
+        if not config.ENABLE_JOB_QUEUE:
+            print("The job queue is not enabled.")
+            return None
+        job = queue_store.job_queue.enqueue(
+            tasks_service.reset_tasks_data_job,
+            args=(project_id,),
+            job_timeout=config.JOB_QUEUE_TIMEOUT,
+        )
+        print("Tasks data reset enqueued (job %s)." % job.id)
+        return job
+
+    def print_progress(done, total):
+        print("%d/%d tasks processed." % (done, total))
+
+    with app.app_context():
+        nb_updated_tasks = tasks_service.reset_tasks_data(
+            project_id, progress_callback=print_progress
+        )
+    print("%d tasks updated." % nb_updated_tasks)
+
+
+def rebuild_episode_stats(project_id=None):
+    with app.app_context():
+        project_ids = stats_service.rebuild_episode_stats(project_id)
+    print("Episode stats rebuilt for %d projects." % len(project_ids))
+
+
+def reconcile_main_stats(background=False):
+    if background:
+        from zou.app.stores import queue_store
+
+        if not config.ENABLE_JOB_QUEUE:
+            print("The job queue is not enabled.")
+            return None
+        job = queue_store.job_queue.enqueue(
+            stats_service.reconcile_main_stats_job,
+            job_timeout=config.JOB_QUEUE_TIMEOUT,
+        )
+        print("Main stats reconciliation enqueued (job %s)." % job.id)
+        return job
+
+    with app.app_context():
+        stats = stats_service.reconcile_main_stats()
+    for counter, value in stats.items():
+        print("%s: %d" % (counter, value))
+
 
 def reset_user_password(user_email):
     password = auth.encrypt_password("default")
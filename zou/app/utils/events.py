@@ -64,13 +64,40 @@ def emit(event, data={}, persist=True, project_id=None):
     (like the realtime event daemon).
     """
     event = event.lower()
-    event_handlers = handlers.get(event, {})
     if project_id is not None:
         data["project_id"] = project_id
     data = fields.serialize_dict(data)
     publisher_store.publish(event, data)
     if persist:
         save_event(event, data, project_id=project_id)
+    run_handlers(event, data)
+
+
+def emit_many(events, persist=True):
+    """
+    Emit several events at once. Events are given as (event, data, project_id)
+    tuples. They are published and handled like with emit, but they are
+    stored in the database in a single transaction.
+    """
+    serialized_events = []
+    for event, data, project_id in events:
+        event = event.lower()
+        if project_id is not None:
+            data["project_id"] = project_id
+        data = fields.serialize_dict(data)
+        publisher_store.publish(event, data)
+        serialized_events.append((event, data, project_id))
+    if persist:
+        save_events(serialized_events)
+    for event, data, _ in serialized_events:
+        run_handlers(event, data)
+
+
+def run_handlers(event, data):
+    """
+    Execute handlers registered for given event.
+    """
+    event_handlers = handlers.get(event, {})
 
     from zou.app.config import ENABLE_JOB_QUEUE
 
@@ -90,17 +117,41 @@ def save_event(event, data, project_id=None):
     """
     Store event information in the database.
     """
-    try:
-        from zou.app.services.persons_service import get_current_user_raw
-
-        person = get_current_user_raw()
-        person_id = person.id
-    except BaseException:
-        person_id = None
-
     if project_id == "None":
         project_id = None
 
     return ApiEvent.create(
-        name=event, data=data, user_id=person_id, project_id=project_id
+        name=event,
+        data=data,
+        user_id=get_current_user_id(),
+        project_id=project_id,
     )
+
+
+def save_events(events):
+    """
+    Store information of given (event, data, project_id) tuples in the
+    database with a single commit.
+    """
+    person_id = get_current_user_id()
+    api_events = []
+    for event, data, project_id in events:
+        if project_id == "None":
+            project_id = None
+        api_events.append(
+            ApiEvent.create_no_commit(
+                name=event, data=data, user_id=person_id, project_id=project_id
+            )
+        )
+    ApiEvent.commit()
+    return api_events
+
+
+def get_current_user_id():
+    try:
+        from zou.app.services.persons_service import get_current_user_raw
+
+        person = get_current_user_raw()
+        return person.id
+    except BaseException:
+        return None
@@ -52,6 +52,54 @@ def serialize_value(value, milliseconds=False):
         return value
 
 
+def serialize_datetime(value, milliseconds=False):
+    """
+    Fast path of serialize_value for datetime columns.
+    """
+    if type(value) is datetime.datetime:
+        if milliseconds:
+            return value.isoformat()
+        else:
+            return value.replace(microsecond=0).isoformat()
+    return serialize_value(value, milliseconds=milliseconds)
+
+
+def serialize_date(value, milliseconds=False):
+    """
+    Fast path of serialize_value for date columns.
+    """
+    if type(value) is datetime.date:
+        return value.isoformat()
+    return serialize_value(value, milliseconds=milliseconds)
+
+
+def serialize_uuid(value, milliseconds=False):
+    """
+    Fast path of serialize_value for UUID columns.
+    """
+    if type(value) is uuid.UUID:
+        return str(value)
+    return serialize_value(value, milliseconds=milliseconds)
+
+
+def serialize_choice(value, milliseconds=False):
+    """
+    Fast path of serialize_value for choice columns.
+    """
+    if type(value) is Choice:
+        return value.code
+    return serialize_value(value, milliseconds=milliseconds)
+
+
+def serialize_scalar(value, milliseconds=False):
+    """
+    Fast path of serialize_value for string, number and boolean columns.
+    """
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    return serialize_value(value, milliseconds=milliseconds)
+
+
 def serialize_list(list_value):
     """
     Serialize a list of any kind of objects into data structures
@@ -90,6 +138,112 @@ def serialize_models(models, relations=False, milliseconds=False):
     ]
 
 
+def serialize_query(
+    query, relations=False, milliseconds=False, field_names=None
+):
+    """
+    Serialize models selected by given query (useful for json dumping). Rows
+    are serialized directly when the queried model allows it.
+    """
+    return list(
+        iter_serialized_query(
+            query,
+            relations=relations,
+            milliseconds=milliseconds,
+            field_names=field_names,
+        )
+    )
+
+
+def iter_serialized_query(
+    query,
+    relations=False,
+    milliseconds=False,
+    chunk_size=None,
+    field_names=None,
+):
+    """
+    Generate serialized models selected by given query. When a chunk size is
+    given, results are fetched from the database by chunks of that size.
+    When field names are given, only these fields are serialized.
+    """
+    descriptions = query.column_descriptions
+    model = descriptions[0]["entity"] if len(descriptions) == 1 else None
+    if hasattr(model, "iter_serialized_query"):
+        return model.iter_serialized_query(
+            query,
+            relations=relations,
+            milliseconds=milliseconds,
+            chunk_size=chunk_size,
+            field_names=field_names,
+        )
+    else:
+        if chunk_size:
+            query = query.yield_per(chunk_size)
+        return (
+            filter_fields(
+                instance.serialize(
+                    relations=relations, milliseconds=milliseconds
+                ),
+                field_names,
+            )
+            for instance in query
+            if instance is not None
+        )
+
+
+def filter_fields(entry, field_names):
+    """
+    Keep only given fields in a serialized entry. The type field is always
+    kept. Entry is returned unchanged if no field names are given.
+    """
+    if field_names is None:
+        return entry
+    return {
+        key: value
+        for key, value in entry.items()
+        if key in field_names or key == "type"
+    }
+
+
+def to_columnar(entries, nested_key="tasks", index_key="entity_index"):
+    """
+    Turn a list of serialized entries into a columnar structure: a dict of
+    parallel lists, one per field, instead of a list of dicts repeating
+    every key name. Entries listed under the nested key (like tasks of
+    entities) are flattened into their own table, where the index key
+    column gives the index of their parent entry:
+
+        {
+            "entities": {"id": [...], "name": [...], ...},
+            "tasks": {"entity_index": [...], "id": [...], ...},
+        }
+    """
+    nested_entries = [
+        (index, nested_entry)
+        for index, entry in enumerate(entries)
+        for nested_entry in entry.get(nested_key, None) or []
+    ]
+    nested_columns = {
+        index_key: [index for index, _ in nested_entries],
+    }
+    nested_columns.update(
+        _to_columns([nested_entry for _, nested_entry in nested_entries])
+    )
+    return {
+        "entities": _to_columns(entries, excluded_key=nested_key),
+        nested_key: nested_columns,
+    }
+
+
+def _to_columns(entries, excluded_key=None):
+    keys = {}
+    for entry in entries:
+        keys.update(dict.fromkeys(entry))
+    keys.pop(excluded_key, None)
+    return {key: [entry.get(key, None) for entry in entries] for key in keys}
+
+
 def gen_uuid():
     """
     Generate a unique identifier (useful for json dumping).
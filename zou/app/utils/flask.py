@@ -2,7 +2,10 @@ from ua_parser import user_agent_parser
 from werkzeug.user_agent import UserAgent
 from werkzeug.utils import cached_property
 from flask.json.provider import JSONProvider
-from flask import make_response
+from flask import make_response, request, stream_with_context, Response
+from flask_jwt_extended import get_jwt_identity
+import hashlib
+import itertools
 import orjson
 
 orjson_options = orjson.OPT_NON_STR_KEYS
@@ -17,6 +20,71 @@ def output_json(data, code, headers=None):
     return resp
 
 
+def stream_json_list(items, chunk_size=1000):
+    """
+    Makes a Flask response that writes given items as a JSON array, chunk by
+    chunk, while they are generated. The whole list is never built in memory.
+    The first chunk is generated right away, so errors raised while building
+    it can still be turned into a proper error response.
+    """
+    items_iterator = iter(items)
+    first_chunk = list(itertools.islice(items_iterator, chunk_size))
+
+    def generate():
+        yield b"["
+        chunk = first_chunk
+        separator = b""
+        while chunk:
+            yield separator + orjson.dumps(chunk, option=orjson_options)[1:-1]
+            separator = b","
+            chunk = list(itertools.islice(items_iterator, chunk_size))
+        yield b"]"
+
+    return Response(
+        stream_with_context(generate()), mimetype="application/json"
+    )
+
+
+def get_request_etag(version):
+    """
+    Build the ETag of the response to the current request from the version
+    of the data it returns. The URL and the current user are part of it too,
+    because they change the response content.
+    """
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        identity = None
+    signature = "%s|%s|%s" % (request.full_path, identity, version)
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+
+def is_not_modified(etag):
+    """
+    Tell if the client already has the response matching given ETag.
+    """
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified_response(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def add_etag(result, etag):
+    """
+    Add given ETag to the result of a resource, whether it's a response or
+    data to serialize.
+    """
+    if isinstance(result, Response):
+        result.set_etag(etag)
+        return result
+    response = output_json(result, 200)
+    response.set_etag(etag)
+    return response
+
+
 class ORJSONProvider(JSONProvider):
     def __init__(self, *args, **kwargs):
         self.options = kwargs
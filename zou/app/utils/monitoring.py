@@ -1,5 +1,13 @@
+import re
+import time
+
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
 from flask_jwt_extended.exceptions import NoAuthorizationError
 from jwt import ExpiredSignatureError
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from werkzeug.exceptions import Forbidden, NotFound
 
 from zou.app import config
@@ -17,11 +25,16 @@ if config.SENTRY_ENABLED:
 
 if config.PROMETHEUS_METRICS_ENABLED:
     try:
+        import prometheus_client
         import prometheus_flask_exporter
         import prometheus_flask_exporter.multiprocess
     except ModuleNotFoundError:
         print("prometheus_flask_exporter not found.")
 
+PARAMETERS_LIST = re.compile(r"\((\s*(%\(\w+\)s|%s|\?)\s*,?)+\)")
+
+sql_histograms = {}
+
 
 def init_monitoring(app):
     if config.SENTRY_ENABLED:
@@ -65,3 +78,108 @@ def init_monitoring(app):
                 **prometheus_kwargs
             )
         metrics.info("zou_info", "Application info", version=zou_version)
+
+    if config.SQL_MONITORING_ENABLED:
+        init_sql_monitoring(app)
+
+
+def init_sql_monitoring(app):
+    """
+    Record the number of SQL queries run while serving each request, the
+    time spent on them and how many times each statement shape is run. A
+    statement repeated many times is the sign of a N+1 queries problem, a
+    warning is logged in that case. In debug mode, stats are sent through
+    response headers. They are published as Prometheus histograms too when
+    metrics are enabled.
+    """
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+    app.before_request(reset_sql_stats)
+    app.after_request(report_sql_stats)
+
+    if config.PROMETHEUS_METRICS_ENABLED:
+        sql_histograms["queries"] = prometheus_client.Histogram(
+            "zou_sql_queries_per_request",
+            "Number of SQL queries run to serve a request",
+            ["url_rule"],
+            buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+        )
+        sql_histograms["duration"] = prometheus_client.Histogram(
+            "zou_sql_duration_seconds",
+            "Time spent running SQL queries to serve a request",
+            ["url_rule"],
+        )
+
+
+def get_statement_fingerprint(statement):
+    """
+    Return the shape of given SQL statement. Lists of parameters, whose
+    length changes from one call to another, are collapsed.
+    """
+    return PARAMETERS_LIST.sub("(?)", " ".join(statement.split()))
+
+
+def reset_sql_stats():
+    g.sql_stats = {"count": 0, "duration": 0.0, "statements": Counter()}
+
+
+def get_sql_stats():
+    """
+    Return SQL stats of the current request, None outside of requests.
+    """
+    if not has_request_context():
+        return None
+    if "sql_stats" not in g:
+        reset_sql_stats()
+    return g.sql_stats
+
+
+def before_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def after_cursor_execute(
+    conn, cursor, statement, parameters, context, executemany
+):
+    start_times = conn.info.get("query_start_times", [])
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+    stats = get_sql_stats()
+    if stats is not None:
+        stats["count"] += 1
+        stats["duration"] += duration
+        stats["statements"][get_statement_fingerprint(statement)] += 1
+
+
+def report_sql_stats(response):
+    """
+    Log, publish and add to the response the SQL stats of the current
+    request. Queries run while a streamed response is sent are not counted.
+    """
+    stats = get_sql_stats()
+    url_rule = str(request.url_rule)
+    max_repeats = 0
+    if stats["statements"]:
+        statement, max_repeats = stats["statements"].most_common(1)[0]
+        if max_repeats > config.SQL_REPEATED_STATEMENT_THRESHOLD:
+            current_app.logger.warning(
+                "Possible N+1 queries on %s, statement run %s times: %s",
+                url_rule,
+                max_repeats,
+                statement[:500],
+            )
+
+    if config.DEBUG:
+        response.headers["X-SQL-Queries"] = str(stats["count"])
+        response.headers["X-SQL-Duration"] = "%.2f" % (
+            stats["duration"] * 1000
+        )
+        response.headers["X-SQL-Max-Repeats"] = str(max_repeats)
+
+    if sql_histograms:
+        sql_histograms["queries"].labels(url_rule).observe(stats["count"])
+        sql_histograms["duration"].labels(url_rule).observe(stats["duration"])
+    return response
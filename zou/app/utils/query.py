@@ -1,8 +1,36 @@
+import base64
+import binascii
+import datetime
+import hashlib
 import math
+import orjson as json
 
 from zou.app import app
-from zou.app.utils import fields, string
-from sqlalchemy import func
+from zou.app.services.exception import WrongParameterException
+from zou.app.utils import cache, fields, string
+from zou.app.utils.flask import stream_json_list
+from sqlalchemy import Table, func, literal, text, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """
+    Statement returning the plan of given statement, as computed by the
+    Postgres planner, in JSON format.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) %s" % compiler.process(
+        element.statement, **kw
+    )
 
 
 def get_query_criterions_from_request(request):
@@ -12,11 +40,43 @@ def get_query_criterions_from_request(request):
     """
     criterions = {}
     for key, value in request.args.items():
-        if key not in ["page"]:
+        if key not in ["page", "fields", "format", "updated_after"]:
             criterions[key] = value
     return criterions
 
 
+def get_fields_from_request(request):
+    """
+    Turn the fields parameter (comma separated field names) into a list of
+    field names. None is returned when the parameter is not set.
+    """
+    fields_parameter = request.args.get("fields", None)
+    if not fields_parameter:
+        return None
+    return [
+        field_name.strip()
+        for field_name in fields_parameter.split(",")
+        if field_name.strip()
+    ]
+
+
+def get_updated_after_from_request(request):
+    """
+    Turn the updated_after parameter (ISO 8601 date) into a naive UTC
+    datetime. None is returned when the parameter is not set.
+    """
+    updated_after = request.args.get("updated_after", None)
+    if not updated_after:
+        return None
+    try:
+        date = datetime.datetime.fromisoformat(updated_after)
+    except ValueError:
+        raise WrongParameterException("Wrong date format for updated_after.")
+    if date.tzinfo is not None:
+        date = date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return date
+
+
 def apply_criterions_to_db_query(model, db_query, criterions):
     """
     Apply criterions given in HTTP request to the sqlachemy db query object.
@@ -29,16 +89,31 @@ def apply_criterions_to_db_query(model, db_query, criterions):
     return db_query.filter_by(**criterions)
 
 
-def get_paginated_results(query, page, limit=None, relations=False):
+def get_paginated_results(
+    query,
+    page,
+    limit=None,
+    relations=False,
+    stream=False,
+    field_names=None,
+    estimate_total=False,
+):
     """
-    Apply pagination to the query object.
+    Apply pagination to the query object. When all results are required and
+    stream is True, a response streaming them is returned instead of a list.
+    If estimate_total is True, the total is estimated (see get_query_total).
     """
-    if page < 1:
-        entries = query.all()
-        return fields.serialize_models(entries, relations=relations)
+    if page < 1 and stream:
+        return stream_results(
+            query, relations=relations, field_names=field_names
+        )
+    elif page < 1:
+        return fields.serialize_query(
+            query, relations=relations, field_names=field_names
+        )
     else:
         limit = limit or app.config["NB_RECORDS_PER_PAGE"]
-        total = query.count()
+        total = get_query_total(query, estimate=estimate_total)
         offset = (page - 1) * limit
 
         nb_pages = int(math.ceil(total / float(limit)))
@@ -55,7 +130,9 @@ def get_paginated_results(query, page, limit=None, relations=False):
                 "page": page,
             }
         else:
-            models = fields.serialize_models(query.all(), relations=relations)
+            models = fields.serialize_query(
+                query, relations=relations, field_names=field_names
+            )
             result = {
                 "data": models,
                 "total": total,
@@ -67,6 +144,105 @@ def get_paginated_results(query, page, limit=None, relations=False):
         return result
 
 
+def get_query_total(query, estimate=False):
+    """
+    Return the number of results of given query. If estimate is True, the
+    number estimated by the Postgres planner is returned, which avoids
+    scanning all matching rows. Small estimates are not reliable, so below
+    ESTIMATED_TOTAL_THRESHOLD an exact count is done instead. This count is
+    cached for a short time for each query signature.
+    """
+    if not estimate:
+        return query.count()
+    total = get_estimated_total(query)
+    if total is None or total < app.config["ESTIMATED_TOTAL_THRESHOLD"]:
+        total = get_cached_total(query)
+    return total
+
+
+def get_estimated_total(query):
+    """
+    Return the number of results of given query estimated by the Postgres
+    planner. For unfiltered queries on a single table, the number of rows
+    stored in the table statistics is used. None is returned when no
+    estimate is available.
+    """
+    session = query.session
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    statement = query.order_by(None).statement
+    froms = statement.get_final_froms()
+    if (
+        statement.whereclause is None
+        and len(froms) == 1
+        and isinstance(froms[0], Table)
+        and not statement._distinct
+        and not statement._group_by_clauses
+    ):
+        reltuples = session.execute(
+            text(
+                "SELECT reltuples FROM pg_class WHERE oid = to_regclass(:name)"
+            ),
+            {"name": froms[0].fullname},
+        ).scalar()
+        # Tables never analyzed have negative reltuples.
+        if reltuples is not None and reltuples >= 0:
+            return int(reltuples)
+    plan = session.execute(Explain(statement)).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_cached_total(query):
+    """
+    Return the exact number of results of given query. The result is cached
+    for EXACT_TOTAL_CACHE_TTL seconds. The cache key is built from the SQL
+    statement and its parameters.
+    """
+    compiled = query.statement.compile(
+        dialect=query.session.get_bind().dialect
+    )
+    signature = "%s|%s" % (compiled, sorted(compiled.params.items()))
+    key = "query-total:%s" % hashlib.sha1(signature.encode()).hexdigest()
+    total = cache.cache.get(key)
+    if total is None:
+        total = query.count()
+        cache.cache.set(
+            key, total, timeout=app.config["EXACT_TOTAL_CACHE_TTL"]
+        )
+    return total
+
+
+def get_query_version(model, query):
+    """
+    Return a version of the results of given query: it changes as soon as a
+    matching row is created, updated or deleted. It requires a single
+    aggregate query, which is far cheaper than serializing results.
+    """
+    max_updated_at, count = (
+        query.order_by(None)
+        .with_entities(func.max(model.updated_at), func.count(model.id))
+        .one()
+    )
+    return "%s|%s" % (max_updated_at, count)
+
+
+def stream_results(query, relations=False, field_names=None):
+    """
+    Return a response streaming serialized results of given query. Rows are
+    fetched and serialized by chunks to keep memory usage bounded.
+    """
+    chunk_size = app.config["STREAM_CHUNK_SIZE"]
+    return stream_json_list(
+        fields.iter_serialized_query(
+            query,
+            relations=relations,
+            chunk_size=chunk_size,
+            field_names=field_names,
+        ),
+        chunk_size=chunk_size,
+    )
+
+
 def get_cursor_results(
     model,
     query,
@@ -74,16 +250,15 @@ def get_cursor_results(
     limit=None,
     relations=False,
 ):
-    """ """
+    """
+    Return entries created after given date, ordered by creation date.
+    """
     limit = limit or app.config["NB_RECORDS_PER_PAGE"]
     total = query.count()
-    query = (
-        query.filter(model.created_at > cursor_created_at)
-        .order_by(model.created_at)
-        .limit(limit)
-    )
-    models = fields.serialize_models(
-        query.all(), relations=relations, milliseconds=True
+    query = apply_keyset(query, [model.created_at], [cursor_created_at])
+    query = query.limit(limit)
+    models = fields.serialize_query(
+        query, relations=relations, milliseconds=True
     )
     result = {
         "data": models,
@@ -93,6 +268,106 @@ def get_cursor_results(
     return result
 
 
+def apply_keyset(query, columns, values=None):
+    """
+    Order query by given columns and, if values are given, keep only rows
+    located after these values in that order. Values are bound with the
+    type of their column, so they can be compared in a row comparison.
+    """
+    if values is not None:
+        if len(columns) == 1:
+            query = query.filter(columns[0] > values[0])
+        else:
+            values = [
+                literal(value, type_=column.type)
+                for column, value in zip(columns, values)
+            ]
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+    return query.order_by(*columns)
+
+
+def encode_cursor(updated_at, entry_id):
+    """
+    Build an opaque cursor from the update date and ID of an entry.
+    """
+    payload = json.dumps([updated_at.isoformat(), str(entry_id)])
+    return base64.urlsafe_b64encode(payload).decode("utf-8")
+
+
+def decode_cursor(cursor):
+    """
+    Return the update date and ID stored in given cursor.
+    """
+    try:
+        updated_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.datetime.fromisoformat(updated_at), entry_id
+    except (binascii.Error, json.JSONDecodeError, TypeError, ValueError):
+        raise WrongParameterException("Malformed cursor.")
+
+
+def get_keyset_results(
+    model,
+    query,
+    after=None,
+    limit=None,
+    with_count=False,
+    serialize=None,
+    relations=False,
+    field_names=None,
+):
+    """
+    Return a page of entries ordered by update date and ID, located after
+    given cursor. Entries never updated are ordered by their creation date. Unlike offset pagination, the cost of a page doesn't depend
+    on its position. The cursor of the next page is returned with the
+    entries; it's None on the last page. Counting all entries is optional.
+
+    The page is fetched once, with one more entry to know if there is a next
+    page. Serialized entries need their ID to build the cursor, so it's
+    serialized even if it's not part of given field names.
+    """
+    limit = limit or app.config["NB_RECORDS_PER_PAGE"]
+    if serialize is None:
+
+        def serialize(page_query, field_names=None):
+            return fields.serialize_query(
+                page_query, relations=relations, field_names=field_names
+            )
+
+    result = {}
+    if with_count:
+        result["total"] = query.count()
+
+    values = None
+    if after:
+        values = decode_cursor(after)
+    updated_at = func.coalesce(model.updated_at, model.created_at)
+    query = apply_keyset(query, [updated_at, model.id], values)
+    hide_id = field_names is not None and "id" not in field_names
+    if hide_id:
+        field_names = list(field_names) + ["id"]
+    entries = serialize(query.limit(limit + 1), field_names=field_names)
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(
+            *model.query.with_entities(updated_at, model.id)
+            .filter(model.id == entries[-1]["id"])
+            .one()
+        )
+    if hide_id:
+        for entry in entries:
+            del entry["id"]
+    result.update(
+        {
+            "data": entries,
+            "limit": limit,
+            "next_cursor": next_cursor,
+        }
+    )
+    return result
+
+
 def apply_sort_by(model, query, sort_by):
     """
     Apply an order by clause to a sqlalchemy query from a string parameter.
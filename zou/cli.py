@@ -118,6 +118,13 @@ def clear_memory_cache():
         cache.clear()
 
 
+@cli.command()
+@click.option("--number-workers", default=10, show_default=True, type=int)
+def warm_cache(number_workers):
+    "Pre-populate Redis memory cache with the most used lookups."
+    commands.warm_memory_cache(number_workers=number_workers)
+
+
 @cli.command()
 @click.argument("revision", default="base")
 def reset_migrations(revision):
@@ -445,12 +452,35 @@ def upload_files_to_cloud_storage(days):
 
 @cli.command()
 @click.option("--projectid")
-def clean_tasks_data(projectid):
+@click.option("--background", is_flag=True, default=False)
+def clean_tasks_data(projectid, background):
     """
-    Reset task models data (retake count, wip start date and end date)
+    Reset task models data (retake count, wip start date and end date).
+    With --background, the reset is run by the job queue.
     """
     if projectid is not None:
-        commands.reset_tasks_data(projectid)
+        commands.reset_tasks_data(projectid, background=background)
+
+
+@cli.command()
+@click.option("--projectid")
+def rebuild_episode_stats(projectid):
+    """
+    Recompute stored episode stats from tasks, for given project or for all
+    projects if no project is given.
+    """
+    commands.rebuild_episode_stats(projectid)
+
+
+@cli.command()
+@click.option("--background", is_flag=True, default=False)
+def reconcile_main_stats(background):
+    """
+    Recount previews and comments and reset the main stats counters. It's
+    meant to be run periodically (with a cron job for instance) to correct
+    counter drift. Use --background to run it through the job queue.
+    """
+    commands.reconcile_main_stats(background)
 
 
 @cli.command()